@@ -2,9 +2,31 @@ from neurogym.version import VERSION as __version__
 from neurogym.core import BaseEnv
 from neurogym.core import TrialEnv
 from neurogym.core import PeriodEnv
+from neurogym.core import BatchEnv
 from neurogym.core import TrialWrapper
 from neurogym.envs import all_envs
 from neurogym.envs import all_tags
 from neurogym.envs.collections import get_collection
-from neurogym.wrappers import all_wrappers
-from neurogym.utils.data import Dataset
+
+import importlib
+
+# Imported when first accessed (PEP 562) to keep import neurogym fast
+_LAZY = {
+    'all_wrappers': 'neurogym.wrappers',
+    'Dataset': 'neurogym.utils.data',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    if name in ['envs', 'wrappers', 'utils']:
+        return importlib.import_module('neurogym.' + name)
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
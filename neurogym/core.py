@@ -2,9 +2,12 @@
 # -*- coding: utf-8 -*-
 
 
+import itertools
+
 import numpy as np
 import gym
 import warnings
+from gym.vector.utils import batch_space
 
 from neurogym.utils import tasktools
 
@@ -61,6 +64,38 @@ def env_string(env):
     return string
 
 
+class StepInfo(object):
+    """Info returned by TrialEnv in lean mode, reused at every step.
+
+    Attributes:
+        new_trial: bool, whether the trial ended at this step
+        gt: ground truth of this step
+        performance: performance of the trial that ended, None otherwise
+        trial: dict of the trial that ended (a reference), None otherwise
+    """
+    __slots__ = ('new_trial', 'gt', 'performance', 'trial')
+
+    def __init__(self):
+        self.new_trial = False
+        self.gt = None
+        self.performance = None
+        self.trial = None
+
+    # Read access as a dict, for code that only reads these keys
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if isinstance(key, str) else None
+        return default if value is None else value
+
+
 class BaseEnv(gym.Env):
     """The base Neurogym class to include dt"""
 
@@ -96,9 +131,13 @@ class TrialEnv(BaseEnv):
         self.ob_dict = {}
         self.act_dict = {}
         self.rewards = {}
+        # Extra observation channels reserved by wrappers
+        self.ob_extra = {}
+        self._n_ob_extra = 0
         self.seed()
 
         self._top = self
+        self._lean_step = None
 
     def new_trial(self, **kwargs):
         """Public interface for starting a new trial.
@@ -123,11 +162,26 @@ class TrialEnv(BaseEnv):
         Receives an action and returns a new state, a reward, a flag variable
         indicating whether the experiment has ended and a dictionary with
         useful information
+
+        Tasks only returning new_trial and gt in the dictionary can define
+        _step_core instead, from which this dictionary is built.
+        """
+        obs, reward, new_trial, gt = self._step_core(action)
+        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+
+    def _step_core(self, action):
+        """Private interface for the environment, without info dictionary.
+
+        Receives an action and returns a new state, a reward, a flag
+        indicating whether the trial has ended and the ground truth. Used
+        directly by the lean stepping mode, see set_lean.
         """
         raise NotImplementedError('_step is not defined by user.')
 
     def step(self, action):
         """Public interface for the environment."""
+        if self._lean_step is not None:
+            return self._lean_step(action)
         obs, reward, done, info = self._step(action)
 
         self.t += self.dt  # increment within trial time count
@@ -149,6 +203,99 @@ class TrialEnv(BaseEnv):
                 info.update(self.trial)
         return obs, reward, done, info
 
+    def _step_lean(self, action):
+        """Step of lean mode for tasks defining _step_core, see set_lean."""
+        obs, reward, new_trial, gt = self._step_core(action)
+
+        self.t += self.dt  # increment within trial time count
+        self.t_ind += 1
+
+        if self.t > self.tmax - self.dt and not new_trial:
+            new_trial = True
+            reward += self.r_tmax
+
+        info = self._lean_info
+        info.new_trial = new_trial
+        info.gt = gt
+        if new_trial:
+            info.performance = self.performance
+            info.trial = self.trial
+            self.performance = 0
+            self.t = self.t_ind = 0  # Reset within trial time count
+            self.num_tr += 1  # Increment trial count
+            self._top.new_trial()
+        elif info.trial is not None:
+            info.performance = None
+            info.trial = None
+        return obs, reward, False, info
+
+    def _step_lean_dict(self, action):
+        """Step of lean mode for tasks defining _step, see set_lean."""
+        obs, reward, done, step_info = self._step(action)
+
+        self.t += self.dt  # increment within trial time count
+        self.t_ind += 1
+
+        new_trial = step_info['new_trial']
+        if self.t > self.tmax - self.dt and not new_trial:
+            new_trial = True
+            reward += self.r_tmax
+
+        info = self._lean_info
+        info.new_trial = new_trial
+        info.gt = step_info.get('gt')
+        if new_trial:
+            info.performance = self.performance
+            info.trial = self.trial
+            self.performance = 0
+            self.t = self.t_ind = 0  # Reset within trial time count
+            self.num_tr += 1  # Increment trial count
+            self._top.new_trial()
+        elif info.trial is not None:
+            info.performance = None
+            info.trial = None
+        return obs, reward, done, info
+
+    def set_lean(self, lean=True):
+        """Switch lean stepping mode on or off.
+
+        In lean mode, step returns as info a StepInfo object with fields
+        new_trial, gt, performance and trial, instead of a dictionary
+        extended with the trial information. The trial dictionary is only
+        passed, by reference, at the step ending the trial, and it is the
+        dictionary of the trial that ended.
+
+        The same StepInfo object is returned at every step and updated in
+        place, so it is only valid until the next step. Copy its fields to
+        keep them.
+
+        For tasks defining _step_core, no dictionary is built at any step,
+        and extra keys that their _step adds to the dictionary are not
+        passed. Tasks only defining _step still build their own dictionary,
+        which is read and discarded, and only avoid the copy of the trial
+        dictionary at trial ends.
+
+        Lean mode is dispatched from step, so wrappers and tools replacing
+        step on the instance still see lean steps. It is meant for tasks
+        used directly or with wrappers that only read the fields of
+        StepInfo.
+        """
+        if lean:
+            self._lean_info = StepInfo()
+            # Use _step_core unless a subclass overrides _step below the
+            # class defining _step_core
+            self._lean_step = self._step_lean_dict
+            for cls in type(self).__mro__:
+                if cls is TrialEnv:
+                    break
+                if '_step_core' in vars(cls):
+                    self._lean_step = self._step_lean
+                    break
+                if '_step' in vars(cls):
+                    break
+        else:
+            self._lean_step = None
+
     def reset(self, step_fn=None, no_step=False):
         """Reset the environment.
 
@@ -186,6 +333,34 @@ class TrialEnv(BaseEnv):
         """Set top to be wrapper."""
         self._top = wrapper
 
+    def reserve_ob(self, name, size=1):
+        """Reserve extra observation channels.
+
+        Reserved channels are appended after the env's own observation
+        channels when the trial observation is allocated, so wrappers can
+        write into them in place instead of concatenating. Channels should
+        be reserved once the env's observation space is final.
+
+        Args:
+            name: str, name of the channels
+            size: int, number of channels
+
+        Returns:
+            slice of the reserved channels in the observation
+        """
+        key, i = name, 1
+        while key in self.ob_extra:  # e.g. the same wrapper applied twice
+            key, i = name + str(i), i + 1
+        ob_shape = self.observation_space.shape
+        if len(ob_shape) != 1:
+            raise ValueError('Can only reserve channels of 1-D observations,'
+                             ' got shape ' + str(ob_shape))
+        start = ob_shape[0] + self._n_ob_extra
+        self.ob_extra[key] = slice(start, start + size)
+        self.ob_dict[key] = range(start, start + size)
+        self._n_ob_extra += size
+        return self.ob_extra[key]
+
 
 class PeriodEnv(TrialEnv):
     """Environment class with trial/period structure."""
@@ -197,17 +372,48 @@ class PeriodEnv(TrialEnv):
             r_tmax=r_tmax)
 
         self.gt = None
+        self._ob_cols = slice(None)  # channels owned by the env
+        # Lazy observation, see set_lazy
+        self._ob = None
+        self._lazy = False
+        self._ob_ops = None  # recorded operations of a lazy trial
+        self._ob_block = (0, 0, None)  # synthesized rows (start, end, ob)
 
         self.timing = {}
         self.start_t = dict()
         self.end_t = dict()
         self.start_ind = dict()
         self.end_ind = dict()
+        # Values of the discrete trial variables, see condition_space
+        self.trial_vars = dict()
 
     def __str__(self):
         """Information about task."""
         return env_string(self)
 
+    def condition_space(self, keys=None):
+        """Conditions of the task, combinations of trial variable values.
+
+        Trial variables are declared in self.trial_vars, a dict of the list
+        of values of each variable, and can be passed to new_trial as
+        keyword arguments.
+
+        Args:
+            keys: list of str, variables defining the conditions, default
+                all declared variables
+
+        Returns:
+            conditions: list of dicts of variable values, one per condition,
+                in the order of itertools.product
+        """
+        keys = list(self.trial_vars) if keys is None else list(keys)
+        if len(keys) == 0:
+            raise ValueError('{:s} does not declare trial variables'.format(
+                type(self).__name__))
+        values = [self.trial_vars[key] for key in keys]
+        return [dict(zip(keys, value))
+                for value in itertools.product(*values)]
+
     def new_trial(self, **kwargs):
         """Public interface for starting a new trial.
 
@@ -217,15 +423,6 @@ class PeriodEnv(TrialEnv):
         """
         raise NotImplementedError('new_trial is not defined by user.')
 
-    def _step(self, action):
-        """Private interface for the environment.
-
-        Receives an action and returns a new state, a reward, a flag variable
-        indicating whether the experiment has ended and a dictionary with
-        useful information
-        """
-        raise NotImplementedError('_step is not defined by user.')
-
     def sample_time(self, period):
         dist, args = self.timing[period]
         if dist == 'uniform':
@@ -300,17 +497,105 @@ class PeriodEnv(TrialEnv):
         """Initialize trial info with tmax, tind, obs"""
         tmax_ind = int(tmax/self.dt)
         self.tmax = tmax_ind * self.dt
-        self.ob = np.zeros([tmax_ind] + list(self.observation_space.shape),
-                           dtype=self.observation_space.dtype)
+        ob_shape = list(self.observation_space.shape)
+        if self._n_ob_extra:
+            self._ob_cols = slice(0, ob_shape[0])
+            ob_shape[0] += self._n_ob_extra
+        self._ob_shape = [tmax_ind] + ob_shape
+        if self._lazy:
+            self.ob = None
+            self._ob_ops = list()
+            self._ob_block = (0, 0, None)
+        else:
+            self.ob = np.zeros(self._ob_shape,
+                               dtype=self.observation_space.dtype)
         self.gt = np.zeros([tmax_ind] + list(self.action_space.shape),
                            dtype=self.action_space.dtype)
 
+    def set_lazy(self, lazy=True):
+        """Switch lazy observation mode on or off.
+
+        In lazy mode, the calls to add_ob, set_ob and add_randn made by
+        new_trial are recorded instead of filling the observation array. The
+        observation of each step is synthesized, together with the rest of
+        the steps covered by the same periods, when the agent reaches it, so
+        nothing is computed for the part of a trial that is not played
+        (e.g. after an abort). The full observation array is built from the
+        recorded calls, in the same order, as soon as self.ob is accessed
+        (e.g. by Dataset or view_ob).
+
+        Calls with a callable value or without period build the full array
+        at once. Noise is drawn when the observation is synthesized, so it
+        differs from the default mode when steps are synthesized
+        progressively.
+        """
+        self._lazy = lazy
+
+    @property
+    def ob(self):
+        if self._ob_ops is not None:
+            self._materialize_ob()
+        return self._ob
+
+    @ob.setter
+    def ob(self, value):
+        self._ob = value
+        self._ob_ops = None
+
+    def _synthesize_ob(self, start, end):
+        """Observation of steps [start, end) from the recorded operations."""
+        ob = np.zeros([end - start] + self._ob_shape[1:],
+                      dtype=self.observation_space.dtype)
+        for kind, value, period, where in self._ob_ops:
+            p_start, p_end = self.start_ind[period], self.end_ind[period]
+            lo, hi = max(start, p_start), min(end, p_end)
+            if lo >= hi:
+                continue
+            view = ob[lo-start:hi-start, self._ob_cols]
+            if isinstance(where, str):
+                where = self.ob_dict[where]
+            index = Ellipsis if where is None else (Ellipsis, where)
+            if kind == 'randn':
+                mu, sigma = value
+                shape = view[index].shape
+                view[index] += mu + self.rng.randn(*shape) * sigma
+                continue
+            if kind == 'set':
+                view[index] *= 0
+            if (np.ndim(value) == view[index].ndim and
+                    np.shape(value)[0] == p_end - p_start):
+                # Value of every step of the period
+                value = value[lo-p_start:hi-p_start]
+            view[index] += value
+        return ob
+
+    def _materialize_ob(self):
+        ob = self._synthesize_ob(0, self._ob_shape[0])
+        self.ob = ob
+
+    def _record_ob(self, kind, value, period, where):
+        """Record an operation on the observation of a lazy trial.
+
+        Returns False if the operation has to be applied to the full array.
+        """
+        if self._ob_ops is None or period is None or callable(value):
+            return False
+        assert self._trial_built, 'Trial was not succesfully built.' +\
+            ' (Hint: make last_period=True when adding the last period)'
+        self._ob_ops.append((kind, value, period, where))
+        self._ob_block = (0, 0, None)
+        return True
+
     def view_ob(self, period=None):
-        """View observation of an period."""
+        """View observation of an period.
+
+        Only the env's own channels are viewed, not the reserved ones.
+        """
         if period is None:
-            return self.ob
+            return self.ob[:, self._ob_cols]
         else:
-            return self.ob[self.start_ind[period]:self.end_ind[period]]
+            return self.ob[self.start_ind[period]:self.end_ind[period],
+                           self._ob_cols]
 
     def _add_ob(self, value, period=None, where=None, reset=False):
         """Set observation in period to value.
@@ -327,6 +612,8 @@ class PeriodEnv(TrialEnv):
                 self._add_ob(value, p, where, reset=reset)
             return
 
+        if self._record_ob('set' if reset else 'add', value, period, where):
+            return
         assert self._trial_built, 'Trial was not succesfully built.' +\
             ' (Hint: make last_period=True when adding the last period)'
         # self.ob[self.start_ind[period]:self.end_ind[period]] = value
@@ -367,6 +654,8 @@ class PeriodEnv(TrialEnv):
                 self.add_randn(mu, sigma, p, where)
             return
 
+        if self._record_ob('randn', (mu, sigma), period, where):
+            return
         ob = self.view_ob(period=period)
         if where is None:
             ob += mu + self.rng.randn(*ob.shape) * sigma
@@ -399,13 +688,155 @@ class PeriodEnv(TrialEnv):
 
     @property
     def ob_now(self):
-        return self.ob[self.t_ind]
+        if self._ob_ops is None:
+            return self._ob[self.t_ind]
+        # Lazy trial, synthesize the steps until the next period boundary
+        start, end, ob = self._ob_block
+        t_ind = self.t_ind
+        if not start <= t_ind < end:
+            bounds = set(self.start_ind.values()) | set(self.end_ind.values())
+            start = max([b for b in bounds if b <= t_ind] + [0])
+            end = min([b for b in bounds if b > t_ind] + [self._ob_shape[0]])
+            ob = self._synthesize_ob(start, end)
+            self._ob_block = (start, end, ob)
+        return ob[t_ind - start]
 
     @property
     def gt_now(self):
         return self.gt[self.t_ind]
 
 
+class BatchEnv(BaseEnv):
+    """Environment class stepping n_envs copies of a task together.
+
+    The copies run independent trials: trial variables are stored in
+    self.trial, and period boundaries in self.start_ind and self.end_ind, as
+    arrays of shape (n_envs,). Periods follow each other in the order of
+    self.periods, with durations sampled from self.timing. A copy starts a
+    new trial as soon as its trial ends.
+
+    Spaces follow gym.vector: single_observation_space and
+    single_action_space are those of one copy, observation_space and
+    action_space are batched. step takes an array (n_envs,) of actions and
+    returns observations (n_envs, ...), rewards (n_envs,), done (n_envs,)
+    and an info dict with bool array new_trial and array performance, the
+    performance of the trials that ended (NaN for the others).
+
+    Subclasses define new_trial(index, **kwargs), which samples the trial
+    variables of the copies index and passes them to set_trial, and
+    _step(action), which returns observations and rewards. _step can end
+    the trials of some copies early by setting their tmax_ind to t_ind + 1.
+    """
+
+    def __init__(self, n_envs=1, dt=100):
+        super(BatchEnv, self).__init__(dt=dt)
+        self.n_envs = n_envs
+        self.num_tr = 0
+        self.t_ind = np.zeros(n_envs, dtype=int)
+        self.tmax_ind = np.zeros(n_envs, dtype=int)
+        self.performance = np.zeros(n_envs)
+        self.trial = dict()
+        self.ob_dict = {}
+        self.act_dict = {}
+        self.rewards = {}
+
+        self.timing = {}
+        self.periods = []
+        self.start_ind = dict()
+        self.end_ind = dict()
+
+    def set_spaces(self, observation_space, action_space):
+        """Set the spaces of one copy and the batched spaces."""
+        self.single_observation_space = observation_space
+        self.single_action_space = action_space
+        self.observation_space = batch_space(observation_space, self.n_envs)
+        self.action_space = batch_space(action_space, self.n_envs)
+
+    def sample_time(self, period, n):
+        """Durations of period in n trials, see PeriodEnv.sample_time."""
+        dist, args = self.timing[period]
+        if dist == 'uniform':
+            t = self.rng.uniform(*args, size=n)
+        elif dist == 'choice':
+            t = self.rng.choice(args, size=n)
+        elif dist == 'truncated_exponential':
+            t = np.array([tasktools.trunc_exp_new(self.rng, *args)
+                          for _ in range(n)])
+        elif dist == 'constant':
+            t = np.full(n, args, dtype=float)
+        else:
+            raise ValueError('Unknown dist:', str(dist))
+        return (t // self.dt) * self.dt
+
+    def new_trial(self, index, **kwargs):
+        """Start new trials in the copies index (int array).
+
+        Keyword arguments are arrays (len(index),) of trial variables that
+        replace the sampled ones.
+        """
+        raise NotImplementedError('new_trial is not defined by user.')
+
+    def _step(self, action):
+        """Observations and rewards of all copies for actions (n_envs,)."""
+        raise NotImplementedError('_step is not defined by user.')
+
+    def set_trial(self, index, trial):
+        """Set trial variables and periods of the copies index.
+
+        Args:
+            index: int array, copies starting a new trial
+            trial: dict of arrays (len(index), ...), trial variables
+        """
+        for key, value in trial.items():
+            value = np.asarray(value)
+            if key not in self.trial:
+                self.trial[key] = np.zeros((self.n_envs,) + value.shape[1:],
+                                           dtype=value.dtype)
+            self.trial[key][index] = value
+        start = np.zeros(len(index), dtype=int)
+        for period in self.periods:
+            if period not in self.start_ind:
+                self.start_ind[period] = np.zeros(self.n_envs, dtype=int)
+                self.end_ind[period] = np.zeros(self.n_envs, dtype=int)
+            duration = self.sample_time(period, len(index)) // self.dt
+            self.start_ind[period][index] = start
+            start = start + duration.astype(int)
+            self.end_ind[period][index] = start
+        self.tmax_ind[index] = start
+        self.t_ind[index] = 0
+
+    def in_period(self, period):
+        """Bool array (n_envs,), copies currently in period."""
+        return ((self.start_ind[period] <= self.t_ind) &
+                (self.t_ind < self.end_ind[period]))
+
+    def step(self, action):
+        """Public interface for the environment."""
+        obs, reward = self._step(np.asarray(action))
+        self.t_ind += 1
+
+        new_trial = self.t_ind >= self.tmax_ind
+        info = {'new_trial': new_trial,
+                'performance': np.where(new_trial, self.performance, np.nan)}
+        if new_trial.any():
+            index = np.flatnonzero(new_trial)
+            self.performance[index] = 0
+            self.num_tr += len(index)
+            self.new_trial(index)
+        return obs, reward, np.zeros(self.n_envs, dtype=bool), info
+
+    def reset(self):
+        """Start new trials in all copies.
+
+        As TrialEnv.reset, a first step is taken, with action 0.
+        """
+        self.num_tr = 0
+        self.performance[:] = 0
+        self.new_trial(np.arange(self.n_envs))
+        obs, _, _, _ = self.step(np.zeros(self.n_envs, dtype=int))
+        return obs
+
+
 # TODO: How to prevent the repeated typing here?
 class TrialWrapper(gym.Wrapper):
     """Base class for wrapping TrialEnv"""
@@ -451,4 +882,17 @@ class TrialWrapperV2(gym.Wrapper):
         return self.unwrapped
 
     def new_trial(self, **kwargs):
-        raise NotImplementedError
+        trial = self.env.new_trial(**kwargs)
+        self.modify_trial()
+        return trial
+
+    def modify_trial(self):
+        """Trial-level hook, called once after the wrapped env's new_trial.
+
+        Wrappers overriding this method transform the full trial arrays
+        self.unwrapped.ob and self.unwrapped.gt at once (in place or by
+        replacing them), instead of modifying the observation at every
+        step. Because Dataset reads ob and gt right after new_trial,
+        changes made here apply to supervised and RL training alike.
+        """
+        pass
@@ -1,9 +1,7 @@
-import importlib
-from inspect import getmembers, isfunction, isclass
-
 import gym
 from gym.envs.registration import register
 
+from neurogym.envs.registry import REGISTRY
 
 ALL_NATIVE_ENVS = {
     'ContextDecisionMaking-v0':
@@ -48,7 +46,8 @@ ALL_NATIVE_ENVS = {
         'neurogym.envs.nalt_perceptualdecisionmaking:nalt_PerceptualDecisionMaking',
     # 'Combine-v0': 'neurogym.envs.combine:combine',
     # 'IBL-v0': 'neurogym.envs.ibl:IBL',
-    # 'MemoryRecall-v0': 'neurogym.envs.memoryrecall:MemoryRecall',
+    'MemoryRecall-v0':
+        'neurogym.envs.memoryrecall:MemoryRecall',
     'Reaching1D-v0':
         'neurogym.envs.reaching:Reaching1D',
     'Reaching1DWithSelfDistraction-v0':
@@ -87,25 +86,10 @@ ALL_PSYCHOPY_ENVS = {
 }
 
 
-# Automatically register all tasks in collections
-def _get_collection_envs():
-    """Register collection tasks in collections folder.
-
-    Each environment is named collection_name.env_name-v0
-    """
-    derived_envs = {}
-    collection_libs = ['perceptualdecisionmaking', 'yang19']
-    for l in collection_libs:
-        lib = 'neurogym.envs.collections.' + l
-        module = importlib.import_module(lib)
-        envs = [name for name, val in getmembers(module) if isfunction(val) or isclass(val)]
-        envs = [env for env in envs if env[0] != '_']  # ignore private members
-        # TODO: check is instance gym.env
-        derived_envs.update({l+'.'+env+'-v0': lib + ':' + env for env in envs})
-    return derived_envs
-
-
-ALL_COLLECTIONS_ENVS = _get_collection_envs()
+# Collection tasks, see neurogym.envs.registry
+ALL_COLLECTIONS_ENVS = {env_id: entry['entry_point']
+                        for env_id, entry in REGISTRY.items()
+                        if entry['group'] == 'collection'}
 
 ALL_ENVS = {
     **ALL_NATIVE_ENVS, **ALL_PSYCHOPY_ENVS
@@ -128,15 +112,19 @@ def all_envs(tag=None, psychopy=False):
 
         new_env_list = list()
         for env in env_list:
-            from_, class_ = envs[env].split(':')
-            imported = getattr(__import__(from_, fromlist=[class_]), class_)
-            env_tag = imported.metadata.get('tags', [])
+            if env in REGISTRY:
+                env_tag = REGISTRY[env]['tags']
+            else:  # not in the static registry yet
+                from_, class_ = envs[env].split(':')
+                imported = getattr(__import__(from_, fromlist=[class_]),
+                                   class_)
+                env_tag = imported.metadata.get('tags', [])
             if tag in env_tag:
                 new_env_list.append(env)
         return new_env_list
 
 
-_all_gym_envs = [env.id for env in gym.envs.registry.all()]
+_all_gym_envs = set(gym.envs.registry.env_specs)
 for env_id, entry_point in ALL_EXTENDED_ENVS.items():
     if env_id not in _all_gym_envs:
         register(id=env_id, entry_point=entry_point)
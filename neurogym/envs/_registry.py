@@ -0,0 +1,367 @@
+"""Static registry of envs.
+
+Generated by python -m neurogym.envs.registry, do not edit.
+"""
+
+REGISTRY = {
+    'AngleReproduction-v0': {
+        'entry_point': 'neurogym.envs.anglereproduction:AngleReproduction',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'delayed response', 'steps action space'],
+        'metadata': {'paper_link': 'https://www.pnas.org/content/114/43/E9115.short', 'paper_name': 'Visual perception as retrospective Bayesian\n        decoding from high- to low-level features'},
+    },
+    'AntiReach-v0': {
+        'entry_point': 'neurogym.envs.antireach:AntiReach',
+        'group': 'native',
+        'tags': ['perceptual', 'steps action space'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nrn1345', 'paper_name': 'Look away: the anti-saccade task and\n        the voluntary control of eye movement'},
+    },
+    'Bandit-v0': {
+        'entry_point': 'neurogym.envs.bandit:Bandit',
+        'group': 'native',
+        'tags': ['n-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41593-018-0147-8', 'paper_name': 'Prefrontal cortex as a meta-reinforcement learning system'},
+    },
+    'CVLearning-v0': {
+        'entry_point': 'neurogym.envs.cv_learning:CVLearning',
+        'group': 'native',
+        'tags': ['perceptual', 'delayed response', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41586-019-0919-7', 'paper_name': 'Discrete attractor dynamics underlies persistent activity in the frontal cortex'},
+    },
+    'ChangingEnvironment-v0': {
+        'entry_point': 'neurogym.envs.changingenvironment:ChangingEnvironment',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised', 'context dependent'],
+        'metadata': {'paper_link': 'https://www.pnas.org/content/113/31/E4531', 'paper_name': 'Hierarchical decision processes that operate\n        over distinct timescales underlie choice and changes in strategy'},
+    },
+    'ContextDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.contextdecisionmaking:ContextDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'context dependent', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nature12742', 'paper_name': 'Context-dependent computation by recurrent\n         dynamics in prefrontal cortex'},
+    },
+    'DawTwoStep-v0': {
+        'entry_point': 'neurogym.envs.dawtwostep:DawTwoStep',
+        'group': 'native',
+        'tags': ['two-alternative'],
+        'metadata': {'paper_link': 'https://www.sciencedirect.com/science/article/pii/S0896627311001255', 'paper_name': 'Model-Based Influences on Humans Choices and Striatal Prediction Errors'},
+    },
+    'DelayComparison-v0': {
+        'entry_point': 'neurogym.envs.delaycomparison:DelayComparison',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.jneurosci.org/content/30/28/9424', 'paper_name': 'Neuronal Population Coding of Parametric\n        Working Memory'},
+    },
+    'DelayMatchCategory-v0': {
+        'entry_point': 'neurogym.envs.delaymatchcategory:DelayMatchCategory',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nature05078', 'paper_name': 'Experience-dependent representation\n        of visual categories in parietal cortex'},
+    },
+    'DelayMatchSample-v0': {
+        'entry_point': 'neurogym.envs.delaymatchsample:DelayMatchSample',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.jneurosci.org/content/jneuro/16/16/5154.full.pdf', 'paper_name': 'Neural Mechanisms of Visual Working Memory\n    in Prefrontal Cortex of the Macaque'},
+    },
+    'DelayMatchSampleDistractor1D-v0': {
+        'entry_point': 'neurogym.envs.delaymatchsample:DelayMatchSampleDistractor1D',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.jneurosci.org/content/jneuro/16/16/5154.full.pdf', 'paper_name': 'Neural Mechanisms of Visual Working Memory\n        in Prefrontal Cortex of the Macaque'},
+    },
+    'DelayPairedAssociation-v0': {
+        'entry_point': 'neurogym.envs.delaypairedassociation:DelayPairedAssociation',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'go-no-go', 'supervised'],
+        'metadata': {'paper_link': 'https://elifesciences.org/articles/43191', 'paper_name': 'Active information maintenance in working memory by a sensory cortex'},
+    },
+    'Detection-v0': {
+        'entry_point': 'neurogym.envs.detection:Detection',
+        'group': 'native',
+        'tags': ['perceptual', 'reaction time', 'go-no-go', 'supervised'],
+        'metadata': {},
+    },
+    'DualDelayMatchSample-v0': {
+        'entry_point': 'neurogym.envs.dualdelaymatchsample:DualDelayMatchSample',
+        'group': 'native',
+        'tags': ['perceptual', 'working memory', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://science.sciencemag.org/content/354/6316/1136', 'paper_name': 'Reactivation of latent working memories with\n        transcranial magnetic stimulation'},
+    },
+    'EconomicDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.economicdecisionmaking:EconomicDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'value-based'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nature04676', 'paper_name': 'Neurons in the orbitofrontal cortex encode\n         economic value'},
+    },
+    'GoNogo-v0': {
+        'entry_point': 'neurogym.envs.gonogo:GoNogo',
+        'group': 'native',
+        'tags': ['delayed response', 'go-no-go', 'supervised'],
+        'metadata': {'paper_link': 'https://elifesciences.org/articles/43191', 'paper_name': 'Active information maintenance in working memory by a sensory cortex'},
+    },
+    'HierarchicalReasoning-v0': {
+        'entry_point': 'neurogym.envs.hierarchicalreasoning:HierarchicalReasoning',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://science.sciencemag.org/content/364/6441/eaav8911', 'paper_name': 'Hierarchical reasoning by neural circuits in the frontal cortex'},
+    },
+    'IntervalDiscrimination-v0': {
+        'entry_point': 'neurogym.envs.intervaldiscrimination:IntervalDiscrimination',
+        'group': 'native',
+        'tags': ['timing', 'working memory', 'delayed response', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.sciencedirect.com/science/article/pii/S0896627309004887', 'paper_name': 'Feature- and Order-Based Timing Representations\n         in the Frontal Cortex'},
+    },
+    'MatchingPenny-v0': {
+        'entry_point': 'neurogym.envs.matchingpenny:MatchingPenny',
+        'group': 'native',
+        'tags': ['two-alternative'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nn1209', 'paper_name': 'Prefrontal cortex and decision making in a\n         mixed-strategy game'},
+    },
+    'MemoryRecall-v0': {
+        'entry_point': 'neurogym.envs.memoryrecall:MemoryRecall',
+        'group': 'native',
+        'tags': ['working memory', 'supervised', 'continuous action space'],
+        'metadata': {'description': 'Binary patterns presented with a storage signal\n        have to be recalled from incomplete or noisy cues at the end of\n        the trial.'},
+    },
+    'MotorTiming-v0': {
+        'entry_point': 'neurogym.envs.readysetgo:MotorTiming',
+        'group': 'native',
+        'tags': ['timing', 'go-no-go', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41593-017-0028-6', 'paper_name': 'Flexible timing by temporal scaling of\n         cortical responses'},
+    },
+    'MultiSensoryIntegration-v0': {
+        'entry_point': 'neurogym.envs.multisensory:MultiSensoryIntegration',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {},
+    },
+    'NAltPerceptualDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.nalt_perceptualdecisionmaking:nalt_PerceptualDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'n-alternative', 'supervised'],
+        'metadata': {'description': 'N-alternative forced choice task in which the subject\n         has to integrate N stimuli to decide which one is higher\n          on average.', 'paper_link': 'https://www.nature.com/articles/nn.2123', 'paper_name': 'Decision-making with multiple alternatives'},
+    },
+    'Nothing-v0': {
+        'entry_point': 'neurogym.envs.nothing:Nothing',
+        'group': 'native',
+        'tags': ['n-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41593-018-0147-8', 'paper_name': 'Prefrontal cortex as a meta-reinforcement learning system'},
+    },
+    'OneTwoThreeGo-v0': {
+        'entry_point': 'neurogym.envs.readysetgo:OneTwoThreeGo',
+        'group': 'native',
+        'tags': ['timing', 'go-no-go', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41593-019-0500-6', 'paper_name': 'Internal models of sensorimotor integration regulate cortical dynamics'},
+    },
+    'PerceptualDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.perceptualdecisionmaking:PerceptualDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.jneurosci.org/content/12/12/4745', 'paper_name': 'The analysis of visual motion: a comparison of\n        neuronal and psychophysical performance'},
+    },
+    'PerceptualDecisionMakingDelayResponse-v0': {
+        'entry_point': 'neurogym.envs.perceptualdecisionmaking:PerceptualDecisionMakingDelayResponse',
+        'group': 'native',
+        'tags': ['perceptual', 'delayed response', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/s41586-019-0919-7', 'paper_name': 'Discrete attractor dynamics underlies persistent activity in the frontal cortex'},
+    },
+    'PostDecisionWager-v0': {
+        'entry_point': 'neurogym.envs.postdecisionwager:PostDecisionWager',
+        'group': 'native',
+        'tags': ['perceptual', 'delayed response', 'confidence'],
+        'metadata': {'paper_link': 'https://science.sciencemag.org/content/324/5928/759.long', 'paper_name': 'Representation of Confidence Associated with a\n         Decision by Neurons in the Parietal Cortex'},
+    },
+    'ProbabilisticReasoning-v0': {
+        'entry_point': 'neurogym.envs.weatherprediction:ProbabilisticReasoning',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nature05852', 'paper_name': 'Probabilistic reasoning by neurons'},
+    },
+    'PulseDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.perceptualdecisionmaking:PulseDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://elifesciences.org/articles/11308', 'paper_name': 'Sources of noise during accumulation of evidence in\n        unrestrained and voluntarily head-restrained rats'},
+    },
+    'Reaching1D-v0': {
+        'entry_point': 'neurogym.envs.reaching:Reaching1D',
+        'group': 'native',
+        'tags': ['motor', 'steps action space'],
+        'metadata': {'paper_link': 'https://science.sciencemag.org/content/233/4771/1416', 'paper_name': 'Neuronal population coding of movement direction'},
+    },
+    'Reaching1DWithSelfDistraction-v0': {
+        'entry_point': 'neurogym.envs.reaching:Reaching1DWithSelfDistraction',
+        'group': 'native',
+        'tags': ['motor', 'steps action space'],
+        'metadata': {'description': 'The agent has to reproduce the angle indicated\n         by the observation. Furthermore, the reaching state itself\n         generates strong inputs that overshadows the actual target input.'},
+    },
+    'ReachingDelayResponse-v0': {
+        'entry_point': 'neurogym.envs.reachingdelayresponse:ReachingDelayResponse',
+        'group': 'native',
+        'tags': ['perceptual', 'delayed response', 'continuous action space', 'multidimensional action space', 'supervised'],
+        'metadata': {},
+    },
+    'ReadySetGo-v0': {
+        'entry_point': 'neurogym.envs.readysetgo:ReadySetGo',
+        'group': 'native',
+        'tags': ['timing', 'go-no-go', 'supervised'],
+        'metadata': {'paper_link': 'https://www.sciencedirect.com/science/article/pii/S0896627318304185', 'paper_name': 'Flexible Sensorimotor Computations through Rapid\n        Reconfiguration of Cortical Dynamics'},
+    },
+    'SingleContextDecisionMaking-v0': {
+        'entry_point': 'neurogym.envs.contextdecisionmaking:SingleContextDecisionMaking',
+        'group': 'native',
+        'tags': ['perceptual', 'context dependent', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.nature.com/articles/nature12742', 'paper_name': 'Context-dependent computation by recurrent\n         dynamics in prefrontal cortex'},
+    },
+    'psychopy.RandomDotMotion-v0': {
+        'entry_point': 'neurogym.envs.psychopy.perceptualdecisionmaking:RandomDotMotion',
+        'group': 'psychopy',
+        'tags': ['perceptual', 'two-alternative', 'supervised'],
+        'metadata': {'paper_link': 'https://www.jneurosci.org/content/12/12/4745', 'paper_name': 'The analysis of visual motion: a comparison of\n        neuronal and psychophysical performance'},
+    },
+    'psychopy.VisualSearch-v0': {
+        'entry_point': 'neurogym.envs.psychopy.visualsearch:VisualSearch',
+        'group': 'psychopy',
+        'tags': ['perceptual', 'supervised'],
+        'metadata': {'paper_link': 'https://science.sciencemag.org/content/315/5820/1860', 'paper_name': 'Top-down versus bottom-up control of attention \n        in the prefrontal and posterior parietal cortices'},
+    },
+    'perceptualdecisionmaking.roitman02-v0': {
+        'entry_point': 'neurogym.envs.collections.perceptualdecisionmaking:roitman02',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.ScheduleEnvs-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:ScheduleEnvs',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.TrialWrapperV2-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:TrialWrapperV2',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.anti-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:anti',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.ctxdlydm1-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:ctxdlydm1',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.ctxdlydm2-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:ctxdlydm2',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.ctxdm1-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:ctxdm1',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.ctxdm2-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:ctxdm2',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dlyanti-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dlyanti',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dlydm1-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dlydm1',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dlydm2-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dlydm2',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dlygo-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dlygo',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dm1-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dm1',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dm2-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dm2',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dmc-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dmc',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dms-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dms',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dnmc-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dnmc',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.dnms-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:dnms',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.go-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:go',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.multidlydm-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:multidlydm',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.multidm-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:multidm',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.rtanti-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:rtanti',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+    'yang19.rtgo-v0': {
+        'entry_point': 'neurogym.envs.collections.yang19:rtgo',
+        'group': 'collection',
+        'tags': [],
+        'metadata': {},
+    },
+}
@@ -4,6 +4,7 @@ import numpy as np
 from gym import spaces
 from neurogym.utils import tasktools
 import neurogym as ngym
+from neurogym.utils.ringcode import get_ring_code
 
 
 class AngleReproduction(ngym.PeriodEnv):
@@ -78,7 +79,7 @@ class AngleReproduction(ngym.PeriodEnv):
         self.dec_per_dur = (self.end_ind['go1'] - self.start_ind['go1']) +\
             (self.end_ind['go2'] - self.start_ind['go2'])
 
-    def _step(self, action):
+    def _step_core(self, action):
         ob = self.ob_now
         ob[16:32] = np.cos(self.theta - self.state)
         if action == 1:
@@ -97,7 +98,86 @@ class AngleReproduction(ngym.PeriodEnv):
             norm_rew = (reward-self.rewards['fail'])/(self.rewards['correct']-self.rewards['fail'])
             self.performance += norm_rew/self.dec_per_dur
 
-        return ob, reward, False, {'new_trial': False}
+        return ob, reward, False, None
+
+
+class AngleReproductionBatch(ngym.BatchEnv):
+    r"""AngleReproduction with n_envs copies stepped together.
+
+    The rotation states are an array (n_envs,) and the self channel of all
+    copies is read from the cosine table at once. For the same trials and
+    actions, observations, rewards and performance are those of
+    AngleReproduction.
+    """
+    metadata = AngleReproduction.metadata
+
+    def __init__(self, n_envs=1, dt=100, rewards=None, timing=None):
+        super().__init__(n_envs=n_envs, dt=dt)
+        # 0-31 is angle, 32 go1, 33 go2
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(34,),
+                                   dtype=np.float32),
+                        spaces.Discrete(3))
+        self.ring = get_ring_code(16)
+        self.state = np.full(n_envs, np.pi)
+        self._stim1 = np.zeros((n_envs, 16))
+        self._stim2 = np.zeros((n_envs, 16))
+
+        # Rewards
+        self.rewards = {'correct': +1., 'fail': -0.1}
+        if rewards:
+            self.rewards.update(rewards)
+
+        self.timing = {
+            'fixation': ('constant', 500),
+            'stim1': ('constant', 500),
+            'delay1': ('constant', 500),
+            'stim2': ('constant', 500),
+            'delay2': ('constant', 500),
+            'go1': ('constant', 500),
+            'go2': ('constant', 500)}
+        if timing:
+            self.timing.update(timing)
+        self.periods = ['fixation', 'stim1', 'delay1', 'stim2',
+                        'delay2', 'go1', 'go2']
+
+    def new_trial(self, index, **kwargs):
+        trial = {
+            'ground_truth1': self.rng.uniform(0, np.pi * 2, size=len(index)),
+            'ground_truth2': self.rng.uniform(0, np.pi * 2, size=len(index))
+        }
+        trial.update(kwargs)
+        self.set_trial(index, trial)
+        self.state[index] = np.pi
+        self._stim1[index] = self.ring(self.trial['ground_truth1'][index])
+        self._stim2[index] = self.ring(self.trial['ground_truth2'][index])
+
+    def _step(self, action):
+        in_go1 = self.in_period('go1')
+        in_go2 = self.in_period('go2')
+        ob = np.zeros(self.observation_space.shape, dtype=np.float32)
+        ob[:, :16] = (self._stim1 * self.in_period('stim1')[:, None] +
+                      self._stim2 * self.in_period('stim2')[:, None])
+        ob[:, 16:32] = self.ring(self.state)
+        ob[:, 32] = in_go1
+        ob[:, 33] = in_go2
+
+        self.state += 0.05 * ((action == 1).astype(float) - (action == 2))
+        self.state = np.mod(self.state, 2*np.pi)
+
+        # Ground truth has the dtype of the action space, as in the env
+        gt = np.where(in_go1, self.trial['ground_truth1'],
+                      self.trial['ground_truth2'])
+        gt = gt.astype(self.single_action_space.dtype)
+        in_go = in_go1 | in_go2
+        reward = np.maximum(
+            self.rewards['correct'] - tasktools.circular_dist(self.state-gt),
+            self.rewards['fail'])
+        reward = np.where(in_go, reward, 0)
+        norm_rew = (reward-self.rewards['fail'])/(self.rewards['correct']-self.rewards['fail'])
+        dec_per_dur = (self.end_ind['go1'] - self.start_ind['go1']) +\
+            (self.end_ind['go2'] - self.start_ind['go2'])
+        self.performance += np.where(in_go, norm_rew/dec_per_dur, 0)
+        return ob, reward
 
 
 if __name__ == '__main__':
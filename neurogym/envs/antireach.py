@@ -77,7 +77,7 @@ class AntiReach(ngym.PeriodEnv):
 
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -96,5 +96,5 @@ class AntiReach(ngym.PeriodEnv):
                 else:
                     reward += self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
@@ -16,6 +16,11 @@ class Bandit(ngym.TrialEnv):
 
     The agent has to select between N actions with different reward
     probabilities.
+
+    Args:
+        block_size: int or None, if not None, the rewards of block_size
+            trials are drawn at once, giving the same trials as drawing
+            them trial by trial
     """
     metadata = {
         'paper_link': 'https://www.nature.com/articles/s41593-018-0147-8',
@@ -25,7 +30,7 @@ class Bandit(ngym.TrialEnv):
     }
 
     def __init__(self, dt=100, n_arm=2, probs=(.9, .1), gt_arm=0,
-                 rewards=None, timing=None):
+                 rewards=None, timing=None, block_size=None):
         super().__init__(dt=dt)
         if timing is not None:
             print('Warning: Bandit task does not require timing variable.')
@@ -38,6 +43,7 @@ class Bandit(ngym.TrialEnv):
 
         self.n_arm = n_arm
         self.gt_arm = gt_arm
+        self.block_size = block_size
 
         # Reward probabilities
         self.p_high = probs[0]
@@ -47,13 +53,35 @@ class Bandit(ngym.TrialEnv):
         self.observation_space = spaces.Box(-np.inf, np.inf, shape=(1,),
                                             dtype=np.float32)
 
+    def seed(self, seed=None):
+        self._block = None  # drawn with the previous generator
+        return super().seed(seed)
+
+    def new_block(self, n_trial):
+        """Draw the rewards of the next n_trial trials."""
+        draws = self.rng.rand(n_trial, 2)  # same order as trial by trial
+        self._block = {
+            'rew_high_reward_arm': (draws[:, 0] <
+                                    self.p_high) * self.rewards['correct'],
+            'rew_low_reward_arm': (draws[:, 1] <
+                                   self.p_low) * self.rewards['correct'],
+        }
+        self._block_ind = 0
+
     def new_trial(self, **kwargs):
         # ---------------------------------------------------------------------
         # Trial
         # ---------------------------------------------------------------------
-        rew_high_reward_arm = (self.rng.rand() <
-                               self.p_high) * self.rewards['correct']
-        rew_low_reward_arm = (self.rng.rand() < self.p_low) * self.rewards['correct']
+        if self.block_size is None:
+            rew_high_reward_arm = (self.rng.rand() <
+                                   self.p_high) * self.rewards['correct']
+            rew_low_reward_arm = (self.rng.rand() < self.p_low) * self.rewards['correct']
+        else:
+            if self._block is None or self._block_ind == self.block_size:
+                self.new_block(self.block_size)
+            rew_high_reward_arm = self._block['rew_high_reward_arm'][self._block_ind]
+            rew_low_reward_arm = self._block['rew_low_reward_arm'][self._block_ind]
+            self._block_ind += 1
         self.trial = {
             'rew_high_reward_arm': rew_high_reward_arm,
             'rew_low_reward_arm': rew_low_reward_arm,
@@ -63,9 +91,8 @@ class Bandit(ngym.TrialEnv):
         self.ob = np.zeros((1, self.observation_space.shape[0]))
         self.gt = np.array([self.gt_arm])
 
-    def _step(self, action):
+    def _step_core(self, action):
         trial = self.trial
-        info = {'new_trial': True, 'gt': self.gt}
 
         obs = self.ob[0]
         if action == trial['high_reward_arm']:
@@ -74,4 +101,56 @@ class Bandit(ngym.TrialEnv):
         else:
             reward = trial['rew_low_reward_arm']
 
-        return obs, reward, False, info
+        return obs, reward, True, self.gt
+
+
+class BanditBatch(ngym.BatchEnv):
+    """Bandit with n_envs agents playing independent bandits together.
+
+    Rewards of all copies are drawn at once at every step. See Bandit for
+    the other arguments.
+    """
+    metadata = Bandit.metadata
+
+    def __init__(self, n_envs=1, dt=100, n_arm=2, probs=(.9, .1), gt_arm=0,
+                 rewards=None):
+        super().__init__(n_envs=n_envs, dt=dt)
+        # Rewards
+        self.rewards = {'correct': +1.}
+        if rewards:
+            self.rewards.update(rewards)
+
+        self.n_arm = n_arm
+        self.gt_arm = gt_arm
+
+        # Reward probabilities
+        self.p_high = probs[0]
+        self.p_low = probs[1]
+
+        # Trials are one step long
+        self.timing = {'decision': ('constant', dt)}
+        self.periods = ['decision']
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(1,),
+                                   dtype=np.float32),
+                        spaces.Discrete(n_arm))
+
+    def new_trial(self, index, **kwargs):
+        draws = self.rng.rand(len(index), 2)  # same order as Bandit
+        trial = {
+            'rew_high_reward_arm': (draws[:, 0] <
+                                    self.p_high) * self.rewards['correct'],
+            'rew_low_reward_arm': (draws[:, 1] <
+                                   self.p_low) * self.rewards['correct'],
+            'high_reward_arm': np.full(len(index), self.gt_arm),
+        }
+        trial.update(kwargs)
+        self.set_trial(index, trial)
+
+    def _step(self, action):
+        trial = self.trial
+        obs = np.zeros(self.observation_space.shape, dtype=np.float32)
+        correct = action == trial['high_reward_arm']
+        reward = np.where(correct, trial['rew_high_reward_arm'],
+                          trial['rew_low_reward_arm'])
+        self.performance[correct] = 1
+        return obs, reward
@@ -128,6 +128,11 @@ class ChangingEnvironment(ngym.PeriodEnv):
         self.set_groundtruth(ground_truth, 'decision')
 
     def _step(self, action):
+        obs, reward, new_trial, gt = self._step_core(action)
+        return obs, reward, False, {'new_trial': new_trial, 'gt': gt,
+                                    'context': self.curr_cxt}
+
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -147,8 +152,7 @@ class ChangingEnvironment(ngym.PeriodEnv):
                 else:  # if incorrect
                     reward = self.rewards['fail']
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt,
-                                    'context': self.curr_cxt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -8,17 +8,17 @@ import neurogym as ngym
 from neurogym.wrappers.block import ScheduleEnvs
 from neurogym.utils import scheduler
 from neurogym.core import TrialWrapperV2
-
-
-def _get_dist(original_dist):
-    '''Get the distance in periodic boundary conditions'''
-    return np.minimum(abs(original_dist), 2 * np.pi - abs(original_dist))
+from neurogym.utils.ringcode import get_ring_code
 
 
 def _gaussianbump(loc, theta, strength):
-    dist = _get_dist(loc - theta)  # periodic boundary
-    dist /= np.pi / 8
-    return 0.8 * np.exp(-dist ** 2 / 2) * strength
+    """Gaussian bumps at loc on the ring of preferred angles theta.
+
+    theta is regularly spaced from 0, loc is a float or an array, the bumps
+    have shape loc.shape + theta.shape.
+    """
+    ring = get_ring_code(len(theta), 'gaussian', width=np.pi / 8)
+    return 0.8 * ring(loc) * strength
 
 
 def _cosinebump(loc, theta, strength):
@@ -122,7 +122,7 @@ class _Reach(ngym.PeriodEnv):
 
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -141,7 +141,7 @@ class _Reach(ngym.PeriodEnv):
                 else:
                     reward += self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 class _DMFamily(ngym.PeriodEnv):
@@ -262,7 +262,7 @@ class _DMFamily(ngym.PeriodEnv):
         i_target = i_theta1 if coh1 + self.rng.uniform(-1e-6, 1e-6) > coh2 else i_theta2
         self.set_groundtruth(self.act_dict['choice'][i_target], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -284,7 +284,7 @@ class _DMFamily(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return ob, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return ob, reward, new_trial, gt
 
 
 class _DelayMatch1DResponse(ngym.PeriodEnv):
@@ -390,7 +390,7 @@ class _DelayMatch1DResponse(ngym.PeriodEnv):
                 (ground_truth == 'non-match' and not self.matchgo)):
             self.set_groundtruth(self.act_dict['choice'][i_test_theta], 'decision')
 
-    def _step(self, action, **kwargs):
+    def _step_core(self, action, **kwargs):
         new_trial = False
 
         ob = self.ob_now
@@ -410,7 +410,7 @@ class _DelayMatch1DResponse(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return ob, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return ob, reward, new_trial, gt
 
 
 def _reach(**kwargs):
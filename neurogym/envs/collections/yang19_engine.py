@@ -0,0 +1,346 @@
+"""Batched generation of the yang19 tasks.
+
+The yang19 collection builds every task as ScheduleEnvs over small PeriodEnvs,
+so trials are generated one at a time through several wrapper layers. This
+engine generates trials of any subset of the 20 tasks in batch instead:
+trial variables are sampled as arrays, ring encodings are evaluated once for
+the batch as (n_trials, dim_ring) arrays, and observations are filled with
+period masks over a period layout shared by all tasks.
+
+The observations and ground truth of a trial are the same as those of the
+corresponding env of neurogym.envs.collections.yang19 for the same trial
+variables (see build), optionally followed by rule inputs indicating the
+task. Trial variables and input noise have the distributions of the envs,
+but are drawn from the random number generator in another order, so the
+same seed does not give the same trials as the envs (see sample).
+"""
+
+import numpy as np
+
+from neurogym.envs.collections.yang19 import _gaussianbump
+
+TASKS = ['go', 'rtgo', 'dlygo', 'anti', 'rtanti', 'dlyanti',
+         'dm1', 'dm2', 'ctxdm1', 'ctxdm2', 'multidm',
+         'dlydm1', 'dlydm2', 'ctxdlydm1', 'ctxdlydm2', 'multidlydm',
+         'dms', 'dnms', 'dmc', 'dnmc']
+
+# Periods of all tasks in order, a task uses a subset of them
+PERIODS = ['fixation', 'stim1', 'stimulus', 'sample', 'delay', 'stim2',
+           'test', 'decision']
+
+
+def _reach_spec(anti, reaction=False, delay=0):
+    if reaction:
+        timing = {'fixation': 500, 'decision': 500}
+    else:
+        timing = {'fixation': 500, 'stimulus': 500, 'delay': delay,
+                  'decision': 500}
+    return {'family': 'reach', 'anti': anti, 'reaction': reaction,
+            'timing': timing}
+
+
+def _dm_spec(w_mod, stim_mod, delay=False):
+    if delay:
+        cohs = [0.3, 0.6, 1.0]
+        timing = {'fixation': (200, 500), 'stim1': 500, 'delay': 1000,
+                  'stim2': 500, 'decision': 200}
+    else:
+        cohs = [0.08, 0.16, 0.32, 0.64]
+        timing = {'fixation': (200, 500), 'stimulus': 500, 'decision': 200}
+    return {'family': 'dm', 'cohs': np.array(cohs), 'w_mod': w_mod,
+            'stim_mod': stim_mod, 'delaycomparison': delay,
+            'timing': timing}
+
+
+def _match_spec(matchto, matchgo):
+    timing = {'fixation': 300, 'sample': 500, 'delay': 1000, 'test': 500,
+              'decision': 900}
+    return {'family': 'match', 'matchto': matchto, 'matchgo': matchgo,
+            'timing': timing}
+
+
+# Parameters of each task, as set by the functions of yang19
+TASK_SPECS = {
+    'go': _reach_spec(anti=False),
+    'rtgo': _reach_spec(anti=False, reaction=True),
+    'dlygo': _reach_spec(anti=False, delay=500),
+    'anti': _reach_spec(anti=True),
+    'rtanti': _reach_spec(anti=True, reaction=True),
+    'dlyanti': _reach_spec(anti=True, delay=500),
+    'dm1': _dm_spec((1, 1), (True, False)),
+    'dm2': _dm_spec((1, 1), (False, True)),
+    'ctxdm1': _dm_spec((1, 0), (True, True)),
+    'ctxdm2': _dm_spec((0, 1), (True, True)),
+    'multidm': _dm_spec((1, 1), (True, True)),
+    'dlydm1': _dm_spec((1, 1), (True, False), delay=True),
+    'dlydm2': _dm_spec((1, 1), (False, True), delay=True),
+    'ctxdlydm1': _dm_spec((1, 0), (True, True), delay=True),
+    'ctxdlydm2': _dm_spec((0, 1), (True, True), delay=True),
+    'multidlydm': _dm_spec((1, 1), (True, True), delay=True),
+    'dms': _match_spec('sample', True),
+    'dnms': _match_spec('sample', False),
+    'dmc': _match_spec('category', True),
+    'dnmc': _match_spec('category', False),
+}
+
+# Trial variables, all int arrays of shape (n_trials,) unless noted
+TRIAL_KEYS = [
+    'task',  # index in tasks
+    'modality',  # modality of the stimulus (reach and match families)
+    'ground_truth',  # index of the target on the ring, -1 if no response
+    'i_theta1', 'i_theta2',  # ring index of the two stimuli
+    'coh1_mod1', 'coh2_mod1', 'coh1_mod2', 'coh2_mod2',  # float strengths
+]
+
+
+class Yang19Engine(object):
+    """Generate batches of trials of yang19 tasks.
+
+    Args:
+        tasks: list of task names (see TASKS), default all tasks
+        dt: time step (ms)
+        dim_ring: int, number of units of each ring
+        sigma: float, input noise, scaled by 1/sqrt(dt) as in the envs
+        rule_input: bool, if True, one input per task indicating the task
+            of the trial is added after the task inputs
+        seed: int or None, seed of the random number generator
+    """
+
+    def __init__(self, tasks=None, dt=100, dim_ring=16, sigma=1.0,
+                 rule_input=False, seed=None):
+        self.tasks = list(TASKS if tasks is None else tasks)
+        for task in self.tasks:
+            if task not in TASK_SPECS:
+                raise ValueError('Unknown yang19 task ' + str(task))
+        self.dt = dt
+        self.dim_ring = dim_ring
+        self.half_ring = dim_ring // 2
+        self.sigma = sigma / np.sqrt(dt)
+        self.rule_input = rule_input
+        self.theta = np.linspace(0, 2 * np.pi, dim_ring + 1)[:-1]
+        self.n_ob = 1 + 2 * dim_ring + (len(self.tasks) if rule_input else 0)
+        self.n_act = 1 + dim_ring
+        self.rng = np.random.RandomState(seed)
+
+    def seed(self, seed=None):
+        self.rng = np.random.RandomState(seed)
+
+    def sample(self, n_trials, task=None):
+        """Sample trial variables.
+
+        Variables are drawn as arrays per task, with the distributions used
+        by the envs (e.g. two different stimuli for the dm family, a random
+        sample and a matching or non-matching test for the match family).
+        The draws are ordered differently than in the envs, which draw the
+        variables of one trial at a time, so for the same seed the trials
+        differ from those of the envs. To reproduce trials of an env, pass
+        its trial variables to build.
+
+        Args:
+            n_trials: int, number of trials
+            task: int array (n_trials,) of task indices, random if None
+
+        Returns:
+            trials: dict of arrays (n_trials,), see TRIAL_KEYS, and
+                'durations', int array (n_trials, len(PERIODS)) of period
+                durations in steps
+        """
+        rng = self.rng
+        if task is None:
+            task = rng.randint(len(self.tasks), size=n_trials)
+        task = np.asarray(task)
+        trials = {k: np.zeros(n_trials, dtype=int) for k in TRIAL_KEYS}
+        for k in ['coh1_mod1', 'coh2_mod1', 'coh1_mod2', 'coh2_mod2']:
+            trials[k] = np.zeros(n_trials)
+        trials['task'] = task
+        trials['durations'] = np.zeros((n_trials, len(PERIODS)), dtype=int)
+
+        dim = self.dim_ring
+        for i_task, name in enumerate(self.tasks):
+            ind = np.flatnonzero(task == i_task)
+            n = len(ind)
+            if n == 0:
+                continue
+            spec = TASK_SPECS[name]
+            for i_period, period in enumerate(PERIODS):
+                t = spec['timing'].get(period, 0)
+                if isinstance(t, tuple):
+                    t = rng.uniform(*t, size=n)
+                trials['durations'][ind, i_period] = np.asarray(t) // self.dt
+
+            if spec['family'] == 'reach':
+                trials['modality'][ind] = rng.randint(2, size=n)
+                trials['ground_truth'][ind] = rng.randint(dim, size=n)
+
+            elif spec['family'] == 'dm':
+                i_theta1 = rng.randint(dim, size=n)
+                i_theta2 = np.mod(i_theta1 + rng.randint(1, dim, size=n), dim)
+                cohs = spec['cohs']
+                total1, total2 = np.zeros(n), np.zeros(n)
+                for mod in [1, 2]:
+                    if not spec['stim_mod'][mod - 1]:
+                        continue
+                    if spec['delaycomparison']:
+                        pair = np.argsort(rng.rand(n, len(cohs)), axis=1)
+                        coh1, coh2 = cohs[pair[:, 0]], cohs[pair[:, 1]]
+                    else:
+                        coh = (rng.choice(cohs, size=n) *
+                               rng.choice([-1, 1], size=n))
+                        coh1, coh2 = 0.5 + coh / 2, 0.5 - coh / 2
+                    trials['coh1_mod' + str(mod)][ind] = coh1
+                    trials['coh2_mod' + str(mod)][ind] = coh2
+                    total1 += spec['w_mod'][mod - 1] * coh1
+                    total2 += spec['w_mod'][mod - 1] * coh2
+                choose1 = total1 + rng.uniform(-1e-6, 1e-6, size=n) > total2
+                trials['i_theta1'][ind] = i_theta1
+                trials['i_theta2'][ind] = i_theta2
+                trials['ground_truth'][ind] = np.where(choose1, i_theta1,
+                                                       i_theta2)
+
+            else:
+                trials['modality'][ind] = rng.randint(2, size=n)
+                match = rng.rand(n) < 0.5
+                i_sample = rng.randint(dim, size=n)
+                if spec['matchto'] == 'category':
+                    sample_category = (i_sample > self.half_ring) * 1
+                    test_category = np.where(match, sample_category,
+                                             1 - sample_category)
+                    i_test = (rng.randint(self.half_ring, size=n) +
+                              test_category * self.half_ring)
+                else:
+                    i_test = np.where(match, i_sample,
+                                      np.mod(i_sample + self.half_ring, dim))
+                respond = match == spec['matchgo']
+                trials['i_theta1'][ind] = i_sample
+                trials['i_theta2'][ind] = i_test
+                trials['ground_truth'][ind] = np.where(respond, i_test, -1)
+        return trials
+
+    def build(self, trials):
+        """Observations and ground truth of trials.
+
+        Without noise (sigma=0), these are the observations and ground truth
+        of the envs for the same trial variables. With noise, the noise is
+        added to the same steps and inputs as in the envs, but drawn for the
+        whole batch at once, so its values differ.
+
+        Args:
+            trials: dict of trial variables, as returned by sample
+
+        Returns:
+            ob: float32 array (n_trials, max_len, n_ob), zero after the end
+                of each trial
+            gt: int array (n_trials, max_len)
+            lengths: int array (n_trials,), number of steps of each trial
+        """
+        durations = np.asarray(trials['durations'])
+        n_trials = len(durations)
+        ends = np.cumsum(durations, axis=1)
+        starts = ends - durations
+        lengths = ends[:, -1]
+        t = np.arange(lengths.max() if n_trials else 0)
+
+        def mask(period):
+            i = PERIODS.index(period)
+            return ((t >= starts[:, i:i+1]) &
+                    (t < ends[:, i:i+1]))[..., None]
+
+        dim = self.dim_ring
+        task = np.asarray(trials['task'])
+        family = np.array([TASK_SPECS[name]['family']
+                           for name in self.tasks])[task]
+        is_reach, is_dm = family == 'reach', family == 'dm'
+        is_match = family == 'match'
+        reaction = np.array([TASK_SPECS[name].get('reaction', False)
+                             for name in self.tasks])[task]
+        anti = np.array([TASK_SPECS[name].get('anti', False)
+                         for name in self.tasks])[task]
+        # One-hot modality of the stimulus (reach and match families)
+        modality = np.eye(2)[trials['modality']][:, :, None]
+
+        ob = np.zeros((n_trials, len(t), self.n_ob), dtype=np.float32)
+        fixation = ob[..., 0:1]
+        stimulus = ob[..., 1:1 + 2 * dim]
+        in_trial = (t < lengths[:, None])[..., None]
+        in_decision = mask('decision')
+
+        # Fixation
+        fixation += in_trial & ~in_decision
+
+        # Reach family: bump at the (anti) target
+        ground_truth = np.asarray(trials['ground_truth'])
+        loc = self.theta[np.maximum(ground_truth, 0)]
+        loc = np.where(anti, np.mod(loc + np.pi, 2 * np.pi), loc)
+        bump = _gaussianbump(loc, self.theta, 1)
+        bump = (modality * bump[:, None, :]).reshape(n_trials, 2 * dim)
+        stim_period = np.where(reaction[:, None, None], in_decision,
+                               mask('stimulus'))
+        stimulus += (is_reach[:, None, None] & stim_period) * bump[:, None]
+
+        # DM family: noise on all inputs and two bumps per modality
+        stim1 = mask('stim1') | mask('stimulus')
+        stim2 = mask('stim2') | mask('stimulus')
+        dm = is_dm[:, None, None]
+        if self.sigma > 0:
+            noise = self.rng.randn(n_trials, len(t), 1 + 2 * dim)
+            ob[..., :1 + 2 * dim] += (dm & (stim1 | stim2)) * noise * self.sigma
+        theta1 = self.theta[trials['i_theta1']]
+        theta2 = self.theta[trials['i_theta2']]
+        for mod in [0, 1]:
+            channels = slice(1 + mod * dim, 1 + (mod + 1) * dim)
+            suffix = '_mod' + str(mod + 1)
+            bump1 = _gaussianbump(theta1, self.theta,
+                                  np.asarray(trials['coh1' + suffix])[:, None])
+            bump2 = _gaussianbump(theta2, self.theta,
+                                  np.asarray(trials['coh2' + suffix])[:, None])
+            ob[..., channels] += ((dm & stim1) * bump1[:, None] +
+                                  (dm & stim2) * bump2[:, None])
+
+        # Match family: sample and test bumps with noise in one modality
+        match = is_match[:, None, None]
+        bump_sample = _gaussianbump(theta1, self.theta, 1)
+        bump_test = _gaussianbump(theta2, self.theta, 1)
+        match_ob = ((match & mask('sample')) * bump_sample[:, None] +
+                    (match & mask('test')) * bump_test[:, None])
+        if self.sigma > 0:
+            match_ob += ((match & (mask('sample') | mask('test'))) *
+                         self.rng.randn(n_trials, len(t), dim) * self.sigma)
+        stimulus += (modality[:, None, :, :] *
+                     match_ob[:, :, None, :]).reshape(n_trials, len(t),
+                                                      2 * dim)
+
+        if self.rule_input:
+            rule = np.eye(len(self.tasks))[task][:, None, :]
+            ob[..., 1 + 2 * dim:] = in_trial * rule
+
+        gt = np.where(in_decision[..., 0] & (ground_truth[:, None] >= 0),
+                      1 + ground_truth[:, None], 0)
+        return ob, gt, lengths
+
+    def generate(self, n_trials, task=None):
+        """Sample and build n_trials trials, see sample and build."""
+        trials = self.sample(n_trials, task=task)
+        ob, gt, lengths = self.build(trials)
+        return ob, gt, lengths, trials
+
+    def batch(self, batch_size=16, seq_len=100):
+        """Sequences of consecutive trials, as returned by Dataset.
+
+        Returns:
+            inputs: float32 array (seq_len, batch_size, n_ob)
+            target: int array (seq_len, batch_size)
+        """
+        inputs = np.zeros((seq_len, batch_size, self.n_ob), dtype=np.float32)
+        target = np.zeros((seq_len, batch_size), dtype=int)
+        pos = np.zeros(batch_size, dtype=int)
+        rows = np.arange(batch_size)[:, None]
+        while pos.min() < seq_len:
+            ob, gt, lengths, _ = self.generate(batch_size)
+            steps = np.arange(ob.shape[1])
+            t = pos[:, None] + steps
+            valid = (steps < lengths[:, None]) & (t < seq_len)
+            row = np.broadcast_to(rows, valid.shape)[valid]
+            inputs[t[valid], row] = ob[valid]
+            target[t[valid], row] = gt[valid]
+            pos += lengths
+        return inputs, target
@@ -48,6 +48,9 @@ class SingleContextDecisionMaking(ngym.PeriodEnv):
         # set action and observation space
         self.theta = np.linspace(0, 2 * np.pi, dim_ring + 1)[:-1]
         self.choices = np.arange(dim_ring)
+        self.trial_vars = {'ground_truth': self.choices,
+                           'other_choice': self.choices,
+                           'coh_0': self.cohs, 'coh_1': self.cohs}
 
         self.observation_space = spaces.Box(
             -np.inf, np.inf, shape=(1 + 2 * dim_ring,), dtype=np.float32)
@@ -93,7 +96,7 @@ class SingleContextDecisionMaking(ngym.PeriodEnv):
 
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         obs = self.ob_now
         gt = self.gt_now
 
@@ -110,7 +113,7 @@ class SingleContextDecisionMaking(ngym.PeriodEnv):
                     reward = self.rewards['correct']
                     self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 class ContextDecisionMaking(ngym.PeriodEnv):
@@ -135,6 +138,10 @@ class ContextDecisionMaking(ngym.PeriodEnv):
         self.contexts = [0, 1]  # index for context inputs
         self.choices = [1, 2]  # left, right choice
         self.cohs = [5, 15, 50]
+        self.trial_vars = {'ground_truth': self.choices,
+                           'other_choice': self.choices,
+                           'context': self.contexts,
+                           'coh_0': self.cohs, 'coh_1': self.cohs}
         self.sigma = sigma / np.sqrt(self.dt)  # Input noise
 
         # Rewards
@@ -204,7 +211,7 @@ class ContextDecisionMaking(ngym.PeriodEnv):
 
         self.set_groundtruth(self.trial['ground_truth'], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         obs = self.ob_now
         gt = self.gt_now
 
@@ -221,5 +228,5 @@ class ContextDecisionMaking(ngym.PeriodEnv):
                     reward = self.rewards['correct']
                     self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
@@ -4,6 +4,7 @@
 import numpy as np
 from gym import spaces
 import neurogym as ngym
+from neurogym.utils.stats import RollingStats
 import matplotlib.pyplot as plt
 
 
@@ -77,7 +78,7 @@ class CVLearning(ngym.PeriodEnv):
         self.curr_perf = 0
         self.trials_day = trials_day
         self.th_perf = th_stage
-        self.day_perf = np.empty(trials_day)
+        self.day_perf = RollingStats(trials_day)
         self.w_keep = [keep_days]*len(self.stages)  # TODO: simplify??
         # number of days to keep an agent on a stage
         # once it has reached th_perf
@@ -86,7 +87,7 @@ class CVLearning(ngym.PeriodEnv):
         # Instantaneous performance (moving window)
         self.inst_perf = 0
         self.perf_len = perf_len  # window length
-        self.mov_perf = np.zeros(perf_len)
+        self.mov_perf = RollingStats(perf_len)
 
         # STAGE VARIABLES
         # stage 0
@@ -240,16 +241,15 @@ class CVLearning(ngym.PeriodEnv):
 
     def set_phase(self):
         # print(self.curr_ph)
-        self.day_perf[self.trials_counter] =\
-            1*(self.rew == self.rewards['correct'])
-        self.mov_perf[self.trials_counter % self.perf_len] =\
-            1*(self.rew == self.rewards['correct'])
+        correct = 1*(self.rew == self.rewards['correct'])
+        self.day_perf.push(correct)
+        self.mov_perf.push(correct)
         self.trials_counter += 1
         self.trials_delay += 1
 
         # Instantaneous perfromace
         if self.trials_counter > self.perf_len:
-            self.inst_perf = np.mean(self.mov_perf)
+            self.inst_perf = self.mov_perf.mean
             if self.inst_perf < self.min_perf and self.curr_ph == 2:
                 if 1 in self.stages:
                     self.curr_ph = 1
@@ -263,8 +263,8 @@ class CVLearning(ngym.PeriodEnv):
         # End of the day
         if self.trials_counter >= self.trials_day:
             self.trials_counter = 0
-            self.curr_perf = np.mean(self.day_perf)
-            self.day_perf = np.empty(self.trials_day)
+            self.curr_perf = self.day_perf.mean
+            self.day_perf.reset()
             self.delay_milestone = self.inc_delays
             # Keeping or changing stage
             if self.curr_perf >= self.th_perf and self.max_delays:
@@ -283,6 +283,17 @@ class CVLearning(ngym.PeriodEnv):
                 self.days_keep -= 1
 
     def _step(self, action):
+        obs, reward, new_trial, gt = self._step_core(action)
+        info = {'new_trial': new_trial, 'gt': gt, 'num_tr': self.num_tr,
+                'curr_ph': self.curr_ph, 'first_rew': self.rew,
+                'keep_stage': self.keep_stage, 'inst_perf': self.inst_perf,
+                'trials_day': self.trials_counter, 'durs': self.dur,
+                'inc_delays': self.inc_delays, 'curr_perf': self.curr_perf,
+                'trials_count': self.trials_counter, 'th_perf': self.th_perf,
+                'num_stps': self.t_ind}
+        return obs, reward, False, info
+
+    def _step_core(self, action):
         # obs, reward, done, info = self.env._step(action)
         # ---------------------------------------------------------------------
 
@@ -320,14 +331,7 @@ class CVLearning(ngym.PeriodEnv):
         if new_trial and self.curr_ph == 0:
             self.action = action
 
-        info = {'new_trial': new_trial, 'gt': gt, 'num_tr': self.num_tr,
-                'curr_ph': self.curr_ph, 'first_rew': self.rew,
-                'keep_stage': self.keep_stage, 'inst_perf': self.inst_perf,
-                'trials_day': self.trials_counter, 'durs': self.dur,
-                'inc_delays': self.inc_delays, 'curr_perf': self.curr_perf,
-                'trials_count': self.trials_counter, 'th_perf': self.th_perf,
-                'num_stps': self.t_ind}
-        return self.ob_now, reward, False, info
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
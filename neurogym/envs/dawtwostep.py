@@ -15,6 +15,11 @@ class DawTwoStep(ngym.TrialEnv):
     to either of two, second-stage states. In turn, these both
     demand another two-option choice, each of which is associated
     with a different chance of receiving reward.
+
+    Args:
+        block_size: int or None, if not None, the transitions, reward
+            switches and rewards of block_size trials are drawn at once,
+            giving the same trials as drawing them trial by trial
     """
     metadata = {
         'paper_link': 'https://www.sciencedirect.com/science/article/' +
@@ -24,7 +29,7 @@ class DawTwoStep(ngym.TrialEnv):
         'tags': ['two-alternative']
     }
 
-    def __init__(self, dt=100, rewards=None, timing=None):
+    def __init__(self, dt=100, rewards=None, timing=None, block_size=None):
         super().__init__(dt=dt)
         if timing is not None:
             print('Warning: Two-step task does not require timing variable.')
@@ -40,6 +45,7 @@ class DawTwoStep(ngym.TrialEnv):
         self.tmax = 3*self.dt
         self.mean_trial_duration = self.tmax
         self.state1_high_reward = True
+        self.block_size = block_size
         # Rewards
         self.rewards = {'abort': -0.1, 'correct': +1.}
         if rewards:
@@ -49,10 +55,57 @@ class DawTwoStep(ngym.TrialEnv):
         self.observation_space = spaces.Box(-np.inf, np.inf, shape=(3,),
                                             dtype=np.float32)
 
+    def seed(self, seed=None):
+        self._block = None  # drawn with the previous generator
+        return super().seed(seed)
+
+    def new_block(self, n_trial):
+        """Draw the next n_trial trials.
+
+        The reward contingency of the trials is computed from the current
+        one, so it can not be changed during the block.
+        """
+        # Same order as trial by trial: transitions, switch, rewards
+        draws = self.rng.rand(n_trial, 5)
+        transition = np.zeros((n_trial, 3))
+        transition[:, self.actions[1]] = np.where(draws[:, 0] < self.p1, 1, 2)
+        transition[:, self.actions[2]] = np.where(draws[:, 1] < self.p2, 2, 1)
+
+        # swtich reward contingency
+        n_switch = np.cumsum(draws[:, 2] < self.p_switch)
+        state1_high_reward = (n_switch % 2 == 0) == self.state1_high_reward
+        hi_state = np.where(state1_high_reward, 0, 1)
+
+        reward = np.zeros((n_trial, 2))
+        ind = np.arange(n_trial)
+        reward[ind, hi_state] = (draws[:, 3] <
+                                 self.high_reward_p) * self.rewards['correct']
+        reward[ind, 1 - hi_state] = (draws[:, 4] <
+                                     self.low_reward_p) * self.rewards['correct']
+        self._block = {'transition': transition, 'reward': reward,
+                       'hi_state': hi_state,
+                       'state1_high_reward': state1_high_reward}
+        self._block_ind = 0
+
     def new_trial(self, **kwargs):
         # ---------------------------------------------------------------------
         # Trial
         # ---------------------------------------------------------------------
+        if self.block_size is not None:
+            if self._block is None or self._block_ind == self.block_size:
+                self.new_block(self.block_size)
+            block, i = self._block, self._block_ind
+            self._block_ind += 1
+            self.state1_high_reward = bool(block['state1_high_reward'][i])
+            hi_state = int(block['hi_state'][i])
+            self.ground_truth = hi_state+1  # assuming p1, p2 >= 0.5
+            self.trial = {
+                'transition': block['transition'][i],
+                'reward': block['reward'][i],
+                'hi_state': hi_state,
+                }
+            return
+
         # determine the transitions
         transition = np.empty((3,))
         st1 = 1
@@ -84,16 +137,16 @@ class DawTwoStep(ngym.TrialEnv):
             'hi_state': hi_state,
             }
 
-    def _step(self, action):
+    def _step_core(self, action):
         trial = self.trial
-        info = {'new_trial': False}
+        new_trial = False
         reward = 0
 
         obs = np.zeros((3,))
         if self.t == 0:  # at stage 1, if action==fixate, abort
             if action == 0:
                 reward = self.rewards['abort']
-                info['new_trial'] = True
+                new_trial = True
             else:
                 state = trial['transition'][action]
                 obs[int(state)] = 1
@@ -103,11 +156,86 @@ class DawTwoStep(ngym.TrialEnv):
             obs[0] = 1
             if action != 0:
                 reward = self.rewards['abort']
-            info['new_trial'] = True
+            new_trial = True
         else:
             raise ValueError('t is not 0 or 1')
 
-        return obs, reward, False, info
+        return obs, reward, new_trial, None
+
+
+class DawTwoStepBatch(ngym.BatchEnv):
+    """DawTwoStep with n_envs agents playing independent tasks together.
+
+    Each copy has its own reward contingency. Transitions and rewards of
+    all copies are drawn at once at every trial start.
+    """
+    metadata = DawTwoStep.metadata
+
+    def __init__(self, n_envs=1, dt=100, rewards=None):
+        super().__init__(n_envs=n_envs, dt=dt)
+        # trial conditions
+        self.p1 = 0.8  # prob of transitioning to state1 with action1 (>=05)
+        self.p2 = 0.8  # prob of transitioning to state2 with action2 (>=05)
+        self.p_switch = 0.025  # switch reward contingency
+        self.high_reward_p = 0.9
+        self.low_reward_p = 0.1
+        self.state1_high_reward = np.ones(n_envs, dtype=bool)
+        # Rewards
+        self.rewards = {'abort': -0.1, 'correct': +1.}
+        if rewards:
+            self.rewards.update(rewards)
+
+        # Trials end after the second stage, or after an abort
+        self.timing = {'stage1': ('constant', dt), 'stage2': ('constant', dt)}
+        self.periods = ['stage1', 'stage2']
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(3,),
+                                   dtype=np.float32),
+                        spaces.Discrete(3))
+
+    def new_trial(self, index, **kwargs):
+        n_trial = len(index)
+        # Same order as DawTwoStep: transitions, switch, rewards
+        draws = self.rng.rand(n_trial, 5)
+        transition = np.zeros((n_trial, 3))
+        transition[:, 1] = np.where(draws[:, 0] < self.p1, 1, 2)
+        transition[:, 2] = np.where(draws[:, 1] < self.p2, 2, 1)
+
+        # swtich reward contingency
+        switch = draws[:, 2] < self.p_switch
+        self.state1_high_reward[index] ^= switch
+        hi_state = np.where(self.state1_high_reward[index], 0, 1)
+
+        reward = np.zeros((n_trial, 2))
+        ind = np.arange(n_trial)
+        reward[ind, hi_state] = (draws[:, 3] <
+                                 self.high_reward_p) * self.rewards['correct']
+        reward[ind, 1 - hi_state] = (draws[:, 4] <
+                                     self.low_reward_p) * self.rewards['correct']
+        trial = {'transition': transition, 'reward': reward,
+                 'hi_state': hi_state}
+        trial.update(kwargs)
+        self.set_trial(index, trial)
+
+    def _step(self, action):
+        trial = self.trial
+        obs = np.zeros(self.observation_space.shape, dtype=np.float32)
+        reward = np.zeros(self.n_envs)
+
+        # at stage 1, if action==fixate, abort
+        stage1 = self.in_period('stage1')
+        abort = stage1 & (action == 0)
+        reward[abort] = self.rewards['abort']
+        self.tmax_ind[abort] = self.t_ind[abort] + 1
+        go = np.flatnonzero(stage1 & (action != 0))
+        state = trial['transition'][go, action[go]].astype(int)
+        obs[go, state] = 1
+        reward[go] = trial['reward'][go, state - 1]
+        self.performance[go] = action[go] == trial['hi_state'][go] + 1
+
+        stage2 = ~stage1
+        obs[stage2, 0] = 1
+        reward[stage2 & (action != 0)] = self.rewards['abort']
+        return obs, reward
 
 
 if __name__ == '__main__':
@@ -90,7 +90,7 @@ class DelayComparison(ngym.PeriodEnv):
     def scale_n(self, f):
         return (1 - self.scale(f))/2
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -112,7 +112,7 @@ class DelayComparison(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return ob, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return ob, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -87,7 +87,7 @@ class DelayMatchCategory(ngym.PeriodEnv):
 
         self.set_groundtruth(self.act_dict[ground_truth], 'test')
 
-    def _step(self, action, **kwargs):
+    def _step_core(self, action, **kwargs):
         new_trial = False
 
         obs = self.ob_now
@@ -107,7 +107,7 @@ class DelayMatchCategory(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -83,7 +83,7 @@ class DelayMatchSample(ngym.PeriodEnv):
 
         self.set_groundtruth(ground_truth, 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         reward = 0
 
@@ -103,7 +103,7 @@ class DelayMatchSample(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 class DelayMatchSampleDistractor1D(ngym.PeriodEnv):
@@ -183,7 +183,7 @@ class DelayMatchSampleDistractor1D(ngym.PeriodEnv):
 
         self.set_groundtruth(1, 'test'+str(ground_truth))
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         reward = 0
 
@@ -203,4 +203,4 @@ class DelayMatchSampleDistractor1D(ngym.PeriodEnv):
                 new_trial = True
                 self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
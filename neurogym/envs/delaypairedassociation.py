@@ -81,7 +81,7 @@ class DelayPairedAssociation(ngym.PeriodEnv):
         self.r_tmax = self.rewards['miss']*self.trial['ground_truth']
         self.performance = 1-self.trial['ground_truth']
 
-    def _step(self, action, **kwargs):
+    def _step_core(self, action, **kwargs):
         # ---------------------------------------------------------------------
         # Reward and observations
         # ---------------------------------------------------------------------
@@ -105,7 +105,7 @@ class DelayPairedAssociation(ngym.PeriodEnv):
                     self.performance = 0
                 new_trial = True
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -125,15 +125,13 @@ class Detection(ngym.PeriodEnv):
             dec = self.view_groundtruth('stimulus')
             dec[delay:] = 1
 
-    def _step(self, action):
+    def _step_core(self, action):
         """
-        _step receives an action and returns:
+        _step_core receives an action and returns:
             a new observation, obs
             reward associated with the action, reward
-            a boolean variable indicating whether the experiment has end, done
-            a dictionary with extra information:
-                ground truth correct response, info['gt']
-                boolean indicating the end of the trial, info['new_trial']
+            boolean indicating the end of the trial, new_trial
+            ground truth correct response, gt
         """
         new_trial = False
         # rewards
@@ -155,7 +153,7 @@ class Detection(ngym.PeriodEnv):
                     reward = self.rewards['fail']
                     self.performance = 0
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -105,7 +105,7 @@ class DualDelayMatchSample(ngym.PeriodEnv):
         self.set_groundtruth(ground_truth1, stim_test1_period)
         self.set_groundtruth(ground_truth2, stim_test2_period)
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         reward = 0
 
@@ -132,4 +132,4 @@ class DualDelayMatchSample(ngym.PeriodEnv):
                 new_trial = self.abort
                 reward = self.rewards['abort']
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
\ No newline at end of file
+        return obs, reward, new_trial, gt
\ No newline at end of file
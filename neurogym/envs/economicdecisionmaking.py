@@ -28,6 +28,7 @@ class EconomicDecisionMaking(ngym.PeriodEnv):
         self.juices = [('a', 'b'), ('b', 'a')]
         self.offers = [(0, 1), (1, 3), (1, 2), (1, 1), (2, 1),
                        (3, 1), (4, 1), (6, 1), (2, 0)]
+        self.trial_vars = {'juice': self.juices, 'offer': self.offers}
 
         # Rewards
         self.rewards = {'abort': -0.1, 'correct': +0.22}
@@ -80,7 +81,7 @@ class EconomicDecisionMaking(ngym.PeriodEnv):
         self.add_ob(n1/5., 'offer_on', where='n1')
         self.add_ob(n2/5., 'offer_on', where='n2')
 
-    def _step(self, action):
+    def _step_core(self, action):
         trial = self.trial
 
         new_trial = False
@@ -114,7 +115,7 @@ class EconomicDecisionMaking(ngym.PeriodEnv):
                     reward = r2
                     self.performance = r2 > r1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': 0}
+        return obs, reward, new_trial, 0
 
 
 if __name__ == '__main__':
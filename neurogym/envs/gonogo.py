@@ -69,7 +69,7 @@ class GoNogo(ngym.PeriodEnv):
         # set ground truth during decision period
         self.set_groundtruth(self.trial['ground_truth'], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         reward = 0
         obs = self.ob_now
@@ -88,7 +88,7 @@ class GoNogo(ngym.PeriodEnv):
                     reward = self.rewards['fail']
                     self.performance = 0
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -101,7 +101,7 @@ class HierarchicalReasoning(ngym.PeriodEnv):
         if self.trial_in_block >= self.block_size:
             self.new_block()
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -125,4 +125,4 @@ class HierarchicalReasoning(ngym.PeriodEnv):
         if new_trial:
             self.chose_correct_rule = False
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
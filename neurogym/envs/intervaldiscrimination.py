@@ -61,7 +61,7 @@ class IntervalDiscrimination(ngym.PeriodEnv):
 
         self.set_groundtruth(ground_truth, 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -83,7 +83,7 @@ class IntervalDiscrimination(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -15,6 +15,10 @@ class MatchingPenny(ngym.TrialEnv):
 
     Args:
         learning_rate: learning rate in the mean_action opponent
+        block_size: int or None, if not None, the actions of the random
+            opponent are drawn block_size trials at once, giving the same
+            trials as drawing them trial by trial. The mean_action opponent
+            depends on the agent, its actions are drawn trial by trial.
     """
     metadata = {
         'paper_link': 'https://www.nature.com/articles/nn1209',
@@ -24,7 +28,8 @@ class MatchingPenny(ngym.TrialEnv):
     }
 
     def __init__(self, dt=100, rewards=None, timing=None,
-                 opponent_type='mean_action', learning_rate=0.2):
+                 opponent_type='mean_action', learning_rate=0.2,
+                 block_size=None):
         super().__init__(dt=dt)
         if timing is not None:
             print('Warning: Matching-Penny task does not require' +
@@ -32,6 +37,7 @@ class MatchingPenny(ngym.TrialEnv):
         # TODO: remain to be carefully tested
         # Opponent Type
         self.opponent_type = opponent_type
+        self.block_size = block_size
 
         # Rewards
         self.rewards = {'correct': +1., 'fail': 0.}
@@ -46,13 +52,27 @@ class MatchingPenny(ngym.TrialEnv):
             self.mean_action = 0
             self.lr = learning_rate
 
+    def seed(self, seed=None):
+        self._block = None  # drawn with the previous generator
+        return super().seed(seed)
+
+    def new_block(self, n_trial):
+        """Draw the actions of the random opponent in the next n_trial trials."""
+        self._block = (self.rng.rand(n_trial) > 0.5).astype(int)
+        self._block_ind = 0
+
     def new_trial(self, **kwargs):
         # ---------------------------------------------------------------------
         # Trial (trials are one step long)
         # ---------------------------------------------------------------------
         # TODO: Add more types of opponents
         # determine the transitions
-        if self.opponent_type == 'random':
+        if self.opponent_type == 'random' and self.block_size is not None:
+            if self._block is None or self._block_ind == self.block_size:
+                self.new_block(self.block_size)
+            opponent_action = int(self._block[self._block_ind])
+            self._block_ind += 1
+        elif self.opponent_type == 'random':
             opponent_action = int(self.rng.rand() > 0.5)
         elif self.opponent_type == 'mean_action':
             opponent_action = 1*(not np.round(self.mean_action))
@@ -66,7 +86,7 @@ class MatchingPenny(ngym.TrialEnv):
         self.prev_opp_action = self.trial['opponent_action']
         self.gt = np.array([opponent_action])
 
-    def _step(self, action):
+    def _step_core(self, action):
         trial = self.trial
         obs = self.ob[0]
         if self.opponent_type == 'mean_action':
@@ -77,8 +97,64 @@ class MatchingPenny(ngym.TrialEnv):
         else:
             reward = self.rewards['fail']
 
-        info = {'new_trial': True, 'gt': self.gt}
-        return obs, reward, False, info
+        return obs, reward, True, self.gt
+
+
+class MatchingPennyBatch(ngym.BatchEnv):
+    """MatchingPenny with n_envs agents playing independent opponents.
+
+    Opponent actions of all copies are computed at once at every step. See
+    MatchingPenny for the arguments.
+    """
+    metadata = MatchingPenny.metadata
+
+    def __init__(self, n_envs=1, dt=100, rewards=None,
+                 opponent_type='mean_action', learning_rate=0.2):
+        super().__init__(n_envs=n_envs, dt=dt)
+        if opponent_type not in ['random', 'mean_action']:
+            raise ValueError('Unknown opponent type {:s}'.format(
+                opponent_type))
+        self.opponent_type = opponent_type
+
+        # Rewards
+        self.rewards = {'correct': +1., 'fail': 0.}
+        if rewards:
+            self.rewards.update(rewards)
+
+        # Trials are one step long
+        self.timing = {'decision': ('constant', dt)}
+        self.periods = ['decision']
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(2,),
+                                   dtype=np.float32),
+                        spaces.Discrete(2))
+        self.prev_opp_action = (self.rng.rand(n_envs) > 0.5).astype(int)
+        self.mean_action = np.zeros(n_envs)
+        self.lr = learning_rate
+        self._ob = np.zeros(self.observation_space.shape, dtype=np.float32)
+
+    def new_trial(self, index, **kwargs):
+        if self.opponent_type == 'random':
+            opponent_action = (self.rng.rand(len(index)) > 0.5).astype(int)
+        else:
+            opponent_action = (np.round(self.mean_action[index]) == 0)
+            opponent_action = opponent_action.astype(int)
+        trial = {'opponent_action': opponent_action}
+        trial.update(kwargs)
+        self.set_trial(index, trial)
+
+        self._ob[index] = 0
+        self._ob[index, self.prev_opp_action[index]] = 1
+        self.prev_opp_action[index] = self.trial['opponent_action'][index]
+
+    def _step(self, action):
+        obs = self._ob.copy()
+        if self.opponent_type == 'mean_action':
+            self.mean_action += self.lr*(action-self.mean_action)
+        correct = action == self.trial['opponent_action']
+        reward = np.where(correct, self.rewards['correct'],
+                          self.rewards['fail'])
+        self.performance[correct] = 1
+        return obs, reward
 
 
 if __name__ == '__main__':
@@ -8,6 +8,25 @@ import neurogym as ngym
 
 
 class MemoryRecall(ngym.TrialEnv):
+    r"""Memory recall task.
+
+    Binary patterns are presented in sequence, some of them along with a
+    storage signal. At the end of the trial, the stored patterns are
+    presented again in random order, with some elements unknown (balanced)
+    or flipped, and the agent has to recall them.
+
+    Trials are generated in blocks of block_size trials with array
+    operations, see generate.
+    """
+    metadata = {
+        'description': """Binary patterns presented with a storage signal
+        have to be recalled from incomplete or noisy cues at the end of
+        the trial.""",
+        'paper_link': None,
+        'paper_name': None,
+        'tags': ['working memory', 'supervised', 'continuous action space']
+    }
+
     # TODO: Need to be made more general by passing the memories
     def __init__(
             self,
@@ -20,6 +39,7 @@ class MemoryRecall(ngym.TrialEnv):
             p_recall=0.1,
             chance=0.7,
             balanced=True,
+            block_size=100,
             **kwargs,
     ):
         """
@@ -29,8 +49,10 @@ class MemoryRecall(ngym.TrialEnv):
             T: int, sequence length
             p_recall: proportion of patterns stored for recall
             chance: chance level performance
+            block_size: int, number of trials generated at once
         """
         super(MemoryRecall, self).__init__(dt=dt)
+        self.block_size = block_size
 
         self.stim_dim = stim_dim
         self.store_signal_dim = store_signal_dim
@@ -69,7 +91,6 @@ class MemoryRecall(ngym.TrialEnv):
                                             dtype=np.float32)
 
     def __str__(self):
-        print('Recall dataset:')
         nicename_dict = OrderedDict(
             [('stim_dim', 'Stimulus dimension'),
              ('store_signal_dim', 'Storage signal dimension'),
@@ -88,66 +109,101 @@ class MemoryRecall(ngym.TrialEnv):
         else:
             nicename_dict['p_flip'] = 'Proportion of flipping at recall'
 
-        string = ''
+        string = 'Recall dataset:\n'
         for key, name in nicename_dict.items():
             string += name + ' : ' + str(getattr(self, key)) + '\n'
         return string
 
-    def new_trial(self, **kwargs):
-        stim_dim = self.stim_dim
+    def seed(self, seed=None):
+        self._block = None  # drawn with the previous generator
+        return super().seed(seed)
+
+    def generate(self, n_trials):
+        """Generate n_trials trials at once.
 
-        T = self.generate_T()
+        Trials are padded with zeros to the longest trial.
 
-        T_recall = int(self.p_recall * T)
+        Returns:
+            ob: float32 array (n_trials, max_len, stim_dim + 1), stimuli
+                followed by the storage signal
+            gt: float32 array (n_trials, max_len, stim_dim), patterns to
+                recall
+            mask: float32 array (n_trials, max_len), 1 at recall steps
+            lengths: int array (n_trials,), number of steps of each trial
+        """
+        rng = self.rng
+        stim_dim = self.stim_dim
+        T = rng.randint(self.T_min, self.T_max+1, size=n_trials)
+        T_recall = (self.p_recall * T).astype(int)
         T_store = T - T_recall
+        t = np.arange(T.max())
 
-        X_stim = np.zeros((T, stim_dim))
-        X_store_signal = np.zeros((T, 1))
-        Y = np.zeros((T, stim_dim))
-        M = np.zeros(T)
+        ob = np.zeros((n_trials, len(t), stim_dim + 1), dtype=np.float32)
+        gt = np.zeros((n_trials, len(t), stim_dim), dtype=np.float32)
+        mask = np.zeros((n_trials, len(t)), dtype=np.float32)
 
         # Storage phase
         if self.balanced:
-            X_stim[:T_store, :] =\
-                (self.rng.rand(T_store, stim_dim) > 0.5) * 2.0 - 1.0
+            X_stim = (rng.rand(n_trials, len(t), stim_dim) > 0.5) * 2.0 - 1.0
         else:
-            X_stim[:T_store, :] =\
-                (self.rng.rand(T_store, stim_dim) > 0.5) * 1.0
-
-        store_signal = self.rng.choice(np.arange(T_store), T_recall,
-                                       replace=False)
-        X_store_signal[store_signal, 0] = 1.
+            X_stim = (rng.rand(n_trials, len(t), stim_dim) > 0.5) * 1.0
+        X_stim *= (t < T_store[:, None])[..., None]
+        ob[..., :stim_dim] = X_stim
+
+        # Stored patterns, in order: the first T_recall storage steps of a
+        # random permutation of the storage steps
+        keys = rng.rand(n_trials, len(t))
+        keys[t >= T_store[:, None]] = np.inf
+        n_recall = T_recall.max()
+        store_signal = np.argsort(keys, axis=1)[:, :n_recall]
+        stored = np.arange(n_recall) < T_recall[:, None]
+        trial = np.broadcast_to(np.arange(n_trials)[:, None], stored.shape)
+        trial = trial[stored]
+        store_t = store_signal[stored]
+        recall_t = (T_store[:, None] + np.arange(n_recall))[stored]
+        ob[trial, store_t, stim_dim] = 1.
 
         # Recall phase
-        X_stim_recall = X_stim[store_signal]
-        Y[T_store:, :] = X_stim_recall
-        M[T_store:] = 1.
+        X_stim_recall = X_stim[trial, store_t]
+        gt[trial, recall_t] = X_stim_recall
+        mask[trial, recall_t] = 1.
 
         # Perturb X_stim_recall
         # Flip probability
         if self.balanced:
             known_matrix =\
-                (self.rng.rand(T_recall, stim_dim) > self.p_unknown) * 1.0
-            X_stim[T_store:, :stim_dim] = X_stim_recall * known_matrix
+                (rng.rand(len(trial), stim_dim) > self.p_unknown) * 1.0
+            ob[trial, recall_t, :stim_dim] = X_stim_recall * known_matrix
         else:
-            flip_matrix = self.rng.rand(T_recall, stim_dim) < self.p_flip
-            X_stim[T_store:, :stim_dim] = X_stim_recall * (1 - flip_matrix) + (
+            flip_matrix = rng.rand(len(trial), stim_dim) < self.p_flip
+            ob[trial, recall_t, :stim_dim] = X_stim_recall * (1 - flip_matrix) + (
                         1 - X_stim_recall) * flip_matrix
+        return ob, gt, mask, T
 
-        X = np.concatenate((X_stim, X_store_signal), axis=1)
-        self.ob = X
-        self.gt = Y
-        self.mask = M
+    def new_trial(self, **kwargs):
+        if self._block is None or self._block_ind == self.block_size:
+            self._block = self.generate(self.block_size)
+            self._block_ind = 0
+        ob, gt, mask, lengths = self._block
+        i, T = self._block_ind, lengths[self._block_ind]
+        self._block_ind += 1
+
+        self.ob = ob[i, :T]
+        self.gt = gt[i, :T]
+        self.mask = mask[i, :T]
         self.tmax = T * self.dt
+        T_recall = int(self.mask.sum())
+        self.trial = {'T': T, 'T_store': T - T_recall, 'T_recall': T_recall}
+        self.trial.update(kwargs)
 
-        return X, Y, M
+        return self.ob, self.gt, self.mask
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and observations
         # ---------------------------------------------------------------------
-        obs = self.ob_now
-        gt = self.gt_now
+        obs = self.ob[self.t_ind]
+        gt = self.gt[self.t_ind]
         reward = np.mean(abs(gt - action)) * self.mask[self.t_ind]
-        done = False
-        return obs, reward, done, {'new_trial': False, 'gt': gt}
+        new_trial = self.t_ind == len(self.ob) - 1
+        return obs, reward, new_trial, gt
@@ -81,7 +81,7 @@ class MultiSensoryIntegration(ngym.PeriodEnv):
 
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         obs = self.ob_now
         gt = self.gt_now
 
@@ -98,4 +98,4 @@ class MultiSensoryIntegration(ngym.PeriodEnv):
                     reward = self.rewards['correct']
                     self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
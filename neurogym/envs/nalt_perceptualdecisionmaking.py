@@ -129,15 +129,13 @@ class nalt_PerceptualDecisionMaking(ngym.PeriodEnv):
             self.add_randn(0, self.sigma, 'stimulus', where='stimulus')
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action, **kwargs):
+    def _step_core(self, action, **kwargs):
         """
-        _step receives an action and returns:
+        _step_core receives an action and returns:
             a new observation, obs
             reward associated with the action, reward
-            a boolean variable indicating whether the experiment has end, done
-            a dictionary with extra information:
-                ground truth correct response, info['gt']
-                boolean indicating the end of the trial, info['new_trial']
+            boolean indicating the end of the trial, new_trial
+            ground truth correct response, gt
         """
         # ---------------------------------------------------------------------
         # Reward and observations
@@ -160,7 +158,7 @@ class nalt_PerceptualDecisionMaking(ngym.PeriodEnv):
                     self.performance = 1
                 else:
                     reward = self.rewards['fail']
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
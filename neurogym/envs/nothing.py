@@ -51,9 +51,8 @@ class Nothing(ngym.TrialEnv):
         if self.verbose:
             print('task new trial')
 
-    def _step(self, action):
+    def _step_core(self, action):
         trial = self.trial
-        info = {'new_trial': True, 'gt': self.gt}
 
         obs = self.ob[0]
         if action == trial['high_reward_arm']:
@@ -63,4 +62,4 @@ class Nothing(ngym.TrialEnv):
             reward = trial['rew_low_reward_arm']
         if self.verbose:
             print('task step')
-        return obs, reward, False, info
+        return obs, reward, True, self.gt
@@ -48,6 +48,7 @@ class PerceptualDecisionMaking(ngym.PeriodEnv):
 
         self.theta = np.linspace(0, 2*np.pi, dim_ring+1)[:-1]
         self.choices = np.arange(dim_ring)
+        self.trial_vars = {'ground_truth': self.choices, 'coh': self.cohs}
 
         self.observation_space = spaces.Box(
             -np.inf, np.inf, shape=(1+dim_ring,), dtype=np.float32)
@@ -90,15 +91,13 @@ class PerceptualDecisionMaking(ngym.PeriodEnv):
         # Ground truth
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         """
-        _step receives an action and returns:
+        _step_core receives an action and returns:
             a new observation, obs
             reward associated with the action, reward
-            a boolean variable indicating whether the experiment has end, done
-            a dictionary with extra information:
-                ground truth correct response, info['gt']
-                boolean indicating the end of the trial, info['new_trial']
+            boolean indicating the end of the trial, new_trial
+            ground truth correct response, gt
         """
         new_trial = False
         # rewards
@@ -118,7 +117,7 @@ class PerceptualDecisionMaking(ngym.PeriodEnv):
                 else:
                     reward += self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 #  TODO: there should be a timeout of 1000ms for incorrect trials
@@ -200,7 +199,7 @@ class PerceptualDecisionMakingDelayResponse(ngym.PeriodEnv):
 
         self.set_groundtruth(self.trial['ground_truth'], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and observations
         # ---------------------------------------------------------------------
@@ -222,8 +221,7 @@ class PerceptualDecisionMakingDelayResponse(ngym.PeriodEnv):
             elif action == 3 - gt:  # 3-action is the other act
                 reward = self.rewards['fail']
 
-        info = {'new_trial': new_trial, 'gt': gt}
-        return self.ob_now, reward, False, info
+        return self.ob_now, reward, new_trial, gt
 
 
 class PulseDecisionMaking(ngym.PeriodEnv):
@@ -302,7 +300,7 @@ class PulseDecisionMaking(ngym.PeriodEnv):
         # Ground truth
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -321,7 +319,7 @@ class PulseDecisionMaking(ngym.PeriodEnv):
                 new_trial = self.abort
                 reward += self.rewards['abort']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -97,7 +97,7 @@ class PostDecisionWager(ngym.PeriodEnv):
         # Ground truth
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -130,7 +130,7 @@ class PostDecisionWager(ngym.PeriodEnv):
                 else:
                     reward = self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -2,8 +2,6 @@
 
 import numpy as np
 from gym import spaces
-from psychopy import visual
-
 import neurogym as ngym
 from .psychopy_env import PsychopyEnv
 
@@ -15,6 +13,7 @@ class RandomDotMotion(PsychopyEnv):
     Args:
         stim_scale: Controls the difficulty of the experiment. (def: 1., float)
         dim_ring: int, dimension of ring input and output
+        backend: 'psychopy', 'numpy' or 'auto', see PsychopyEnv
     """
     metadata = {
         'paper_link': 'https://www.jneurosci.org/content/12/12/4745',
@@ -24,8 +23,8 @@ class RandomDotMotion(PsychopyEnv):
     }
 
     def __init__(self, dt=16, win_size=(100, 100), rewards=None, timing=None,
-                 stim_scale=1., dim_ring=2):
-        super().__init__(dt=dt, win_size=win_size)
+                 stim_scale=1., dim_ring=2, backend='auto'):
+        super().__init__(dt=dt, win_size=win_size, backend=backend)
         # The strength of evidence, modulated by stim_scale
         self.cohs = np.array([0, 6.4, 12.8, 25.6, 51.2]) * stim_scale
 
@@ -66,16 +65,14 @@ class RandomDotMotion(PsychopyEnv):
                         last_period=True)
 
         # Observations
-        stim = visual.DotStim(self.win, nDots=30, dotSize=1, speed=0.05,
-                              dotLife=10, signalDots='same',
-                              fieldShape='circle', coherence=(coh/100),
-                              dir=stim_theta * (180/np.pi))
-        self.add_ob(stim, 'stimulus')
+        self.add_dots('stimulus', coherence=coh/100, direction=stim_theta,
+                      n_dots=30, dot_size=1, speed=0.05, dot_life=10,
+                      field_shape='circle')
 
         # Ground truth
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -94,4 +91,4 @@ class RandomDotMotion(PsychopyEnv):
                 else:
                     reward += self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
@@ -1,36 +1,142 @@
 import sys
 
 import numpy as np
-try:
-    from psychopy import visual
-except ImportError as e:
-    raise ImportError('Psychopy is not installed.')
-
 from gym import spaces
 import neurogym as ngym
+from neurogym.envs.psychopy import raster
+
+
+def _import_visual():
+    try:
+        from psychopy import visual
+    except ImportError as e:
+        raise ImportError('Psychopy is not installed.')
+    return visual
 
 
 class PsychopyEnv(ngym.PeriodEnv):
-    """Superclass for environments with psychopy stimuli."""
+    """Superclass for environments with psychopy stimuli.
+
+    Static stimuli are rendered once and kept as sprites in frame_cache,
+    shared by all envs (set to None to render every trial). Sprites are
+    composed with the observation by max blending.
+
+    Args:
+        win_size: tuple, (width, height) of the window in pixels
+        backend: 'psychopy' renders stimuli in a psychopy window, 'numpy'
+            renders them with NumPy (headless, psychopy not needed), 'auto'
+            uses psychopy if it is installed. (def: 'auto')
+    """
+
+    frame_cache = raster.FrameCache()
 
-    def __init__(self, win_size=(100, 100), *args, **kwargs):
+    def __init__(self, win_size=(100, 100), *args, backend='auto', **kwargs):
         super(PsychopyEnv, self).__init__(*args, **kwargs)
 
-        if sys.platform == 'darwin':
-            # TODO: Check if this works across platform
-            win_size = (int(win_size[0]/2), int(win_size[1]/2))
-        self.win = visual.Window(size=win_size, color='black')
-        self.win.backend.winHandle.set_visible(False)
-        self.win.flip()
-        im = self.win._getFrame()
-        value = np.array(im)
-        self._default_ob_value = value[0, 0]
-
-        ob_shape = (self.win.size[0], self.win.size[1], 3)
+        if backend == 'auto':
+            try:
+                _import_visual()
+                backend = 'psychopy'
+            except ImportError:
+                backend = 'numpy'
+        if backend not in ['psychopy', 'numpy']:
+            raise ValueError('Unknown backend ' + str(backend))
+        self.backend = backend
+
+        if backend == 'psychopy':
+            visual = _import_visual()
+            if sys.platform == 'darwin':
+                # TODO: Check if this works across platform
+                win_size = (int(win_size[0]/2), int(win_size[1]/2))
+            self.win = visual.Window(size=win_size, color='black')
+            self.win.backend.winHandle.set_visible(False)
+            self.win.flip()
+            im = self.win._getFrame()
+            value = np.array(im)
+            self._default_ob_value = value[0, 0]
+            win_size = self.win.size
+        else:
+            self.win = None
+            self._default_ob_value = raster.color_to_uint8([-1, -1, -1])
+
+        ob_shape = (win_size[1], win_size[0], 3)  # as returned by _getFrame
         self.observation_space = spaces.Box(0, 255, shape=ob_shape,
                                             dtype=np.uint8)
 
+    def _frame(self):
+        """Empty frame."""
+        return np.full(self.observation_space.shape, self._default_ob_value,
+                       dtype=self.observation_space.dtype)
+
+    def add_dots(self, period, coherence, direction, n_dots=30, dot_size=1,
+                 speed=0.05, dot_life=10, field_shape='circle'):
+        """Add a random dot motion stimulus to a period.
+
+        Args:
+            period: str, period of the stimulus
+            coherence: float, fraction of coherently moving dots (0 to 1)
+            direction: float, direction of motion (degree)
+            Others: see psychopy.visual.DotStim
+        """
+        if self.backend == 'psychopy':
+            visual = _import_visual()
+            stim = visual.DotStim(self.win, nDots=n_dots, dotSize=dot_size,
+                                  speed=speed, dotLife=dot_life,
+                                  signalDots='same', fieldShape=field_shape,
+                                  coherence=coherence, dir=direction)
+            self.add_ob(stim, period)
+            return
+        n_frames = self.end_ind[period] - self.start_ind[period]
+        height, width = self.observation_space.shape[:2]
+        frames = raster.rdm_frames(self.rng, n_frames, coherence, direction,
+                                   height, width, dot_size=dot_size,
+                                   n_dots=n_dots, speed=speed,
+                                   dot_life=dot_life,
+                                   field_shape=field_shape)
+        self.add_ob(frames[0], period)
+
+    def add_lines(self, period, starts, ends, colors, line_width=1):
+        """Add static lines to a period.
+
+        Args:
+            period: str, period of the stimulus
+            starts, ends: arrays (n_lines, 2), line ends in norm units
+            colors: array (n_lines, 3), psychopy rgb colors
+            line_width: float, line width in pixels
+        """
+        shape = self.observation_space.shape
+        sprites = list()
+        for start, end, color in zip(starts, ends, colors):
+            key = raster.line_key(shape, start, end, color, line_width)
+            start, end = key[2], key[3]  # rendered as cached
+
+            def render():
+                if self.backend == 'psychopy':
+                    visual = _import_visual()
+                    stim = visual.Line(self.win, lineWidth=line_width,
+                                       lineColor=tuple(color), start=start,
+                                       end=end)
+                    stim.draw()
+                    self.win.flip()
+                    frame = np.array(self.win._getFrame())
+                else:
+                    frame = np.zeros(shape, dtype=np.uint8)
+                    raster.draw_lines(frame, [start], [end], [color],
+                                      width=line_width)
+                return raster.crop(frame)
+
+            if self.frame_cache is None:
+                sprites.append(render())
+            else:
+                sprites.append(self.frame_cache.get(
+                    (self.backend,) + key, render))
+        raster.compose(self.view_ob(period), sprites)
+
     def add_ob(self, value, period=None, where=None):
+        if self.backend != 'psychopy':
+            super().add_ob(value, period, where)
+            return
+        visual = _import_visual()
         if isinstance(value, visual.BaseVisualStim):
             if where is not None:
                 print('Warning: Setting where to values other than None'
@@ -67,5 +173,3 @@ class PsychopyEnv(ngym.PeriodEnv):
                           dtype=self.observation_space.dtype)
         self.gt = np.zeros([tmax_ind] + list(self.action_space.shape),
                            dtype=self.action_space.dtype)
-
-
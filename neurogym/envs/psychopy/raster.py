@@ -0,0 +1,281 @@
+"""Pure NumPy rendering of the psychopy stimuli used by neurogym envs.
+
+Positions are in psychopy 'norm' units: x and y go from -1 to 1, from the
+left to the right and from the bottom to the top of the window. Colors are
+psychopy rgb colors, with values from -1 (black) to 1 (full intensity).
+Frames are uint8 arrays of shape (height, width, 3), or batches of them with
+shape (n_frames, height, width, 3), as returned by psychopy's
+Window._getFrame.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def color_to_uint8(color):
+    """Convert psychopy rgb color(s) in [-1, 1] to uint8 values."""
+    color = np.clip(np.asarray(color, dtype=float), -1, 1)
+    return np.round((color + 1) * 127.5).astype(np.uint8)
+
+
+def to_pixels(xy, height, width):
+    """Convert positions in norm units to (row, column) pixel coordinates.
+
+    Coordinates are continuous, pixel (i, j) covers [i, i+1) x [j, j+1).
+    """
+    xy = np.asarray(xy, dtype=float)
+    col = (xy[..., 0] + 1) * width / 2
+    row = (1 - xy[..., 1]) * height / 2
+    return row, col
+
+
+def _dot_pixels(xy, height, width, size=1):
+    """Flat pixel indices covered by square dots.
+
+    Args:
+        xy: array (..., n_dots, 2), dot positions in norm units
+
+    Returns:
+        ind: int array, indices into the flattened (..., height, width)
+            frames, one per covered pixel inside the frames
+        n_frames: int, number of frames
+    """
+    lead = xy.shape[:-2]
+    n_frames = int(np.prod(lead))
+    row, col = to_pixels(xy.reshape(n_frames, -1, 2), height, width)
+    offsets = np.arange(size) - (size - 1) // 2
+    if size == 1:
+        row, col = np.floor(row), np.floor(col)
+    else:
+        row = np.floor(row)[..., None, None] + offsets[:, None]
+        col = np.floor(col)[..., None, None] + offsets[None, :]
+        row, col = np.broadcast_arrays(row, col)
+    row, col = row.astype(int), col.astype(int)
+    frame_ind = np.arange(n_frames).reshape((-1,) + (1,) * (row.ndim - 1))
+    ind = (frame_ind * height + row) * width + col
+    inside = (row >= 0) & (row < height) & (col >= 0) & (col < width)
+    return ind[inside], n_frames
+
+
+def splat_dots(xy, height, width, color=(1, 1, 1), size=1):
+    """Render dots into new frames, adding up overlapping dots.
+
+    Args:
+        xy: array (..., n_dots, 2), dot positions in norm units, e.g.
+            (n_trials, n_frames, n_dots, 2)
+        height, width: int, size of the frames in pixels
+        color: psychopy rgb color of the dots
+        size: int, width of the dots in pixels
+
+    Returns:
+        frames: uint8 array (..., height, width, 3)
+    """
+    xy = np.asarray(xy)
+    ind, n_frames = _dot_pixels(xy, height, width, size)
+    # Count dots per covered pixel only, frames are mostly empty
+    ind, counts = np.unique(ind, return_counts=True)
+    value = color_to_uint8(color).astype(np.int64)
+    frames = np.zeros((n_frames * height * width, 3), dtype=np.uint8)
+    frames[ind] = np.minimum(counts[:, None] * value, 255)
+    return frames.reshape(xy.shape[:-2] + (height, width, 3))
+
+
+def draw_lines(frame, starts, ends, colors, width=1):
+    """Draw lines into a frame, in place.
+
+    A pixel belongs to a line if its center is within width/2 pixels of the
+    segment, as for non-antialiased lines drawn by psychopy.
+
+    Args:
+        frame: uint8 array (height, width, 3)
+        starts, ends: arrays (n_lines, 2), line ends in norm units
+        colors: array (n_lines, 3), psychopy rgb colors of the lines
+        width: float, line width in pixels
+    """
+    height, n_col = frame.shape[:2]
+    starts = np.stack(to_pixels(starts, height, n_col), axis=-1)
+    ends = np.stack(to_pixels(ends, height, n_col), axis=-1)
+    colors = color_to_uint8(np.atleast_2d(colors))
+    rows, cols = np.mgrid[:height, :n_col] + 0.5
+    for start, end, color in zip(np.atleast_2d(starts), np.atleast_2d(ends),
+                                 colors):
+        d = end - start
+        t = ((rows - start[0]) * d[0] + (cols - start[1]) * d[1])
+        t = np.clip(t / max(np.dot(d, d), 1e-12), 0, 1)
+        dist2 = ((rows - start[0] - t * d[0])**2 +
+                 (cols - start[1] - t * d[1])**2)
+        frame[dist2 <= (width / 2.)**2] = color
+    return frame
+
+
+def crop(frame):
+    """Sprite of a frame: its bounding box of non-zero pixels.
+
+    Returns:
+        sprite: tuple (row, col, image), image is the part of frame starting
+            at pixel (row, col) that contains all non-zero pixels
+    """
+    rows = np.flatnonzero(np.any(frame, axis=(1, 2)))
+    if len(rows) == 0:
+        return 0, 0, frame[:0, :0].copy()
+    cols = np.flatnonzero(np.any(frame, axis=(0, 2)))
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return r0, c0, frame[r0:r1, c0:c1].copy()
+
+
+def compose(frame, sprites):
+    """Max blend sprites into a frame, or a batch of frames, in place."""
+    for row, col, image in sprites:
+        h, w = image.shape[:2]
+        view = frame[..., row:row+h, col:col+w, :]
+        np.maximum(view, image, out=view)
+    return frame
+
+
+class FrameCache(object):
+    """Cache of rendered sprites, with least recently used eviction by bytes.
+
+    Args:
+        max_bytes: int, maximum bytes of cached images
+    """
+
+    def __init__(self, max_bytes=2**26):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._sprites = OrderedDict()
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, key, render):
+        """Cached sprite of key, rendered with render() if missing.
+
+        Args:
+            key: hashable, parameters of the stimulus, including the frame
+                size
+            render: function returning the sprite, see crop
+        """
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = render()
+        self._sprites[key] = sprite
+        self.nbytes += sprite[2].nbytes
+        while self.nbytes > self.max_bytes and len(self._sprites) > 1:
+            _, (_, _, image) = self._sprites.popitem(last=False)
+            self.nbytes -= image.nbytes
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
+        self.nbytes = 0
+
+
+def line_key(shape, start, end, color, width, decimals=3):
+    """Cache key of a line, positions are rounded to decimals."""
+    return ('line', tuple(shape),
+            tuple(np.round(start, decimals)), tuple(np.round(end, decimals)),
+            tuple(color_to_uint8(color)), width)
+
+
+def _new_dots(rng, shape, field_size, field_shape):
+    """Uniform positions in the field, centered at 0."""
+    if field_shape == 'circle':
+        r = np.sqrt(rng.uniform(0, 1, shape)) * field_size / 2
+        theta = rng.uniform(0, 2 * np.pi, shape)
+        return np.stack([r * np.cos(theta), r * np.sin(theta)], axis=-1)
+    return rng.uniform(-field_size / 2, field_size / 2, tuple(shape) + (2,))
+
+
+def dot_motion_batch(rng, n_frames, coherence, direction, n_dots=30,
+                     speed=0.05, dot_life=10, field_size=1.,
+                     field_shape='circle'):
+    """Positions of the dots of random dot kinematograms of several trials.
+
+    Follows psychopy.visual.DotStim with signalDots='same' and
+    noiseDots='direction': a fraction coherence of the dots moves in
+    direction, the others move in their own random direction. Dots that
+    leave the field or reach the end of their life are redrawn at random
+    positions.
+
+    The state of all trials is kept in (n_trials, n_dots) arrays. Lifetime
+    resets and redrawn positions are computed for all frames at once, only
+    the test for dots leaving the field is done frame by frame.
+
+    Args:
+        rng: np.random.RandomState
+        n_frames: int, number of frames
+        coherence: float or array (n_trials,), fraction of signal dots,
+            from 0 to 1
+        direction: float or array (n_trials,), direction of signal dots
+            (degree)
+        n_dots: int, number of dots
+        speed: float, displacement per frame (norm units)
+        dot_life: int, number of frames a dot lives, -1 for infinite
+        field_size: float, diameter of the field (norm units)
+        field_shape: 'circle' or 'sqr'
+
+    Returns:
+        xy: array (n_trials, n_frames, n_dots, 2), positions in norm units
+    """
+    coherence = np.atleast_1d(np.asarray(coherence, dtype=float))
+    direction = np.atleast_1d(np.asarray(direction, dtype=float))
+    coherence, direction = np.broadcast_arrays(coherence, direction)
+    n_trials = len(coherence)
+    shape = (n_trials, n_dots)
+
+    xy = _new_dots(rng, shape, field_size, field_shape)
+    life = np.abs(dot_life) * rng.uniform(0, 1, shape)
+    dirs = rng.uniform(0, 2 * np.pi, shape)
+    signal = np.arange(n_dots) < (coherence * n_dots).astype(int)[:, None]
+    dirs = np.where(signal, direction[:, None] * np.pi / 180, dirs)
+    step = speed * np.stack([np.cos(dirs), np.sin(dirs)], axis=-1)
+
+    # Frames (counted from 1) at which dots reach the end of their life
+    frames = np.arange(1, n_frames + 1)[:, None, None]
+    if dot_life > 0:
+        first = np.maximum(np.ceil(life), 1)
+        expired = (frames >= first) & ((frames - first) % dot_life == 0)
+    else:
+        expired = np.zeros((n_frames,) + shape, dtype=bool)
+    new_xy = _new_dots(rng, (n_frames,) + shape, field_size, field_shape)
+
+    out = np.empty((n_frames,) + shape + (2,))
+    radius2 = (field_size / 2)**2
+    for i in range(n_frames):
+        xy += step
+        if field_shape == 'circle':
+            dead = np.einsum('...i,...i->...', xy, xy) > radius2
+        else:
+            dead = np.any(np.abs(xy) > field_size / 2, axis=-1)
+        dead |= expired[i]
+        xy = np.where(dead[..., None], new_xy[i], xy)
+        out[i] = xy
+    return out.transpose(1, 0, 2, 3)
+
+
+def rdm_frames(rng, n_frames, coherence, direction, height, width,
+               dot_size=1, color=(1, 1, 1), **kwargs):
+    """Render random dot motion frames of one or several trials at once.
+
+    Args:
+        rng: np.random.RandomState
+        n_frames: int, number of frames per trial
+        coherence, direction: float or array (n_trials,), see
+            dot_motion_batch
+        height, width: int, size of the frames in pixels
+        dot_size: int, width of the dots in pixels
+        color: psychopy rgb color of the dots
+        kwargs: passed to dot_motion_batch
+
+    Returns:
+        frames: uint8 array (n_trials, n_frames, height, width, 3)
+    """
+    xy = dot_motion_batch(rng, n_frames, coherence, direction, **kwargs)
+    return splat_dots(xy, height, width, color=color, size=dot_size)
@@ -2,7 +2,6 @@
 
 import numpy as np
 from gym import spaces
-from psychopy import visual
 
 from .psychopy_env import PsychopyEnv
 
@@ -16,6 +15,7 @@ class VisualSearch(PsychopyEnv):
         delta_angle: float, diff. between sample and distractor angles
         delta_color: 3-tuple, diff. between sample and distractor RGB color
         line_width: float, line width
+        backend: 'psychopy', 'numpy' or 'auto', see PsychopyEnv
     """
     metadata = {
         'paper_link': 'https://science.sciencemag.org/content/315/5820/1860',
@@ -26,8 +26,8 @@ class VisualSearch(PsychopyEnv):
 
     def __init__(self, dt=16, win_size=(100, 100), rewards=None, timing=None,
                  target_centers=None, length=0.3, delta_angle=None,
-                 delta_color=None, line_width=3):
-        super().__init__(dt=dt, win_size=win_size)
+                 delta_color=None, line_width=3, backend='auto'):
+        super().__init__(dt=dt, win_size=win_size, backend=backend)
 
         # Rewards
         self.rewards = {'abort': -0.1, 'correct': +1., 'fail': 0.}
@@ -98,25 +98,20 @@ class VisualSearch(PsychopyEnv):
 
         # Observations
         fixation = (0, 0)
-        for i in range(self.n_target):
-            center = self.trial['centers'][i]
-            angle = self.trial['angles'][i]
-            color = tuple(self.trial['colors'][i])
-            start, end = self._line_startend(center, angle, self.length)
-            stim = visual.Line(self.win, lineWidth=self.lw,
-                               lineColor=color, start=start, end=end)
-            self.add_ob(stim, 'decision')
-
-            if i == 0:
-                start, end = self._line_startend(fixation, angle, self.length)
-                stim = visual.Line(self.win, lineWidth=self.lw,
-                                   lineColor=color, start=start, end=end)
-                self.add_ob(stim, 'sample')
+        angles, colors = self.trial['angles'], self.trial['colors']
+        lines = [self._line_startend(center, angle, self.length)
+                 for center, angle in zip(self.trial['centers'], angles)]
+        starts, ends = zip(*lines)
+        self.add_lines('decision', starts, ends, colors, line_width=self.lw)
+
+        start, end = self._line_startend(fixation, angles[0], self.length)
+        self.add_lines('sample', [start], [end], colors[:1],
+                       line_width=self.lw)
 
         # Ground truth
         self.set_groundtruth(self.trial['ground_truth'], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -135,4 +130,4 @@ class VisualSearch(PsychopyEnv):
                 else:
                     reward += self.rewards['fail']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
@@ -6,6 +6,7 @@ from gym import spaces
 import neurogym as ngym
 
 from neurogym.utils import tasktools
+from neurogym.utils.ringcode import get_ring_code
 
 
 # TODO: Ground truth and action have different space,
@@ -66,9 +67,9 @@ class Reaching1D(ngym.PeriodEnv):
         self.set_groundtruth(self.trial['ground_truth'], 'reach')
         self.dec_per_dur = (self.end_ind['reach'] - self.start_ind['reach'])
 
-    def _step(self, action):
+    def _step_core(self, action):
         ob = self.ob_now
-        ob[16:] = np.cos(self.theta - self.state)
+        ob[16:32] = np.cos(self.theta - self.state)
         if action == 1:
             self.state += 0.05
         elif action == 2:
@@ -86,7 +87,7 @@ class Reaching1D(ngym.PeriodEnv):
             norm_rew = (reward-self.rewards['fail'])/(self.rewards['correct']-self.rewards['fail'])
             self.performance += norm_rew/self.dec_per_dur
 
-        return ob, reward, False, {'new_trial': False}
+        return ob, reward, False, None
 
 
 class Reaching1DWithSelfDistraction(ngym.PeriodEnv):
@@ -150,8 +151,9 @@ class Reaching1DWithSelfDistraction(ngym.PeriodEnv):
         self.set_groundtruth(self.trial['ground_truth'], 'reach')
         self.dec_per_dur = (self.end_ind['reach'] - self.start_ind['reach'])
 
-    def _step(self, action):
-        ob = self.ob_now + np.cos(self.theta - self.state)
+    def _step_core(self, action):
+        ob = self.ob_now.copy()
+        ob[:32] += np.cos(self.theta - self.state)
         if action == 1:
             self.state += 0.05
         elif action == 2:
@@ -168,7 +170,107 @@ class Reaching1DWithSelfDistraction(ngym.PeriodEnv):
             norm_rew = (reward-self.rewards['fail'])/(self.rewards['correct']-self.rewards['fail'])
             self.performance += norm_rew/self.dec_per_dur
 
-        return ob, reward, False, {'new_trial': False}
+        return ob, reward, False, None
+
+
+class _ReachingBatch(ngym.BatchEnv):
+    """Trials and state updates shared by the batched reaching tasks."""
+
+    def __init__(self, n_envs=1, dt=100, rewards=None, timing=None):
+        super().__init__(n_envs=n_envs, dt=dt)
+        # Rewards
+        self.rewards = {'correct': +1., 'fail': -0.1}
+        if rewards:
+            self.rewards.update(rewards)
+
+        self.timing = {
+            'fixation': ('constant', 500),
+            'reach': ('constant', 500)}
+        if timing:
+            self.timing.update(timing)
+        self.periods = ['fixation', 'reach']
+        self.state = np.full(n_envs, np.pi)
+
+    def new_trial(self, index, **kwargs):
+        trial = {
+            'ground_truth': self.rng.uniform(0, np.pi*2, size=len(index))
+        }
+        trial.update(kwargs)
+        self.set_trial(index, trial)
+        self.state[index] = np.pi
+        self._target[index] = self.ring(self.trial['ground_truth'][index])
+
+    def _move(self, action):
+        """Update the states and return the rewards of the reach period."""
+        self.state += 0.05 * ((action == 1).astype(float) - (action == 2))
+        self.state = np.mod(self.state, 2*np.pi)
+
+        # Ground truth has the dtype of the action space, as in the envs
+        gt = self.trial['ground_truth'].astype(self.single_action_space.dtype)
+        in_reach = self.in_period('reach')
+        reward = np.maximum(
+            self.rewards['correct'] - tasktools.circular_dist(self.state-gt),
+            self.rewards['fail'])
+        reward = np.where(in_reach, reward, 0)
+        norm_rew = (reward-self.rewards['fail'])/(self.rewards['correct']-self.rewards['fail'])
+        dec_per_dur = self.end_ind['reach'] - self.start_ind['reach']
+        self.performance += np.where(in_reach, norm_rew/dec_per_dur, 0)
+        return reward
+
+
+class Reaching1DBatch(_ReachingBatch):
+    r"""Reaching1D with n_envs copies stepped together.
+
+    The reaching states are an array (n_envs,) and the self channel of all
+    copies is read from the cosine table at once. For the same trials and
+    actions, observations, rewards and performance are those of Reaching1D.
+    """
+    metadata = Reaching1D.metadata
+
+    def __init__(self, n_envs=1, dt=100, rewards=None, timing=None):
+        super().__init__(n_envs=n_envs, dt=dt, rewards=rewards,
+                         timing=timing)
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(32,),
+                                   dtype=np.float32),
+                        spaces.Discrete(3))
+        self.ob_dict = {'self': range(16, 32),
+                        'target': range(16)}
+        self.act_dict = {'fixation': 0,
+                         'left': 1,
+                         'right': 2,
+                         }
+        self.ring = get_ring_code(16)
+        self._target = np.zeros((n_envs, 16))
+
+    def _step(self, action):
+        ob = np.zeros(self.observation_space.shape, dtype=np.float32)
+        ob[:, :16] = self._target * self.in_period('reach')[:, None]
+        ob[:, 16:32] = self.ring(self.state)
+        return ob, self._move(action)
+
+
+class Reaching1DWithSelfDistractionBatch(_ReachingBatch):
+    r"""Reaching1DWithSelfDistraction with n_envs copies stepped together.
+
+    See Reaching1DBatch.
+    """
+    metadata = Reaching1DWithSelfDistraction.metadata
+
+    def __init__(self, n_envs=1, dt=100, rewards=None, timing=None):
+        super().__init__(n_envs=n_envs, dt=dt, rewards=rewards,
+                         timing=timing)
+        self.set_spaces(spaces.Box(-np.inf, np.inf, shape=(32,),
+                                   dtype=np.float32),
+                        spaces.Discrete(3))
+        self.ring = get_ring_code(32)
+        self._target = np.zeros((n_envs, 32))
+
+    def _step(self, action):
+        # Signal is weaker than the self-distraction
+        ob = np.zeros(self.observation_space.shape, dtype=np.float32)
+        ob += self._target * (0.3 * self.in_period('reach'))[:, None]
+        ob += self.ring(self.state)
+        return ob, self._move(action)
 
 
 if __name__ == '__main__':
@@ -73,7 +73,7 @@ class ReachingDelayResponse(ngym.PeriodEnv):
         self.set_groundtruth([-1, -0.5], ['stimulus', 'delay'])
         self.set_groundtruth([1, ground_truth_stim], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -89,7 +89,7 @@ class ReachingDelayResponse(ngym.PeriodEnv):
                 reward = self.rewards['correct']/((1+abs(action[1]-gt[1]))**2)
                 self.performance = reward/self.rewards['correct']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -79,7 +79,7 @@ class ReadySetGo(ngym.PeriodEnv):
         gt[int(self.trial['production']/self.dt)] = 1
         self.set_groundtruth(gt, 'production')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -108,7 +108,7 @@ class ReadySetGo(ngym.PeriodEnv):
                     reward *= self.rewards['correct']
                     self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 class MotorTiming(ngym.PeriodEnv):
@@ -177,7 +177,7 @@ class MotorTiming(ngym.PeriodEnv):
         gt[int(self.trial['production']/self.dt)] = 1
         self.set_groundtruth(gt, 'production')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -205,7 +205,7 @@ class MotorTiming(ngym.PeriodEnv):
                     reward *= self.rewards['correct']
                     self.performance = 1
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 class OneTwoThreeGo(ngym.PeriodEnv):
@@ -276,7 +276,7 @@ class OneTwoThreeGo(ngym.PeriodEnv):
         # set ground truth
         self.set_groundtruth(self.act_dict['go'], period='response')
 
-    def _step(self, action):
+    def _step_core(self, action):
         # ---------------------------------------------------------------------
         # Reward and inputs
         # ---------------------------------------------------------------------
@@ -304,7 +304,7 @@ class OneTwoThreeGo(ngym.PeriodEnv):
                 new_trial = self.abort
                 reward = self.rewards['abort']
 
-        return obs, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return obs, reward, new_trial, gt
 
 
 if __name__ == '__main__':
@@ -0,0 +1,88 @@
+"""Static registry of envs.
+
+The entry point, tags and metadata of every env are stored in
+neurogym/envs/_registry.py, so that listing and registering envs does not
+import the env modules. The file is generated from the env classes with
+    python -m neurogym.envs.registry
+and has to be regenerated after adding an env or changing its metadata.
+"""
+
+import importlib
+import os
+from inspect import getmembers, isfunction, isclass
+
+from neurogym.envs._registry import REGISTRY
+
+# Collections whose envs are registered as collection_name.env_name-v0
+COLLECTION_LIBS = ['perceptualdecisionmaking', 'yang19']
+
+
+def _entry(env_id, entry_point, group):
+    """Registry entry of an env, importing its module."""
+    from_, class_ = entry_point.split(':')
+    try:
+        env = getattr(importlib.import_module(from_), class_)
+    except ImportError:
+        # Optional dependency missing, keep the previous entry
+        prev = REGISTRY.get(env_id, {})
+        if prev.get('entry_point') == entry_point:
+            return prev
+        env = None
+    metadata = dict(getattr(env, 'metadata', None) or {})
+    tags = list(metadata.pop('tags', []))
+    metadata = {k: v for k, v in metadata.items() if isinstance(v, str)}
+    return {'entry_point': entry_point, 'group': group, 'tags': tags,
+            'metadata': metadata}
+
+
+def collection_envs():
+    """Entry points of collection envs, by inspecting the collection modules.
+
+    Each environment is named collection_name.env_name-v0
+    """
+    derived_envs = {}
+    for l in COLLECTION_LIBS:
+        lib = 'neurogym.envs.collections.' + l
+        module = importlib.import_module(lib)
+        envs = [name for name, val in getmembers(module)
+                if isfunction(val) or isclass(val)]
+        envs = [env for env in envs if env[0] != '_']  # ignore private
+        derived_envs.update({l + '.' + env + '-v0': lib + ':' + env
+                             for env in envs})
+    return derived_envs
+
+
+def build_registry():
+    """Registry of all envs, built by importing their modules."""
+    from neurogym.envs import ALL_NATIVE_ENVS, ALL_PSYCHOPY_ENVS
+    registry = dict()
+    for group, envs in [('native', ALL_NATIVE_ENVS),
+                        ('psychopy', ALL_PSYCHOPY_ENVS),
+                        ('collection', collection_envs())]:
+        for env_id, entry_point in sorted(envs.items()):
+            registry[env_id] = _entry(env_id, entry_point, group)
+    return registry
+
+
+def write_registry(fname=None):
+    """Generate the static registry file."""
+    if fname is None:
+        fname = os.path.join(os.path.dirname(__file__), '_registry.py')
+    registry = build_registry()
+    lines = ['"""Static registry of envs.', '',
+             'Generated by python -m neurogym.envs.registry, do not edit.',
+             '"""', '', 'REGISTRY = {']
+    for env_id, entry in registry.items():
+        lines.append('    {!r}: {{'.format(env_id))
+        for key in ['entry_point', 'group', 'tags', 'metadata']:
+            lines.append('        {!r}: {!r},'.format(key, entry[key]))
+        lines.append('    },')
+    lines.append('}')
+    text = '\n'.join(lines) + '\n'
+    with open(fname, 'w') as f:
+        f.write(text)
+    return registry
+
+
+if __name__ == '__main__':
+    write_registry()
@@ -100,7 +100,7 @@ class ProbabilisticReasoning(ngym.PeriodEnv):
         # Ground truth
         self.set_groundtruth(self.act_dict['choice'][ground_truth], 'decision')
 
-    def _step(self, action):
+    def _step_core(self, action):
         new_trial = False
         # rewards
         reward = 0
@@ -119,4 +119,4 @@ class ProbabilisticReasoning(ngym.PeriodEnv):
                 new_trial = self.abort
                 reward += self.rewards['abort']
 
-        return self.ob_now, reward, False, {'new_trial': new_trial, 'gt': gt}
+        return self.ob_now, reward, new_trial, gt
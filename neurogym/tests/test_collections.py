@@ -1,2 +1,124 @@
 """Test collections of tasks."""
 
+
+import numpy as np
+
+from neurogym.envs.collections import yang19
+from neurogym.envs.collections.yang19_engine import (Yang19Engine, TASKS,
+                                                     PERIODS)
+
+
+def _trial_variables(env, engine):
+    """Variables of the current trial of a yang19 env, as in the engine."""
+    task = env.unwrapped
+    trial = task.trial
+    index = {k: np.argmin(np.abs(engine.theta - trial[k]))
+             for k in ['theta1', 'theta2', 'sample_theta', 'test_theta']
+             if k in trial}
+    gt = task.gt[task.start_ind['decision']] - 1
+    variables = {
+        'modality': getattr(env, 'i_env', 0),
+        'ground_truth': gt,
+        'i_theta1': index.get('theta1', index.get('sample_theta', 0)),
+        'i_theta2': index.get('theta2', index.get('test_theta', 0)),
+        'durations': [task.end_ind.get(p, 0) - task.start_ind.get(p, 0)
+                      for p in PERIODS],
+    }
+    for k in ['coh1_mod1', 'coh2_mod1', 'coh1_mod2', 'coh2_mod2']:
+        variables[k] = trial.get(k, 0)
+    return variables
+
+
+def test_yang19_engine_parity(num_trials=5):
+    """Engine builds the same trials as the yang19 envs without noise."""
+    engine = Yang19Engine(sigma=0)
+    for i_task, name in enumerate(TASKS):
+        kwargs = {} if name in ['go', 'rtgo', 'dlygo', 'anti', 'rtanti',
+                                'dlyanti'] else {'sigma': 0}
+        env = getattr(yang19, name)(**kwargs)
+        env.seed(0)
+        env.reset()
+        for _ in range(num_trials):
+            env.new_trial()
+            variables = _trial_variables(env, engine)
+            trials = {k: np.array([v]) for k, v in variables.items()}
+            trials['task'] = np.array([i_task])
+            ob, gt, lengths = engine.build(trials)
+            task = env.unwrapped
+            assert lengths[0] == task.ob.shape[0], name
+            assert np.allclose(ob[0], task.ob), name
+            assert np.array_equal(gt[0], task.gt), name
+
+
+def test_yang19_engine_batch(batch_size=32, seq_len=200):
+    """Batches of mixed tasks with rule inputs."""
+    engine = Yang19Engine(tasks=['go', 'dm1', 'dlydm2', 'dnmc'],
+                          rule_input=True, seed=0)
+    ob, gt, lengths, trials = engine.generate(100)
+    assert ob.shape == (100, lengths.max(), engine.n_ob)
+    rule = ob[np.arange(100), 0, -4:]
+    assert np.array_equal(rule.argmax(axis=1), trials['task'])
+    inputs, target = engine.batch(batch_size, seq_len)
+    assert inputs.shape == (seq_len, batch_size, engine.n_ob)
+    assert target.shape == (seq_len, batch_size)
+    assert (inputs[..., -4:].sum(axis=-1) == 1).all()
+    assert (target >= 0).all() and (target < engine.n_act).all()
+
+
+def test_yang19_engine_distributions(num_trials=400):
+    """Engine samples trial variables with the distributions of the envs.
+
+    The engine draws from its generator in another order than the envs, so
+    the same seed gives other trials, only their distributions match.
+    """
+    engine = Yang19Engine(seed=0)
+    for i_task, name in enumerate(TASKS):
+        env = getattr(yang19, name)()
+        env.seed(0)
+        env.reset()
+        rows = list()
+        for _ in range(num_trials):
+            env.new_trial()
+            rows.append(_trial_variables(env, engine))
+        trials = engine.sample(num_trials, task=np.full(num_trials, i_task))
+        for key in rows[0]:
+            env_values = np.array([row[key] for row in rows])
+            env_values = env_values.reshape(num_trials, -1)
+            values = np.asarray(trials[key]).reshape(num_trials, -1)
+            for i in range(values.shape[1]):
+                assert np.array_equal(np.unique(env_values[:, i]),
+                                      np.unique(values[:, i])), (name, key)
+            scale = max(np.abs(env_values).max(), 1)
+            assert np.allclose(env_values.mean(axis=0), values.mean(axis=0),
+                               atol=0.1 * scale), (name, key)
+        env_first = np.mean([row['ground_truth'] == row['i_theta1']
+                             for row in rows])
+        first = np.mean(trials['ground_truth'] == trials['i_theta1'])
+        assert abs(env_first - first) < 0.1, name
+
+
+def test_yang19_engine_noise(num_trials=5, sigma=10.):
+    """Engine adds input noise to the same steps and inputs as the envs."""
+    clean_engine = Yang19Engine(sigma=0)
+    engine = Yang19Engine(sigma=sigma, seed=0)
+    for i_task, name in enumerate(TASKS):
+        kwargs = {} if name in ['go', 'rtgo', 'dlygo', 'anti', 'rtanti',
+                                'dlyanti'] else {'sigma': sigma}
+        env = getattr(yang19, name)(**kwargs)
+        env.seed(0)
+        env.reset()
+        for _ in range(num_trials):
+            env.new_trial()
+            variables = _trial_variables(env, engine)
+            trials = {k: np.array([v]) for k, v in variables.items()}
+            trials['task'] = np.array([i_task])
+            clean = clean_engine.build(trials)[0][0]
+            ob = engine.build(trials)[0][0]
+            env_noisy = ~np.isclose(env.unwrapped.ob, clean, rtol=0,
+                                    atol=1e-6)
+            noisy = ~np.isclose(ob, clean, rtol=0, atol=1e-6)
+            assert np.array_equal(env_noisy, noisy), name
+            if noisy.any():
+                std = np.std((ob - clean)[noisy])
+                assert abs(std / engine.sigma - 1) < 0.2, name
+
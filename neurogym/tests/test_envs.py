@@ -6,6 +6,7 @@ All tests in this file can be run by running in command line
 py.test test_envs.py
 """
 
+import time
 import pytest
 
 import numpy as np
@@ -167,5 +168,331 @@ def test_seeding(env, seed):
     return states_mat, rew_mat
 
 
+def test_registry():
+    """Static registry is up to date and used by all_envs and gym.make."""
+    from neurogym.envs.registry import REGISTRY, build_registry
+    assert build_registry() == REGISTRY, \
+        'Run python -m neurogym.envs.registry to update the registry'
+    for env_name in ngym.all_envs(tag='supervised'):
+        assert 'supervised' in gym.make(env_name).metadata['tags']
+    gym.make('yang19.go-v0')
+
+
+def test_lean_step(env='PerceptualDecisionMaking-v0', num_steps=2000):
+    """Lean stepping mode gives the same outputs as the default mode."""
+    outputs = list()
+    for lean in [False, True]:
+        task = gym.make(env, dt=20)
+        task.seed(0)
+        if lean:
+            task.set_lean()
+        task.reset()
+        task.action_space.seed(0)
+        out = list()
+        for stp in range(num_steps):
+            ob, rew, done, info = task.step(task.action_space.sample())
+            out.append((ob.copy(), rew, info['new_trial'], info['gt']))
+            if lean and info.new_trial:
+                assert info.trial is not task.trial
+        outputs.append(out)
+    for (ob1, *rest1), (ob2, *rest2) in zip(*outputs):
+        assert (ob1 == ob2).all() and rest1 == rest2
+    task.set_lean(False)
+    assert isinstance(task.step(0)[3], dict)
+
+
+def test_lean_step_speed(num_steps=1000, num_repeats=7, tolerance=1.05):
+    """Lean stepping mode is not slower than the default mode.
+
+    Step times of single tasks vary by more than the gain of lean mode, so
+    the best times are summed over all registered tasks.
+    """
+    total = {False: 0., True: 0.}
+    for env_name in sorted(ngym.all_envs()):
+        tasks = dict()
+        for lean in [False, True]:
+            task = gym.make(env_name)
+            task.unwrapped.set_lean(lean)
+            tasks[lean] = task
+        tasks[False].action_space.seed(0)
+        actions = [tasks[False].action_space.sample()
+                   for _ in range(num_steps)]
+        best = {False: np.inf, True: np.inf}
+        # Interleave the repeats so that both modes share machine load
+        for _ in range(num_repeats):
+            for lean, task in tasks.items():
+                task.seed(0)
+                task.reset()
+                start = time.perf_counter()
+                for action in actions:
+                    task.step(action)
+                best[lean] = min(best[lean], time.perf_counter() - start)
+        for lean in total:
+            total[lean] += best[lean]
+    assert total[True] <= total[False] * tolerance
+
+
+def test_lazy_ob(env='PerceptualDecisionMaking-v0', num_steps=2000):
+    """Lazy observations equal the default ones in the absence of noise."""
+    outputs = list()
+    for lazy in [False, True]:
+        task = gym.make(env, dt=20, sigma=0)
+        task.seed(0)
+        task.set_lazy(lazy)
+        task.reset()
+        task.action_space.seed(0)
+        outputs.append([task.step(task.action_space.sample())[0].copy()
+                        for _ in range(num_steps)])
+    assert np.array_equal(outputs[0], outputs[1])
+
+    # Full trial is built when accessed
+    task.new_trial()
+    assert task._ob_ops is not None
+    assert task.ob.shape[0] == task.gt.shape[0]
+    assert task._ob_ops is None
+
+    dataset = ngym.Dataset(task, batch_size=4, seq_len=50)
+    inputs, target = dataset()
+    assert inputs.shape[:2] == (50, 4) and np.isfinite(inputs).all()
+
+
+def test_batch_envs(n_envs=4, num_trials=3):
+    """Batched envs match the envs stepped one by one for the same trials."""
+    from neurogym.envs import reaching, anglereproduction
+    pairs = [(reaching.Reaching1D, reaching.Reaching1DBatch),
+             (reaching.Reaching1DWithSelfDistraction,
+              reaching.Reaching1DWithSelfDistractionBatch),
+             (anglereproduction.AngleReproduction,
+              anglereproduction.AngleReproductionBatch)]
+    rng = np.random.RandomState(0)
+    for env_class, batch_class in pairs:
+        batch = batch_class(n_envs=n_envs)
+        batch.seed(0)
+        batch.reset()
+        batch.new_trial(np.arange(n_envs))  # restart at the first step
+        envs = list()
+        for i in range(n_envs):
+            env = env_class()
+            env.reset()
+            env.new_trial(**{k: v[i] for k, v in batch.trial.items()})
+            env.t = env.t_ind = env.performance = 0
+            envs.append(env)
+
+        n_steps = batch.tmax_ind[0]
+        for _ in range(n_steps):
+            actions = rng.randint(3, size=n_envs)
+            ob, reward, done, info = batch.step(actions)
+            assert ob.shape == batch.observation_space.shape
+            for i, env in enumerate(envs):
+                ob_i, reward_i, _, info_i = env.step(actions[i])
+                # Batched envs interpolate the cosine, see RingCode
+                assert np.allclose(ob[i], ob_i, atol=1e-4)
+                assert np.isclose(reward[i], reward_i)
+                assert info['new_trial'][i] == info_i['new_trial']
+                if info_i['new_trial']:
+                    assert np.isclose(info['performance'][i],
+                                      info_i['performance'])
+        assert info['new_trial'].all() and batch.num_tr == n_envs
+
+        for _ in range(num_trials * n_steps):
+            ob, reward, done, info = batch.step(
+                batch.action_space.sample())
+            assert np.isfinite(ob).all() and reward.shape == (n_envs,)
+        assert (batch.t_ind < batch.tmax_ind).all()
+
+
+def _trial_values(trial):
+    # The first DawTwoStep transition (fixation) is not set
+    return [np.atleast_1d(trial[k])[-2:] for k in sorted(trial)]
+
+
+def test_block_mode(num_steps=500, block_size=64):
+    """Block mode gives the same trials as drawing them trial by trial."""
+    from neurogym.envs.bandit import Bandit
+    from neurogym.envs.dawtwostep import DawTwoStep
+    from neurogym.envs.matchingpenny import MatchingPenny
+    for make in [lambda **kw: Bandit(**kw),
+                 lambda **kw: DawTwoStep(**kw),
+                 lambda **kw: MatchingPenny(opponent_type='random', **kw)]:
+        outputs = list()
+        for size in [None, block_size]:
+            env = make(block_size=size)
+            env.seed(0)
+            env.reset()
+            env.action_space.seed(0)
+            out = list()
+            for _ in range(num_steps):
+                ob, reward, done, info = env.step(env.action_space.sample())
+                out.append((ob.copy(), reward, info['new_trial']))
+                if info['new_trial']:
+                    out.append(_trial_values(env.trial))
+            outputs.append(out)
+        for out1, out2 in zip(*outputs):
+            for x1, x2 in zip(out1, out2):
+                assert np.array_equal(x1, x2)
+
+
+def test_batch_single_step(n_envs=8, num_steps=500):
+    """Batched single-step envs match the envs for one copy."""
+    from neurogym.envs import bandit, dawtwostep, matchingpenny
+    pairs = [(bandit.Bandit, bandit.BanditBatch, {}),
+             (dawtwostep.DawTwoStep, dawtwostep.DawTwoStepBatch, {}),
+             (matchingpenny.MatchingPenny, matchingpenny.MatchingPennyBatch,
+              {'opponent_type': 'random'}),
+             (matchingpenny.MatchingPenny, matchingpenny.MatchingPennyBatch,
+              {'opponent_type': 'mean_action'})]
+    rng = np.random.RandomState(0)
+    for env_class, batch_class, kwargs in pairs:
+        env = env_class(**kwargs)
+        batch = batch_class(n_envs=1, **kwargs)
+        env.seed(0)
+        batch.seed(0)
+        if hasattr(env, 'prev_opp_action'):
+            env.prev_opp_action = batch.prev_opp_action[0]
+        env.new_trial()
+        batch.new_trial(np.arange(1))
+        for _ in range(num_steps):
+            action = rng.randint(env.action_space.n)
+            ob, reward, done, info = env.step(action)
+            ob_b, reward_b, _, info_b = batch.step([action])
+            assert np.array_equal(ob, ob_b[0]) and reward == reward_b[0]
+            assert info['new_trial'] == info_b['new_trial'][0]
+            if info['new_trial']:
+                assert info['performance'] == info_b['performance'][0]
+
+        batch = batch_class(n_envs=n_envs, **kwargs)
+        batch.reset()
+        for _ in range(num_steps):
+            ob, reward, done, info = batch.step(batch.action_space.sample())
+            assert ob.shape == batch.observation_space.shape
+            assert reward.shape == (n_envs,)
+        assert batch.num_tr >= num_steps * n_envs // 2
+
+
+def test_memory_recall(n_trials=50, num_steps=500):
+    """Generated trials are consistent, and the env runs through Dataset."""
+    env = gym.make('MemoryRecall-v0')
+    env.seed(0)
+    ob, gt, mask, lengths = env.generate(n_trials)
+    assert ob.shape[:2] == gt.shape[:2] == mask.shape
+    assert ob.shape[1] == lengths.max()
+    steps = np.arange(ob.shape[1])
+    assert not ob[steps >= lengths[:, None]].any()
+    for i in range(n_trials):
+        stored = ob[i, ob[i, :, -1] == 1, :-1]
+        recall = mask[i] == 1
+        assert len(stored) == recall.sum() > 0
+        # Recalled patterns are the stored ones, cues agree with them
+        assert (sorted(map(tuple, gt[i, recall])) ==
+                sorted(map(tuple, stored)))
+        cue = ob[i, recall, :-1]
+        assert np.all((cue == 0) | (cue == gt[i, recall]))
+
+    env.reset()
+    n_trials = 0
+    for _ in range(num_steps):
+        ob, reward, done, info = env.step(env.action_space.sample())
+        n_trials += info['new_trial']
+        if info['new_trial']:
+            assert env.t_ind == 0 and env.ob.shape[0] == env.trial['T']
+    assert n_trials >= num_steps // env.T_max
+
+    dataset = ngym.Dataset('MemoryRecall-v0', batch_size=8, seq_len=50)
+    inputs, target = dataset()
+    assert inputs.shape == (50, 8, env.observation_space.shape[0])
+    assert target.shape == (50, 8, env.action_space.shape[0])
+
+
+def test_psychopy_numpy(num_steps=200):
+    """Psychopy envs run headless with the NumPy backend."""
+    for env_name in ngym.all_envs(psychopy=True):
+        if not env_name.startswith('psychopy.'):
+            continue
+        env = gym.make(env_name, backend='numpy')
+        assert env.backend == 'numpy'
+        env.reset()
+        for stp in range(num_steps):
+            ob, rew, done, info = env.step(env.action_space.sample())
+            assert ob.dtype == np.uint8
+            assert ob.shape == env.observation_space.shape
+        env.new_trial()
+        stim = env.view_ob('stimulus' if 'stimulus' in env.start_t
+                           else 'decision')
+        assert (stim > 0).any() and not (env.view_ob('fixation') > 0).any()
+
+
+def test_rdm_frames(n_trials=8, n_frames=50, n_dots=30):
+    """Batched random dot motion positions and frames."""
+    from neurogym.envs.psychopy import raster
+    rng = np.random.RandomState(0)
+    direction = rng.uniform(0, 360, n_trials)
+    xy = raster.dot_motion_batch(rng, n_frames, 1., direction,
+                                 n_dots=n_dots, dot_life=-1)
+    assert xy.shape == (n_trials, n_frames, n_dots, 2)
+    assert (np.sum(xy**2, axis=-1) <= 0.25 + 1e-9).all()
+    # Without lifetime, signal dots move by speed in direction until they
+    # leave the field
+    step = np.diff(xy, axis=1)
+    theta = direction[:, None, None] * np.pi / 180
+    moved = np.isclose(step[..., 0], 0.05 * np.cos(theta))
+    assert moved.mean() > 0.8
+
+    frames = raster.rdm_frames(rng, n_frames, 0.5, direction, 40, 60,
+                               n_dots=n_dots)
+    assert frames.shape == (n_trials, n_frames, 40, 60, 3)
+    assert frames.dtype == np.uint8
+    n_lit = np.count_nonzero(frames[..., 0], axis=(2, 3))
+    assert (n_lit > 0).all() and (n_lit <= n_dots).all()
+
+
+def test_frame_cache(num_trials=20):
+    """Cached sprites give the same trials as rendering every trial."""
+    from neurogym.envs.psychopy import raster
+    obs = list()
+    for cache in [None, raster.FrameCache()]:
+        env = gym.make('psychopy.VisualSearch-v0', backend='numpy')
+        env.frame_cache = cache
+        env.seed(0)
+        # Finite stimulus space: fixed colors and a few angles
+        trials = [{'angles': [np.pi / 4 * (i % 3)] * 4,
+                   'colors': [np.array([.5, .2, .9])] * 4}
+                  for i in range(num_trials)]
+        obs.append([(env.new_trial(**trial), env.ob.copy())[1]
+                    for trial in trials])
+    for ob1, ob2 in zip(*obs):
+        assert np.array_equal(ob1, ob2)
+    assert cache.misses <= 3 * 5 and cache.hits >= num_trials * 5 - 15
+
+    # Least recently used sprites are evicted above max_bytes
+    cache = raster.FrameCache(max_bytes=100)
+    for i in range(5):
+        cache.get(i, lambda: (0, 0, np.ones((6, 6, 1), dtype=np.uint8)))
+    assert len(cache) == 2 and cache.nbytes == 72
+    cache.get(3, None)
+    cache.get(5, lambda: (0, 0, np.ones((6, 6, 1), dtype=np.uint8)))
+    assert sorted(cache._sprites) == [3, 5]
+
+
+def test_psychopy_raster(win_size=(100, 100), tolerance=0.02):
+    """NumPy rendering of lines matches psychopy up to a few pixels."""
+    visual = pytest.importorskip('psychopy.visual')
+    from neurogym.envs.psychopy import raster
+    win = visual.Window(size=win_size, color='black')
+    win.backend.winHandle.set_visible(False)
+    rng = np.random.RandomState(0)
+    for _ in range(5):
+        start, end = rng.uniform(-0.8, 0.8, (2, 2))
+        color = rng.uniform(-1, 1, 3)
+        visual.Line(win, lineWidth=3, lineColor=tuple(color),
+                    start=tuple(start), end=tuple(end)).draw()
+        win.flip()
+        expected = np.array(win._getFrame())
+        frame = np.zeros(expected.shape, dtype=np.uint8)
+        raster.draw_lines(frame, [start], [end], [color], width=3)
+        mismatch = np.any(np.abs(frame.astype(int) - expected) > 2, axis=-1)
+        assert mismatch.mean() < tolerance
+    win.close()
+
+
 if __name__ == '__main__':
     test_run_all()
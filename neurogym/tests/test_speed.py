@@ -1,106 +1,173 @@
-"""Test speed of various code."""
+"""Test speed of various code.
 
+The full benchmark suite, with JSON output and comparison to a baseline, is
+run with python -m neurogym.utils.benchmark.
+"""
+
+import subprocess
+import sys
 import time
 
+import numpy as np
 import gym
 import neurogym as ngym
+from neurogym.wrappers import PassAction, PassReward, SideBias, TrialHistory
+from neurogym.utils.fusion import fuse
+from neurogym.utils import benchmark
 
 
-def test_speed(env):
-    """Test speed of an environment."""
-    n_steps = 100000
-    warmup_steps = 10000
-    kwargs = {'dt': 20}
-
-    if isinstance(env, str):
-        env = gym.make(env, **kwargs)
-
-    env.reset()
-    for stp in range(warmup_steps):
-        action = env.action_space.sample()
-        state, rew, done, info = env.step(action)  # env.action_space.sample())
-        if done:
-            env.reset()
-
-    total_time = 0
-    env.reset()
-    for stp in range(n_steps):
-        action = env.action_space.sample()
-        start_time = time.time()
-        state, rew, done, info = env.step(action)  # env.action_space.sample())
-        total_time += time.time() - start_time
-        if done:
-            env.reset()
-
-    print('Time/step {:0.3f}us [with stepping]'.format(total_time/n_steps*1e6))
-    return env
-
+def test_speed(env='PerceptualDecisionMaking-v0', max_us=100):
+    """Test speed of an environment.
 
-def test_speed_with_new_trial(env):
-    """Test speed of an environment."""
-    n_trials = 1000
-    warmup_trials = 100
-    kwargs = {'dt': 20}
+    max_us is a generous budget per step, to catch large regressions.
+    """
+    result = benchmark.bench_step(env, dt=20, n_steps=1000, warmup=100,
+                                  repeats=3)
+    print('Time/step {:0.3f}us [with stepping]'.format(result['median_us']))
+    assert 0 < result['min_us'] <= result['median_us'] < max_us
 
-    if isinstance(env, str):
-        env = gym.make(env, **kwargs)
 
-    env.reset()
-    for stp in range(warmup_trials):
-        env.new_trial()
-
-    n_steps = 0
-    start_time = time.time()
-    env.reset()
-    for stp in range(n_trials):
-        env.new_trial()
-        n_steps += env.ob.shape[0]
-    total_time = time.time() - start_time
-
-    print('Time/step {:0.3f}us [with new trial]'.format(total_time/n_steps*1e6))
-    return env
+def test_speed_with_new_trial(env='PerceptualDecisionMaking-v0'):
+    """Generating trials costs less per step than stepping through them."""
+    result = benchmark.bench_new_trial(env, dt=20, n_trials=20, repeats=3)
+    print('Time/step {:0.3f}us [with new trial]'.format(
+        result['us_per_step']))
+    assert result['peak_bytes_per_trial'] > 0
+    step = benchmark.bench_step(env, dt=20, n_steps=1000, warmup=100,
+                                repeats=3)
+    # Stepping includes the generation of the trials it goes through
+    assert 0 < result['us_per_step'] < step['median_us']
 
 
 def test_speed_all():
     """Test speed of all experiments."""
-    for env_name in sorted(ngym.all_envs()):
-        print('Running env: {:s}'.format(env_name))
-        try:
-            test_speed(env_name)
-            print('Success')
-        except BaseException as e:
-            print('Failure at running env: {:s}'.format(env_name))
-            print(e)
-
-
-def test_speed_dataset(env):
-    batch_size = 16
-    seq_len = 100
-    kwargs = {}
-    dataset = ngym.Dataset(
-        env, env_kwargs=kwargs, batch_size=batch_size, seq_len=seq_len)
-    n_batch = 100
-    start_time = time.time()
-    for batch in range(n_batch):
-        _, _ = dataset()
-    total_time = time.time() - start_time
-    time_per_batch = total_time / n_batch
-    time_per_step = total_time / n_batch / batch_size / seq_len
-    print('Time/batch {:0.3f}us [with dataset]'.format(time_per_batch * 1e6))
-    print('Time/step {:0.3f}us [with dataset]'.format(time_per_step * 1e6))
+    results = benchmark.run_suite(dts=[20], wrappers=['none'],
+                                  benches=['step'], n_steps=200, warmup=10,
+                                  repeats=1)
+    records = results['records']
+    assert len(records) == len(ngym.all_envs())
+    errors = [r['env'] + ': ' + r['error'] for r in records if 'error' in r]
+    assert not errors, errors
+
+
+def test_speed_wrapper_stacks(envs=('PerceptualDecisionMaking-v0',
+                                    'ReadySetGo-v0')):
+    """All wrapper stacks run, stacks needing choices are skipped."""
+    results = benchmark.run_suite(envs=envs, dts=[20], benches=['step'],
+                                  n_steps=200, warmup=10, repeats=1)
+    records = results['records']
+    errors = [r['env'] + ': ' + r['error'] for r in records if 'error' in r]
+    assert not errors, errors
+    stacks = {env: [r['wrappers'] for r in records if r['env'] == env]
+              for env in envs}
+    assert stacks[envs[0]] == list(benchmark.WRAPPER_STACKS)
+    assert stacks[envs[1]] == [name for name in benchmark.WRAPPER_STACKS
+                               if name not in benchmark.CHOICE_STACKS]
+
+
+def test_speed_import(max_us=5e6):
+    """import neurogym does not load matplotlib, wrappers or env modules."""
+    result = benchmark.bench_import('neurogym', repeats=1)
+    assert not result['matplotlib']
+    print('Time {:0.1f}ms [import neurogym]'.format(result['median_us'] / 1e3))
+
+    script = ('import sys, neurogym; print(sorted(m for m in sys.modules '
+              'if m.startswith(("neurogym.wrappers", "neurogym.envs."))))')
+    out = subprocess.run([sys.executable, '-c', script], check=True,
+                         stdout=subprocess.PIPE, universal_newlines=True)
+    assert out.stdout.split() == ["['neurogym.envs._registry',",
+                                  "'neurogym.envs.collections',",
+                                  "'neurogym.envs.registry']"]
+    assert 0 < result['median_us'] < max_us
+
+
+def test_speed_dataset(env='PerceptualDecisionMaking-v0'):
+    """Dataset costs less per step than stepping through the trials."""
+    result = benchmark.bench_dataset(env, dt=100, batch_size=16, seq_len=100,
+                                     n_batch=20, repeats=2)
+    print('Time/batch {:0.3f}us [with dataset]'.format(result['median_us']))
+    print('Time/step {:0.3f}us [with dataset]'.format(result['us_per_step']))
+    step = benchmark.bench_step(env, dt=100, n_steps=1000, warmup=100,
+                                repeats=3)
+    assert 0 < result['us_per_step'] < step['median_us']
 
 
 def test_speed_dataset_all():
     """Test dataset speed of all experiments."""
-    for env_name in sorted(ngym.all_envs()):
-        print('Running env: {:s}'.format(env_name))
-        try:
-            test_speed_dataset(env_name)
-            print('Success')
-        except BaseException as e:
-            print('Failure at running env: {:s}'.format(env_name))
-            print(e)
+    results = benchmark.run_suite(envs=ngym.all_envs(tag='supervised'),
+                                  dts=[100], batch_sizes=[4],
+                                  benches=['dataset'], n_batch=2, repeats=1)
+    errors = [r['env'] + ': ' + r['error'] for r in results['records']
+              if 'error' in r]
+    assert not errors, errors
+
+
+def test_benchmark_kwargs(env='PerceptualDecisionMaking-v0'):
+    """Benchmarks only receive the kwargs they accept."""
+    results = benchmark.run_suite(envs=[env], dts=[20], wrappers=['none'],
+                                  benches=['step', 'new_trial'], n_steps=200,
+                                  warmup=10, n_trials=5, repeats=1)
+    records = results['records']
+    assert len(records) == 2
+    errors = [r['bench'] + ': ' + r['error'] for r in records
+              if 'error' in r]
+    assert not errors, errors
+
+
+def test_benchmark_compare():
+    """Slower benchmarks are flagged as regressions."""
+    results = benchmark.run_suite(envs=['PerceptualDecisionMaking-v0'],
+                                  dts=[20], wrappers=['none', 'pass'],
+                                  benches=['step'], n_steps=200, warmup=10,
+                                  repeats=1)
+    baseline = {'records': [dict(r) for r in results['records']]}
+    baseline['records'][0]['median_us'] /= 2
+    regressions = benchmark.compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0]['wrappers'] == 'none'
+
+
+def _make_wrapped_env(env_name='PerceptualDecisionMaking-v0'):
+    env = gym.make(env_name, dt=20)
+    env.seed(0)
+    env = SideBias(env, probs=[(.8, .2), (.2, .8)])
+    env = TrialHistory(env, probs=0.8)
+    env = PassAction(env)
+    env = PassReward(env)
+    return env
+
+
+def test_speed_fused(env_name='PerceptualDecisionMaking-v0', n_steps=5000,
+                     repeats=5, tolerance=1.1):
+    """Fused wrapper stack matches the nested one and is not slower."""
+    envs = {'nested': _make_wrapped_env(env_name),
+            'fused': fuse(_make_wrapped_env(env_name))}
+    envs['nested'].action_space.seed(0)
+    actions = [envs['nested'].action_space.sample() for _ in range(n_steps)]
+    outputs = dict()
+    for mode, env in envs.items():
+        env.reset()
+        outputs[mode] = list()
+        for action in actions:
+            obs, rew, done, info = env.step(action)
+            outputs[mode].append((obs.copy(), rew))
+    for (obs1, rew1), (obs2, rew2) in zip(outputs['nested'],
+                                          outputs['fused']):
+        assert np.array_equal(obs1, obs2) and rew1 == rew2
+
+    # Interleave the repeats so that both stacks share machine load
+    times = {mode: np.inf for mode in envs}
+    for _ in range(repeats):
+        for mode, env in envs.items():
+            start = time.perf_counter()
+            for action in actions:
+                env.step(action)
+            times[mode] = min(times[mode], time.perf_counter() - start)
+    for mode in envs:
+        print('Time/step {:0.3f}us [{:s} wrappers]'.format(
+            times[mode] / n_steps * 1e6, mode))
+    assert times['fused'] <= times['nested'] * tolerance
 
 
 if __name__ == '__main__':
-    pass
\ No newline at end of file
+    pass
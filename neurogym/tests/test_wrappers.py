@@ -1,5 +1,10 @@
 """Test wrappers."""
 
+import gc
+import os
+import json
+import shutil
+import tempfile
 import numpy as np
 import gym
 # from gym import spaces
@@ -18,6 +23,12 @@ from neurogym.wrappers import TTLPulse
 from neurogym.wrappers import TransferLearning
 from neurogym.wrappers import Combine
 from neurogym.wrappers import Variable_nch
+from neurogym.wrappers import ScheduleCurriculum
+from neurogym.wrappers import Monitor
+from neurogym.utils.curriculum import Curriculum
+from neurogym.utils.fusion import fuse
+from neurogym.utils import logstore
+from neurogym.utils.logstore import LogReader
 
 
 def test_sidebias(env_name, num_steps=10000, verbose=False,
@@ -235,6 +246,17 @@ def test_noise(env_name, random_bhvr=0., wrapper=None, perf_th=None,
         plt.plot(std_mat)
 
 
+def test_noise_dataset(env_name='PerceptualDecisionMaking-v0',
+                       std_noise=1.):
+    """Noise is added once per trial, so it also reaches Dataset."""
+    env = gym.make(env_name, sigma=0)
+    dataset = ngym.Dataset(Noise(env, std_noise=std_noise), batch_size=4,
+                           seq_len=10)
+    inputs, _ = dataset()
+    # Without noise, the fixation input is exactly 1
+    assert np.any(inputs[..., 0] != 1)
+
+
 def test_trialhist_and_variable_nch(env_name, num_steps=100000, probs=0.8,
                                     num_blocks=2, verbose=False, num_ch=4,
                                     variable_nch=True):
@@ -353,6 +375,228 @@ def test_identity(env_name, num_steps=10000, **envArgs):
             env.reset()
 
 
+def test_fused(env_name='PerceptualDecisionMaking-v0', num_steps=2000):
+    """Fused and nested wrapper stacks produce the same outputs."""
+    def make_env():
+        env = gym.make(env_name, dt=20)
+        env.seed(0)
+        env = SideBias(env, probs=[(.8, .2), (.2, .8)])
+        env = TrialHistory(env, probs=0.8)
+        env = TTLPulse(env, periods=[['stimulus'], ['decision']])
+        env = PassAction(env)
+        env = PassReward(env)
+        return env
+
+    data = list()
+    for env in [make_env(), fuse(make_env())]:
+        env.reset()
+        env.action_space.seed(0)
+        obs_mat = []
+        rew_mat = []
+        for stp in range(num_steps):
+            obs, rew, done, info = env.step(env.action_space.sample())
+            obs_mat.append(obs.copy())
+            rew_mat.append(rew)
+        data.append((np.array(obs_mat), np.array(rew_mat), info))
+    assert np.allclose(data[0][0], data[1][0]), 'observations are not identical'
+    assert (data[0][1] == data[1][1]).all(), 'rewards are not identical'
+    assert data[0][2] == data[1][2], 'infos are not identical'
+
+
+def test_ob_layout(env_name='PerceptualDecisionMaking-v0', num_steps=100):
+    """PassReward and PassAction write into channels reserved in the task."""
+    env = gym.make(env_name, dt=20)
+    n_base = env.observation_space.shape[0]
+    env = PassReward(PassAction(env))
+    env.reset()
+    task = env.unwrapped
+    assert task.ob.shape[1] == n_base + 2, 'channels not reserved'
+    assert task.view_ob().shape[1] == n_base, 'view_ob includes extra channels'
+    for stp in range(num_steps):
+        action = env.action_space.sample()
+        obs, rew, done, info = env.step(action)
+        assert obs.shape == env.observation_space.shape
+        assert obs[n_base] == action and np.isclose(obs[n_base + 1], rew)
+    dataset = ngym.Dataset(env, batch_size=4, seq_len=20)
+    inputs, target = dataset()
+    assert inputs.shape[-1] == n_base + 2
+
+
+def test_curriculum(env_name='PerceptualDecisionMaking-v0', num_steps=3000):
+    """Curriculum goes through its stages when the agent is correct."""
+    stages = [{'sigma': 0.}, {'sigma': 0.1},
+              {'timing': {'delay': ('constant', 200)}}]
+    curriculum = Curriculum(stages, th_up=0.8, w=5, condition='coh')
+    env = gym.make(env_name, dt=100)
+    env = ScheduleCurriculum(env, curriculum)
+    env.reset()
+    for stp in range(num_steps):
+        obs, rew, done, info = env.step(env.unwrapped.gt_now)
+    assert curriculum.stage == len(stages) - 1
+    assert env.unwrapped.timing['delay'] == ('constant', 200)
+
+    curriculum = Curriculum(stages, w=10)
+    dataset = ngym.Dataset(env_name, batch_size=4, seq_len=50,
+                           curriculum=curriculum)
+    dataset()
+    assert curriculum.update(np.ones(20))
+    dataset._cache()
+    assert dataset.envs[0].unwrapped.sigma == 0.1
+
+
+def test_curriculum_dataset(env_name='PerceptualDecisionMaking-v0',
+                            num_batches=20):
+    """Curriculum is driven through Dataset with per-step conditions."""
+    stages = [{'sigma': 0.}, {'sigma': 0.1}]
+    curriculum = Curriculum(stages, w=50, condition='ground_truth')
+    dataset = ngym.Dataset(env_name, env_kwargs={'dt': 100}, batch_size=4,
+                           seq_len=50, curriculum=curriculum)
+    for _ in range(num_batches):
+        inputs, target = dataset()
+        assert dataset.conditions.shape == target.shape
+        decision = target > 0
+        # Conditions are the ground truth of the trial (action - 1)
+        assert (dataset.conditions[decision] == target[decision] - 1).all()
+        # A network always correct at decision steps
+        curriculum.update(np.ones(decision.sum()),
+                          dataset.conditions[decision])
+    assert curriculum.stage == 1
+    # The new stage is set when the cache is next filled
+    dataset._cache()
+    assert all(env.unwrapped.sigma == 0.1 for env in dataset.envs)
+
+    # Copies of a wrapped env share its curriculum
+    curriculum = Curriculum(stages, w=10)
+    env = ScheduleCurriculum(gym.make(env_name), curriculum)
+    dataset = ngym.Dataset(env, batch_size=4, seq_len=50)
+    assert dataset.conditions is None
+    assert all(env.curriculum is curriculum for env in dataset.envs)
+    assert curriculum.update(np.ones(10))
+    dataset._cache()
+    assert all(env.unwrapped.sigma == 0.1 for env in dataset.envs)
+
+
+def test_curriculum_step_down(env_name='PerceptualDecisionMaking-v0'):
+    """Stepping down a stage restores attributes set by later stages."""
+    stages = [{'sigma': 0.}, {'timing': {'delay': ('constant', 200)}},
+              {'sigma': 0.1, 'timing': {'stimulus': ('constant', 300)}}]
+    curriculum = Curriculum(stages, th_up=0.8, th_down=0.5, w=10)
+    env = gym.make(env_name, dt=100)
+    task = env.unwrapped
+    timing = dict(task.timing)
+    curriculum.apply(env)
+    assert task.sigma == 0 and task.timing == timing
+    for stage in [1, 2]:
+        assert curriculum.update(np.ones(10))
+        assert curriculum.stage == stage
+    curriculum.apply(env)
+    assert task.sigma == 0.1
+    assert task.timing['delay'] == ('constant', 200)
+    assert task.timing['stimulus'] == ('constant', 300)
+
+    assert curriculum.update(np.zeros(10))
+    curriculum.apply(env)
+    assert task.sigma == 0
+    assert task.timing['delay'] == ('constant', 200)
+    assert task.timing['stimulus'] == timing['stimulus']
+    assert curriculum.update(np.zeros(10))
+    curriculum.apply(env)
+    assert task.timing == timing
+
+
+def test_monitor_log(env_name='PerceptualDecisionMaking-v0', num_steps=5000,
+                     sv_per=50):
+    """Monitor log backend saves every finished trial in chunks."""
+    folder = tempfile.mkdtemp()
+    env = gym.make(env_name, dt=100)
+    env = Monitor(env, folder=folder, sv_per=sv_per, backend='log')
+    env.reset()
+    for stp in range(num_steps):
+        env.step(env.action_space.sample())
+    env.close()
+    path = env.log.path
+    with open(os.path.join(path, 'index.jsonl')) as f:
+        index = [json.loads(line) for line in f]
+    assert index[-1]['stop'] == env.num_tr
+    assert all(e['stop'] - e['start'] == sv_per for e in index[:-1])
+    reward = np.concatenate([np.load(os.path.join(
+        path, 'reward.{:06d}.npy'.format(e['chunk']))) for e in index])
+    assert reward.shape == (env.num_tr,)
+    shutil.rmtree(folder)
+
+
+def test_monitor_log_dataset(env_name='PerceptualDecisionMaking-v0'):
+    """Monitor with the log backend can be copied by Dataset."""
+    folder = tempfile.mkdtemp()
+    env = gym.make(env_name, dt=100)
+    env = Monitor(env, folder=folder, sv_per=5, backend='log')
+    dataset = ngym.Dataset(env, batch_size=4, seq_len=100)
+    inputs, _ = dataset()
+    assert inputs.shape[:2] == (100, 4)
+    paths = [env_copy.log.path for env_copy in dataset.envs]
+    assert len(set(paths + [env.log.path])) == 5
+    for env_copy in dataset.envs:
+        for stp in range(500):
+            env_copy.step(env_copy.action_space.sample())
+        env_copy.close()
+    for env_copy in dataset.envs:
+        assert LogReader(env_copy.log.path).num_trials == env_copy.num_tr
+    assert not os.path.exists(os.path.join(env.log.path, 'index.jsonl'))
+    shutil.rmtree(folder)
+
+
+def test_monitor_log_unclosed(env_name='PerceptualDecisionMaking-v0',
+                              num_steps=500):
+    """Trials of a log Monitor that is not closed are not lost."""
+    folder = tempfile.mkdtemp()
+    for sv_per in [100000, 5]:
+        env = gym.make(env_name, dt=100)
+        env = Monitor(env, folder=folder, sv_per=sv_per, backend='log',
+                      name=str(sv_per))
+        env.reset()
+        for stp in range(num_steps):
+            env.step(env.action_space.sample())
+        path, num_tr = env.log.path, env.num_tr
+        del env
+        gc.collect()
+        if sv_per == 5:
+            # The saving thread keeps the log alive until exit
+            logstore._close_writers()
+        assert LogReader(path).num_trials == num_tr
+    shutil.rmtree(folder)
+
+
+def test_monitor_fig(env_name='PerceptualDecisionMaking-v0', num_steps=1000,
+                     sv_per=10):
+    """Monitor renders figures in a worker process."""
+    folder = tempfile.mkdtemp()
+    env = gym.make(env_name, dt=100)
+    env = Monitor(env, folder=folder, sv_per=sv_per, sv_fig=True,
+                  num_stps_sv_fig=50)
+    env.reset()
+    for stp in range(num_steps):
+        env.step(env.action_space.sample())
+    env.close()
+    assert env.fig_process.n_submitted > 0
+    figs = [f for f in os.listdir(folder) if f.endswith('.png')]
+    assert len(figs) == (env.fig_process.n_submitted -
+                         env.fig_process.n_skipped)
+    shutil.rmtree(folder)
+
+
+def test_monitor_fig_dataset(env_name='PerceptualDecisionMaking-v0'):
+    """Monitor with figures can be copied by Dataset."""
+    folder = tempfile.mkdtemp()
+    env = gym.make(env_name, dt=100)
+    env = Monitor(env, folder=folder, sv_fig=True, num_stps_sv_fig=50)
+    dataset = ngym.Dataset(env, batch_size=4, seq_len=100)
+    inputs, _ = dataset()
+    assert inputs.shape[:2] == (100, 4)
+    for env_copy in dataset.envs:
+        env_copy.close()
+    shutil.rmtree(folder)
+
+
 def test_all(test_fn):
     """Test speed of all experiments."""
     success_count = 0
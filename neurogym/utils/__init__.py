@@ -1 +1,20 @@
-from neurogym.utils.plotting import plot_env
\ No newline at end of file
+"""Utilities of neurogym.
+
+Submodules and plot_env are imported when first accessed (PEP 562), so that
+importing neurogym does not import matplotlib.
+"""
+
+import importlib
+
+
+def __getattr__(name):
+    if name == 'plot_env':
+        from neurogym.utils.plotting import plot_env
+        return plot_env
+    try:
+        return importlib.import_module('neurogym.utils.' + name)
+    except ModuleNotFoundError as e:
+        if e.name != 'neurogym.utils.' + name:
+            raise
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
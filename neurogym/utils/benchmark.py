@@ -0,0 +1,335 @@
+"""Benchmark suite for import time, envs, wrappers and datasets.
+
+Run from the command line, e.g.
+    python -m neurogym.utils.benchmark --out bench.json
+    python -m neurogym.utils.benchmark --baseline bench.json
+to save results as JSON or to compare them with a stored baseline.
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import gym
+
+import neurogym as ngym
+from neurogym.version import VERSION
+from neurogym.wrappers import (Noise, PassAction, PassReward, SideBias,
+                               TrialHistory)
+from neurogym.utils.fusion import fuse
+
+
+def _side_bias(env):
+    """SideBias with one block biased towards each choice."""
+    n_ch = len(env.unwrapped.choices)
+    probs = np.full((n_ch, n_ch), 0.2 / (n_ch - 1))
+    np.fill_diagonal(probs, 0.8)
+    return SideBias(env, probs=probs)
+
+
+def _trial_history(env):
+    return TrialHistory(env, probs=0.8)
+
+
+# Wrapper stacks benchmarked by default, innermost first. Every stack adds a
+# benchmark per env and dt, so the set is limited to one stack per way in
+# which wrappers act on a step: none, changing the observation (noise),
+# augmenting it (pass), changing trial generation (history), and the last
+# two nested (history_pass) or fused into one step (fused).
+WRAPPER_STACKS = {
+    'none': [],
+    'noise': [Noise],
+    'pass': [PassAction, PassReward],
+    'history': [_side_bias, _trial_history],
+    'history_pass': [_side_bias, _trial_history, PassAction, PassReward],
+    'fused': [_side_bias, _trial_history, PassAction, PassReward, fuse],
+}
+
+# Stacks only benchmarked on tasks with numeric choices
+CHOICE_STACKS = ('history', 'history_pass', 'fused')
+
+
+def _make(env_name, dt, wrappers='none'):
+    env = gym.make(env_name, dt=dt)
+    for wrapper in WRAPPER_STACKS[wrappers]:
+        env = wrapper(env)
+    env.seed(0)
+    return env
+
+
+def _has_choices(env_name):
+    """Check if SideBias and TrialHistory can be used on a task."""
+    choices = np.asarray(getattr(gym.make(env_name).unwrapped, 'choices', ()))
+    return len(choices) > 1 and np.issubdtype(choices.dtype, np.number)
+
+
+def _stats(times, n):
+    """Statistics of repeated timings, in us per unit."""
+    times = np.array(times) / n * 1e6
+    return {'median_us': float(np.median(times)),
+            'min_us': float(np.min(times)),
+            'mean_us': float(np.mean(times)),
+            'std_us': float(np.std(times)),
+            'repeats': len(times)}
+
+
+def bench_step(env_name, dt=20, wrappers='none', n_steps=2000, warmup=500,
+               repeats=5):
+    """Time per step of an env, including the new trials it generates."""
+    env = _make(env_name, dt, wrappers)
+    env.reset()
+    env.action_space.seed(0)
+    actions = [env.action_space.sample() for _ in range(n_steps)]
+    for action in actions[:warmup]:
+        env.step(action)
+    times = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+        times.append(time.perf_counter() - start)
+    return _stats(times, n_steps)
+
+
+def bench_new_trial(env_name, dt=20, wrappers='none', n_trials=100,
+                    warmup=10, repeats=5):
+    """Time per trial and per trial step of new_trial, and memory peak."""
+    env = _make(env_name, dt, wrappers)
+    env.reset()
+    for _ in range(warmup):
+        env.new_trial()
+    times = list()
+    n_steps = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n_trials):
+            env.new_trial()
+            n_steps += env.unwrapped.ob.shape[0]
+        times.append(time.perf_counter() - start)
+    result = _stats(times, n_trials)
+    result['us_per_step'] = float(np.sum(times) / n_steps * 1e6)
+
+    # Memory peak of generating one trial
+    tracemalloc.start()
+    peak = 0
+    for _ in range(10):
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:  # Python < 3.9
+            tracemalloc.stop()
+            tracemalloc.start()
+        env.new_trial()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    result['peak_bytes_per_trial'] = int(peak)
+    return result
+
+
+def bench_dataset(env_name, dt=20, batch_size=16, seq_len=100, n_batch=50,
+                  repeats=3):
+    """Time per batch of Dataset, including cache refills."""
+    dataset = ngym.Dataset(env_name, env_kwargs={'dt': dt},
+                           batch_size=batch_size, seq_len=seq_len)
+    dataset()
+    times = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n_batch):
+            dataset()
+        times.append(time.perf_counter() - start)
+    result = _stats(times, n_batch)
+    result['us_per_step'] = result['median_us'] / batch_size / seq_len
+    return result
+
+
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, int('matplotlib' in sys.modules))
+"""
+
+
+def bench_import(module='neurogym', repeats=5):
+    """Time of importing a module in a fresh interpreter.
+
+    Also reports whether the import loaded matplotlib.
+    """
+    times = list()
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, '-c', _IMPORT_SCRIPT.format(module=module)],
+            check=True, stdout=subprocess.PIPE, universal_newlines=True)
+        elapsed, matplotlib = out.stdout.split()[-2:]
+        times.append(float(elapsed))
+    result = _stats(times, 1)
+    result['matplotlib'] = bool(int(matplotlib))
+    return result
+
+
+def _call(fn, *args, **kwargs):
+    """Call a benchmark function with the kwargs it accepts."""
+    params = inspect.signature(fn).parameters
+    return fn(*args, **{k: v for k, v in kwargs.items() if k in params})
+
+
+def _key(record):
+    return (record['bench'], record['env'], record.get('wrappers'),
+            record['dt'], record.get('batch_size'))
+
+
+def run_suite(envs=None, dts=(20, 100), wrappers=tuple(WRAPPER_STACKS),
+              batch_sizes=(16, 64),
+              benches=('import', 'step', 'new_trial', 'dataset'),
+              verbose=False, **kwargs):
+    """Run benchmarks over envs, dt values, wrapper stacks and batch sizes.
+
+    Failures are recorded in the results with their error message.
+
+    Args:
+        envs: list of env ids, all registered envs if None
+        dts: list of dt values
+        wrappers: list of keys of WRAPPER_STACKS, stacks of CHOICE_STACKS
+            are skipped for tasks without numeric choices
+        batch_sizes: list of Dataset batch sizes
+        benches: benchmarks to run, 'import' times import neurogym once
+        verbose: bool, print results as they are obtained
+        kwargs: passed to the benchmark functions accepting them, e.g.
+            repeats, n_steps
+
+    Returns:
+        results: dict with run information and a list of records
+    """
+    if envs is None:
+        envs = sorted(ngym.all_envs())
+    configs = list()
+    for env_name in envs:
+        stacks = wrappers
+        if any(name in CHOICE_STACKS for name in wrappers):
+            if not _has_choices(env_name):
+                stacks = [n for n in wrappers if n not in CHOICE_STACKS]
+        for dt in dts:
+            for name in stacks:
+                if 'step' in benches:
+                    configs.append(('step', env_name, dt,
+                                    {'wrappers': name}))
+                if 'new_trial' in benches:
+                    configs.append(('new_trial', env_name, dt,
+                                    {'wrappers': name}))
+            for batch_size in batch_sizes:
+                if 'dataset' in benches:
+                    configs.append(('dataset', env_name, dt,
+                                    {'batch_size': batch_size}))
+    bench_fns = {'step': bench_step, 'new_trial': bench_new_trial,
+                 'dataset': bench_dataset}
+
+    records = list()
+    if 'import' in benches:
+        record = {'bench': 'import', 'env': 'neurogym', 'dt': None}
+        try:
+            record.update(_call(bench_import, 'neurogym', **kwargs))
+        except Exception as e:
+            record['error'] = '{:s}: {:s}'.format(type(e).__name__, str(e))
+        if verbose:
+            print(json.dumps(record))
+        records.append(record)
+    for bench, env_name, dt, config in configs:
+        record = {'bench': bench, 'env': env_name, 'dt': dt, **config}
+        try:
+            record.update(_call(bench_fns[bench], env_name, dt=dt,
+                                **config, **kwargs))
+        except Exception as e:
+            record['error'] = '{:s}: {:s}'.format(type(e).__name__, str(e))
+        if verbose:
+            print(json.dumps(record))
+        records.append(record)
+
+    return {
+        'info': {'neurogym': VERSION, 'numpy': np.__version__,
+                 'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'time': time.strftime('%Y-%m-%d %H:%M:%S')},
+        'records': records,
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """Find benchmarks slower than a baseline.
+
+    Args:
+        results: dict returned by run_suite
+        baseline: dict returned by run_suite, e.g. loaded from JSON
+        threshold: float, relative slowdown of the median flagged as
+            regression
+
+    Returns:
+        regressions: list of dict with the benchmark key, baseline and new
+            median times and their ratio
+    """
+    base = {_key(r): r for r in baseline['records'] if 'error' not in r}
+    regressions = list()
+    for record in results['records']:
+        old = base.get(_key(record))
+        if old is None:
+            continue
+        if 'error' in record:
+            regressions.append({**record, 'ratio': np.inf})
+            continue
+        ratio = record['median_us'] / old['median_us']
+        if ratio > 1 + threshold:
+            regressions.append({
+                'bench': record['bench'], 'env': record['env'],
+                'wrappers': record.get('wrappers'), 'dt': record['dt'],
+                'batch_size': record.get('batch_size'),
+                'baseline_us': old['median_us'],
+                'median_us': record['median_us'], 'ratio': ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark neurogym envs.')
+    parser.add_argument('--envs', nargs='*', default=None)
+    parser.add_argument('--dts', nargs='*', type=int, default=[20, 100])
+    parser.add_argument('--wrappers', nargs='*',
+                        default=list(WRAPPER_STACKS))
+    parser.add_argument('--batch-sizes', nargs='*', type=int,
+                        default=[16, 64])
+    parser.add_argument('--benches', nargs='*',
+                        default=['import', 'step', 'new_trial', 'dataset'])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--out', default=None, help='Save results as JSON')
+    parser.add_argument('--baseline', default=None,
+                        help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_suite(envs=args.envs, dts=args.dts, wrappers=args.wrappers,
+                        batch_sizes=args.batch_sizes, benches=args.benches,
+                        repeats=args.repeats, verbose=True)
+    if args.out is not None:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=1)
+    status = 0
+    errors = [r for r in results['records'] if 'error' in r]
+    for record in errors:
+        print('Failure at {:s} {:s}: {:s}'.format(
+            record['bench'], record['env'], record['error']))
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print('Regression: {}'.format(r))
+        status = int(bool(regressions))
+    return max(status, int(bool(errors)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
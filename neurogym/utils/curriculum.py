@@ -0,0 +1,147 @@
+"""Curriculum controller adjusting task parameters with performance."""
+
+import numpy as np
+
+from neurogym.utils.stats import RollingStats
+
+
+class Curriculum(object):
+    """Staged curriculum driven by performance.
+
+    Each stage is a dictionary of env attributes set on the task when the
+    stage is applied, e.g. {'sigma': 0.1, 'cohs': np.array([25.6, 51.2])}.
+    The 'timing' entry is merged into the task's timing dictionary instead of
+    replacing it, e.g. {'timing': {'delay': ('constant', 500)}}. Values are
+    set as stored by the task (e.g. PerceptualDecisionMaking stores sigma
+    already scaled by dt, and stim_scale through cohs).
+
+    Stages are cumulative: applying stage k sets the attributes of stages 0
+    to k, later stages overriding earlier ones. Attributes set by later
+    stages only are restored to their original values, taken from the task
+    the first time the curriculum is applied.
+
+    Performance is tracked with rolling windows, one per condition if
+    condition is given. The next stage is reached when the mean performance
+    of every condition is at least th_up, and the previous stage is restored
+    when the mean performance of any condition falls below th_down. Windows
+    are emptied at every stage change.
+
+    The curriculum can be used per trial with the ScheduleCurriculum wrapper,
+    or shared by the environments of a Dataset, in which case performance is
+    fed back from the training loop with update, using the conditions of the
+    batch steps given by Dataset.conditions.
+
+    Args:
+        stages: list of dict, attributes of every stage
+        th_up: float, performance needed to go to the next stage (def: 0.8)
+        th_down: float or None, performance below which the previous stage is
+            restored (def: None, never go back)
+        w: int, window of trials used to compute performance (def: 100)
+        min_trials: int, minimum number of trials per condition before
+            changing stage (def: w)
+        condition: str or None, key of the trial dictionary used to group
+            performance (def: None)
+    """
+
+    def __init__(self, stages, th_up=0.8, th_down=None, w=100,
+                 min_trials=None, condition=None):
+        if len(stages) == 0:
+            raise ValueError('Curriculum needs at least one stage')
+        self.stages = stages
+        self.th_up = th_up
+        self.th_down = th_down
+        self.w = w
+        self.min_trials = w if min_trials is None else min_trials
+        self.condition = condition
+        self.stage = 0
+        self.stats = {}
+        self._defaults = None  # attribute -> original value
+        self._default_timing = None  # period -> original timing
+        self._missing = set()  # attributes the task did not have
+
+    @property
+    def params(self):
+        """Attributes of the current stage."""
+        return self.stages[self.stage]
+
+    def _snapshot(self, task):
+        """Store original values of the attributes set by any stage."""
+        self._defaults, self._default_timing = {}, {}
+        for stage in self.stages:
+            for key, val in stage.items():
+                if key == 'timing':
+                    for period in val:
+                        if period in task.timing:
+                            self._default_timing.setdefault(
+                                period, task.timing[period])
+                        else:
+                            self._missing.add(('timing', period))
+                elif hasattr(task, key):
+                    self._defaults.setdefault(key, getattr(task, key))
+                else:
+                    self._missing.add(key)
+
+    def apply(self, env):
+        """Set the attributes of the current stage on the env's task."""
+        task = getattr(env, 'unwrapped', env)
+        if self._defaults is None:
+            self._snapshot(task)
+        params = dict(self._defaults)
+        timing = dict(self._default_timing)
+        for stage in self.stages[:self.stage + 1]:
+            for key, val in stage.items():
+                if key == 'timing':
+                    timing.update(val)
+                else:
+                    params[key] = val
+        for key in self._missing:
+            if isinstance(key, tuple):
+                if key[1] not in timing:
+                    task.timing.pop(key[1], None)
+            elif key not in params and hasattr(task, key):
+                delattr(task, key)
+        for key, val in params.items():
+            setattr(task, key, val)
+        task.timing.update(timing)
+
+    def update(self, performance, conditions=None):
+        """Add performance of finished trials.
+
+        Args:
+            performance: float or array of performance values
+            conditions: None, or value or array of condition values of the
+                trials, same shape as performance
+
+        Returns:
+            changed: bool, whether the stage changed
+        """
+        performance = np.atleast_1d(performance).ravel()
+        if conditions is None:
+            conditions = np.zeros(len(performance), dtype=int)
+        else:
+            conditions = np.atleast_1d(conditions).ravel()
+        for perf, cond in zip(performance, conditions):
+            if cond not in self.stats:
+                self.stats[cond] = RollingStats(self.w)
+            self.stats[cond].push(perf)
+        return self._check()
+
+    def _check(self):
+        stats = list(self.stats.values())
+        if not stats or min(s.count for s in stats) < self.min_trials:
+            return False
+        means = [s.mean for s in stats]
+        if min(means) >= self.th_up and self.stage < len(self.stages) - 1:
+            self.stage += 1
+        elif (self.th_down is not None and min(means) < self.th_down and
+              self.stage > 0):
+            self.stage -= 1
+        else:
+            return False
+        self.stats = {}
+        return True
+
+    def summary(self):
+        """Current stage and mean performance per condition."""
+        return {'stage': self.stage,
+                'performance': {c: s.mean for c, s in self.stats.items()}}
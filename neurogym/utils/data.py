@@ -6,6 +6,70 @@ import numpy as np
 import gym
 
 
+def get_cache_len(obs_shape, action_shape, batch_size, seq_len,
+                  cache_len=None):
+    """Length of the Dataset cache, a multiple of seq_len."""
+    if cache_len is None:
+        # Infer cache len
+        cache_len = 1e5  # Probably too low
+        cache_len /= (np.prod(obs_shape) + np.prod(action_shape))
+        cache_len /= batch_size
+    return int((1 + (cache_len // seq_len)) * seq_len)
+
+
+def compact_frames(ob):
+    """Deduplicate consecutive identical observations of a trial.
+
+    Observations are usually constant within a period, so a trial of image
+    observations is stored much more compactly as its distinct consecutive
+    frames and the index of the frame of each step.
+
+    Args:
+        ob: array (n_steps, ...), observations
+
+    Returns:
+        frames: array (n_frames, ...), observations that differ from the
+            previous step, same dtype as ob
+        index: int array (n_steps,), frame of each step
+    """
+    ob = np.asarray(ob)
+    if len(ob) == 0:
+        return ob, np.zeros(0, dtype=np.int64)
+    changed = np.ones(len(ob), dtype=bool)
+    axes = tuple(range(1, ob.ndim))
+    changed[1:] = np.any(ob[1:] != ob[:-1], axis=axes)
+    return ob[changed], np.cumsum(changed) - 1
+
+
+def expand_frames(frames, index, dtype=None, out=None):
+    """Observations of steps from frames, inverse of compact_frames.
+
+    Args:
+        frames: array (n_frames, ...)
+        index: int array of any shape, frame of each step
+        dtype: dtype of the observations, dtype of frames if None
+        out: array, optional buffer of shape index.shape + frames.shape[1:]
+            where observations are written
+
+    Returns:
+        ob: array index.shape + frames.shape[1:]
+    """
+    if out is None:
+        return frames[index].astype(dtype or frames.dtype, copy=False)
+    out[...] = frames[index]
+    return out
+
+
+def _share_curricula(env, env_copy):
+    """Make the wrappers of a copy of env use the curricula of env."""
+    while env_copy is not None:
+        # vars, as wrappers forward missing attributes to the wrapped env
+        if 'curriculum' in vars(env_copy):
+            env_copy.curriculum = env.curriculum
+        env = getattr(env, 'env', None)
+        env_copy = getattr(env_copy, 'env', None)
+
+
 class Dataset(object):
     """Make an environment into an iterable dataset for supervised learning.
 
@@ -21,19 +85,44 @@ class Dataset(object):
         max_batch: int, maximum number of batch for iterator, default infinite
         batch_first: bool, if True, return (batch, seq_len, n_units), default False
         cache_len: int, default length of caching
+        curriculum: neurogym.utils.curriculum.Curriculum object or None. If
+            given, the parameters of its current stage are set on every env
+            each time the cache is filled. Performance is fed back from the
+            training loop with curriculum.update(performance, conditions),
+            where conditions is dataset.conditions (see below)
+        compact_ob: bool, if True, observations are cached in the dtype of
+            the observation space (e.g. uint8 for image envs) as distinct
+            consecutive frames and a frame index per step (see
+            compact_frames), and converted to dtype when a batch is returned
+        dtype: dtype of the returned inputs, default float64
+
+    Batches can be written into a buffer provided by the caller with
+    dataset(out=inputs_buffer).
+
+    If the curriculum groups performance by a condition, dataset.conditions
+    holds after each batch the condition of the trial of every step, an
+    array of the shape of target (without output units), and is None
+    otherwise.
+
+    Copies of an env given as gym.Env share the curricula of its
+    ScheduleCurriculum wrappers, so that all copies stay at the same stage.
     """
 
     def __init__(self, env, env_kwargs=None,
                  batch_size=1, seq_len=None, max_batch=np.inf,
-                 batch_first=False, cache_len=None):
+                 batch_first=False, cache_len=None, curriculum=None,
+                 compact_ob=False, dtype=None):
         if isinstance(env, gym.Env):
             self.envs = [copy.deepcopy(env) for _ in range(batch_size)]
+            for env_copy in self.envs:
+                _share_curricula(env, env_copy)
         else:
             assert isinstance(env, str), 'env must be gym.Env or str'
             if env_kwargs is None:
                 env_kwargs = {}
             self.envs = [gym.make(env, **env_kwargs)
                          for _ in range(batch_size)]
+        self.curriculum = curriculum
         for env in self.envs:
             env.reset()
         env = self.envs[0]
@@ -52,12 +141,8 @@ class Dataset(object):
         else:
             self._expand_action = False
 
-        if cache_len is None:
-            # Infer cache len
-            cache_len = 1e5  # Probably too low
-            cache_len /= (np.prod(obs_shape) + np.prod(action_shape))
-            cache_len /= batch_size
-        cache_len = int((1 + (cache_len // seq_len)) * seq_len)
+        cache_len = get_cache_len(obs_shape, action_shape, batch_size,
+                                  seq_len, cache_len)
 
         self.seq_len = seq_len
         self._cache_len = cache_len
@@ -72,17 +157,49 @@ class Dataset(object):
         self._cache_inputs_shape = shape2 + list(obs_shape)
         self._cache_target_shape = shape2 + list(action_shape)
 
-        self._inputs = np.zeros(self._cache_inputs_shape)
+        self.compact_ob = compact_ob
+        self.dtype = np.dtype(np.float64 if dtype is None else dtype)
+        if compact_ob:
+            self._inputs = None
+            self._frames = np.zeros([cache_len] + list(obs_shape),
+                                    dtype=env.observation_space.dtype)
+            self._index = np.zeros(shape2, dtype=np.int64)
+        else:
+            self._inputs = np.zeros(self._cache_inputs_shape,
+                                    dtype=self.dtype)
         self._target = np.zeros(self._cache_target_shape)
+        if curriculum is not None and curriculum.condition is not None:
+            self._conditions = np.zeros(shape2, dtype=object)
+        else:
+            self._conditions = None
+        self.conditions = None
 
         self._cache()
 
         self._i_batch = 0
         self.max_batch = max_batch
 
+    def _add_frames(self, ob):
+        """Store distinct frames of ob, return the frame index of steps."""
+        frames, index = compact_frames(ob)
+        n = self._n_frames + len(frames)
+        if n > len(self._frames):
+            new = np.zeros((max(n, 2 * len(self._frames)),) +
+                           self._frames.shape[1:], dtype=self._frames.dtype)
+            new[:self._n_frames] = self._frames[:self._n_frames]
+            self._frames = new
+        self._frames[self._n_frames:n] = frames
+        index += self._n_frames
+        self._n_frames = n
+        return index
+
     def _cache(self):
+        self._n_frames = 0
+        inputs = self._index if self.compact_ob else self._inputs
         for i in range(self.batch_size):
             env = self.envs[i]
+            if self.curriculum is not None:
+                self.curriculum.apply(env)
             seq_start = 0
             seq_end = 0
             while seq_end < self._cache_len:
@@ -95,12 +212,21 @@ class Dataset(object):
                 if seq_end > self._cache_len:
                     seq_end = self._cache_len
                     seq_len = seq_end - seq_start
+                ob = ob[:seq_len]
+                if self.compact_ob:
+                    ob = self._add_frames(ob)
                 if self.batch_first:
-                    self._inputs[i, seq_start:seq_end, ...] = ob[:seq_len]
+                    inputs[i, seq_start:seq_end, ...] = ob
                     self._target[i, seq_start:seq_end, ...] = gt[:seq_len]
                 else:
-                    self._inputs[seq_start:seq_end, i, ...] = ob[:seq_len]
+                    inputs[seq_start:seq_end, i, ...] = ob
                     self._target[seq_start:seq_end, i, ...] = gt[:seq_len]
+                if self._conditions is not None:
+                    condition = env.unwrapped.trial[self.curriculum.condition]
+                    if self.batch_first:
+                        self._conditions[i, seq_start:seq_end] = condition
+                    else:
+                        self._conditions[seq_start:seq_end, i] = condition
                 seq_start = seq_end
 
         self._seq_start = 0
@@ -109,10 +235,13 @@ class Dataset(object):
     def __iter__(self):
         return self
 
-    def __call__(self, *args, **kwargs):
-        return self.__next__()
+    def __call__(self, out=None):
+        return self._next(out)
 
     def __next__(self):
+        return self._next()
+
+    def _next(self, out=None):
         self._i_batch += 1
         if self._i_batch > self.max_batch:
             self._i_batch = 0
@@ -123,12 +252,24 @@ class Dataset(object):
         if self._seq_end > self._cache_len:
             self._cache()
 
+        cache = self._index if self.compact_ob else self._inputs
         if self.batch_first:
-            inputs = self._inputs[:, self._seq_start:self._seq_end, ...]
+            inputs = cache[:, self._seq_start:self._seq_end, ...]
             target = self._target[:, self._seq_start:self._seq_end, ...]
+            if self._conditions is not None:
+                self.conditions = self._conditions[
+                    :, self._seq_start:self._seq_end]
         else:
-            inputs = self._inputs[self._seq_start:self._seq_end]
+            inputs = cache[self._seq_start:self._seq_end]
             target = self._target[self._seq_start:self._seq_end]
+            if self._conditions is not None:
+                self.conditions = self._conditions[
+                    self._seq_start:self._seq_end]
+        if self.compact_ob:
+            inputs = expand_frames(self._frames, inputs, self.dtype, out)
+        elif out is not None:
+            out[...] = inputs
+            inputs = out
 
         self._seq_start = self._seq_end
         return inputs, target
@@ -0,0 +1,171 @@
+"""Balanced evaluation sets over the conditions of a task.
+
+An evaluation set contains n_repeats trials of every condition of a task
+(see PeriodEnv.condition_space), generated with a seeded copy of the env, so
+that models evaluated at different checkpoints see the same trials.
+
+Evaluation sets can be cached on disk as .npz files. The file name is a
+hash of the env class, its dt, timing, rewards, trial variables and scalar
+parameters (e.g. sigma), of the class and scalar parameters of each wrapper
+(e.g. std_noise of Noise), and of the arguments of make_eval_set, so
+changing any of them generates a new set.
+"""
+
+import copy
+import hashlib
+import os
+
+import gym
+import numpy as np
+
+# Attributes of the env changing with every trial, not part of the cache key
+_RUNTIME_ATTRS = ['t', 't_ind', 'tmax', 'num_tr', 'performance', 'abort',
+                  'trial', 'gt', 'start_t', 'end_t', 'start_ind', 'end_ind']
+
+
+class EvalSet(object):
+    """Trials of an evaluation set, padded to the longest trial.
+
+    Attributes:
+        keys: list of str, trial variables defining the conditions
+        conditions: list of dicts, values of the variables of each condition
+        condition: int array (n_trials,), condition index of each trial
+        ob: array (n_trials, max_len, ...), observations, zero after the end
+            of each trial
+        gt: array (n_trials, max_len, ...), ground truth
+        lengths: int array (n_trials,), number of steps of each trial
+    """
+
+    def __init__(self, keys, conditions, condition, ob, gt, lengths):
+        self.keys = keys
+        self.conditions = conditions
+        self.condition = condition
+        self.ob = ob
+        self.gt = gt
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.condition)
+
+    def trial(self, i):
+        """Observations, ground truth and condition of trial i."""
+        length = self.lengths[i]
+        return (self.ob[i, :length], self.gt[i, :length],
+                self.conditions[self.condition[i]])
+
+    def save(self, fname):
+        # Written under a temporary name, readers never see partial files
+        tmp_fname = fname + '.tmp'
+        with open(tmp_fname, 'wb') as f:
+            np.savez(f, condition=self.condition, ob=self.ob, gt=self.gt,
+                     lengths=self.lengths)
+        os.replace(tmp_fname, fname)
+
+    @classmethod
+    def load(cls, fname, keys, conditions):
+        """Load an evaluation set saved for the given conditions."""
+        with np.load(fname) as data:
+            return cls(keys, conditions, data['condition'], data['ob'],
+                       data['gt'], data['lengths'])
+
+
+def _key_value(value):
+    """Hashable description of an attribute value, None if not a param."""
+    if isinstance(value, (bool, int, float, str, np.number)):
+        return repr(value)
+    if isinstance(value, np.ndarray):
+        return repr(value.tolist())
+    if isinstance(value, (list, tuple, dict)):
+        return repr(value)
+    return None
+
+
+def _params(obj, scalar_only=False):
+    """Sorted (name, value) pairs of the parameters of an env or wrapper."""
+    params = list()
+    for name, value in sorted(vars(obj).items()):
+        if name.startswith('_') or name in _RUNTIME_ATTRS:
+            continue
+        if scalar_only and not isinstance(
+                value, (bool, int, float, str, np.number)):
+            continue
+        value = _key_value(value)
+        if value is not None:
+            params.append((name, value))
+    return params
+
+
+def cache_key(env, keys, n_repeats, seed):
+    """Name of the cache file of an evaluation set."""
+    task = env.unwrapped
+    wrappers = list()
+    while isinstance(env, gym.Wrapper):
+        wrappers.append((type(env).__module__, type(env).__name__,
+                         _params(env, scalar_only=True)))
+        env = env.env
+    text = repr((type(task).__module__, type(task).__name__, _params(task),
+                 wrappers,
+                 [(k, _key_value(list(task.trial_vars[k]))) for k in keys],
+                 n_repeats, seed))
+    return type(task).__name__ + '-' + hashlib.sha1(
+        text.encode()).hexdigest()[:16]
+
+
+def make_eval_set(env, env_kwargs=None, n_repeats=10, keys=None, seed=0,
+                  cache_dir=None):
+    """Balanced evaluation set, n_repeats trials of every condition.
+
+    The trials are generated with a copy of env seeded with seed, by calling
+    new_trial with the variables of each condition, so the same arguments
+    give the same trials.
+
+    Args:
+        env: str for env id or gym.Env object
+        env_kwargs: dict, additional kwargs for environment, if env is str
+        n_repeats: int, number of trials of each condition
+        keys: list of str, trial variables defining the conditions, default
+            all variables declared by the env
+        seed: int, seed of the env generating the trials
+        cache_dir: str or None, if given, the set is loaded from this
+            folder if it was cached there, otherwise generated and saved
+
+    Returns:
+        eval_set: EvalSet
+    """
+    if isinstance(env, gym.Env):
+        env = copy.deepcopy(env)
+    else:
+        assert isinstance(env, str), 'env must be gym.Env or str'
+        env = gym.make(env, **(env_kwargs or {}))
+    conditions = env.unwrapped.condition_space(keys)
+    keys = list(conditions[0].keys())
+
+    fname = None
+    if cache_dir is not None:
+        fname = os.path.join(cache_dir,
+                             cache_key(env, keys, n_repeats, seed) + '.npz')
+        if os.path.exists(fname):
+            return EvalSet.load(fname, keys, conditions)
+
+    env.seed(seed)
+    condition = np.repeat(np.arange(len(conditions)), n_repeats)
+    obs, gts = list(), list()
+    for i in condition:
+        env.new_trial(**conditions[i])
+        obs.append(env.ob)
+        gts.append(env.gt)
+    lengths = np.array([len(ob) for ob in obs])
+
+    ob = np.zeros((len(obs), lengths.max()) + obs[0].shape[1:],
+                  dtype=obs[0].dtype)
+    gt = np.zeros((len(gts), lengths.max()) + gts[0].shape[1:],
+                  dtype=gts[0].dtype)
+    for i, length in enumerate(lengths):
+        ob[i, :length] = obs[i]
+        gt[i, :length] = gts[i]
+    eval_set = EvalSet(keys, conditions, condition, ob, gt, lengths)
+
+    if fname is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        eval_set.save(fname)
+    return eval_set
@@ -0,0 +1,121 @@
+"""Fuse a stack of trial wrappers into a single step function."""
+
+import numpy as np
+import gym
+
+from neurogym.core import TrialEnv
+
+
+def _overrides_step(wrapper):
+    """Check if a wrapper defines its own step method."""
+    for cls in type(wrapper).__mro__:
+        if cls is gym.Wrapper:
+            return False
+        if 'step' in cls.__dict__:
+            # Base trial wrappers only forward to the wrapped env
+            return cls.__module__ != 'neurogym.core'
+    return True
+
+
+class FusedWrapper(gym.Wrapper):
+    """Run a stack of wrappers with one step function.
+
+    Instead of going through the step method of every wrapper, the task is
+    stepped once and the fused_step hooks of the wrappers are applied, from
+    the innermost to the outermost one. Wrappers augmenting the observation
+    (e.g. PassReward, PassAction) write into their slots of the observation,
+    reserved in the task observation when the task supports it (see
+    TrialEnv.reserve_ob), or else in a single preallocated observation buffer.
+    New trials are generated by the new_trial pipeline of the original stack.
+
+    When the preallocated buffer is used, the returned observation is
+    overwritten at every step, copy it if it needs to be stored.
+
+    Args:
+        env: stack of wrappers, outermost wrapper first. Use fuse to build.
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        task = self.unwrapped
+        if not isinstance(task, TrialEnv):
+            raise TypeError('Fused wrappers must be used on TrialEnv. '
+                            'Got instead ' + str(task))
+        self.wrappers = list()
+        wrapper = env
+        while wrapper is not task:
+            if hasattr(type(wrapper), 'fused_step'):
+                self.wrappers.append(wrapper)
+            elif _overrides_step(wrapper):
+                raise TypeError('Wrapper {:s} can not be fused, it needs '
+                                'a fused_step method'.format(
+                                    type(wrapper).__name__))
+            wrapper = wrapper.env
+        self.wrappers = self.wrappers[::-1]  # innermost first
+
+        # Reserve observation slots of augmenting wrappers
+        self._ob = None
+        self._n_base = None
+        for wrapper in self.wrappers:
+            n_in = wrapper.env.observation_space.shape[0]
+            n_out = wrapper.observation_space.shape[0]
+            if n_out > n_in:
+                if getattr(wrapper, 'ob_slot', None) is None:
+                    wrapper.ob_slot = slice(n_in, n_out)
+                if self._n_base is None:
+                    self._n_base = n_in
+        if self._n_base is not None:
+            ob_space = self.observation_space
+            if len(ob_space.shape) != 1:
+                raise ValueError('Augmented observations must be 1-D')
+            self._ob = np.zeros(ob_space.shape, dtype=ob_space.dtype)
+        self._hooks = [wrapper.fused_step for wrapper in self.wrappers]
+        self._task = task  # unwrapped goes through the whole stack
+
+        # Fused new_trial pipeline
+        self._new_trial = env.new_trial
+        task.set_top(self)
+
+    def new_trial(self, **kwargs):
+        return self._new_trial(**kwargs)
+
+    def reset(self, step_fn=None):
+        return self.unwrapped.reset(step_fn=step_fn or self.step)
+
+    def step(self, action):
+        task = self._task
+        t_ind = task.t_ind
+        ob, reward, done, info = task.step(action)
+        if self._ob is not None and ob.shape[0] < self._ob.shape[0]:
+            # Augmented channels are not reserved in the task observation
+            self._ob[:self._n_base] = ob
+            ob = self._ob
+        for hook in self._hooks:
+            reward = hook(action, ob, reward, info, t_ind)
+        return ob, reward, done, info
+
+
+def fuse(env):
+    """Fuse a stack of wrappers around a TrialEnv.
+
+    Outer wrappers that can not be fused (e.g. Monitor) are kept on top of
+    the fused stack, any other wrapper needs to be fusable.
+
+    Args:
+        env: wrapped TrialEnv
+
+    Returns:
+        env: fused env, with the outer wrappers on top of it
+    """
+    outer = list()
+    wrapper = env
+    while (isinstance(wrapper, gym.Wrapper) and
+           not hasattr(type(wrapper), 'fused_step') and
+           _overrides_step(wrapper)):
+        outer.append(wrapper)
+        wrapper = wrapper.env
+    fused = FusedWrapper(wrapper)
+    if not outer:
+        return fused
+    outer[-1].env = fused
+    return env
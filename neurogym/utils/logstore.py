@@ -0,0 +1,407 @@
+"""Columnar, chunked storage of per-trial behavioral data.
+
+A log is a folder with one file per column and chunk, named
+<column>.<chunk>.npy (or .npz when compressed), and an append-only
+index.jsonl manifest with one line per chunk giving its trial range
+[start, stop) and the dtype and shape of its columns.
+"""
+
+import os
+import atexit
+import glob
+import json
+import queue
+import threading
+import weakref
+
+import numpy as np
+
+
+INDEX_FILE = 'index.jsonl'
+
+# Writers with trials not saved yet, closed at exit
+_OPEN_WRITERS = weakref.WeakSet()
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_OPEN_WRITERS):
+        try:
+            writer.close()
+        except Exception as e:
+            print('Could not save log {:s}: {}'.format(writer.path, e))
+
+
+def _column_spec(value):
+    """Infer dtype and shape of a column from its first value."""
+    value = np.asarray(value)
+    if value.dtype.kind not in 'biuf':
+        return np.dtype(object), ()
+    return value.dtype, value.shape
+
+
+def _empty_value(dtype):
+    return None if dtype == object else 0
+
+
+def _chunk_file(key, chunk, compressed=False):
+    return '{:s}.{:06d}.{:s}'.format(key, chunk,
+                                     'npz' if compressed else 'npy')
+
+
+def _fits(dtype, value):
+    """Check if a value can be stored in a column without losing data."""
+    if dtype.kind == 'b':
+        return isinstance(value, (bool, np.bool_))
+    if dtype.kind in 'iu':
+        return isinstance(value, (int, np.integer))
+    return True
+
+
+class LogWriter(object):
+    """Append per-trial records to a chunked, columnar log.
+
+    Records are dictionaries of scalars or fixed-shape arrays (e.g. the info
+    dictionary at the end of a trial). Each field is stored in a preallocated
+    column of chunk_size rows, whose dtype and shape are inferred from the
+    first value recorded. Non-numeric values are stored in object columns,
+    and integer columns are promoted to float when a float value arrives.
+
+    When a chunk is full it is handed to a background thread that saves
+    one file per column and appends an entry to the index file, while
+    recording continues in a second set of columns. Existing chunks are
+    never rewritten, and a log can be appended to from a new writer. Logs
+    are read with LogReader.
+
+    Trials not saved yet are saved by close, and otherwise when the writer
+    is garbage collected or at interpreter exit. Copies of a writer
+    (copy.deepcopy, pickle) are new, empty writers recording into their
+    own folder, the path of the original followed by _copy<n>.
+
+    Args:
+        path: str, folder of the log
+        chunk_size: int, number of trials per chunk (def: 10000)
+        background: bool, if True, chunks are saved in a background thread
+            (def: True)
+        compress: bool, if True, chunks are saved as compressed .npz files,
+            which can not be memory-mapped when read (def: False)
+    """
+
+    def __init__(self, path, chunk_size=10000, background=True,
+                 compress=False):
+        self.path = path
+        self.chunk_size = int(chunk_size)
+        self.background = background
+        self.compress = compress
+        os.makedirs(path, exist_ok=True)
+        self.schema = {}  # key -> (dtype, shape)
+
+        # Continue an existing log
+        self.n_chunks = 0
+        self.num_trials = 0
+        index_file = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_file):
+            with open(index_file) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self.n_chunks = entry['chunk'] + 1
+                    self.num_trials = entry['stop']
+
+        # Two sets of columns, one filled while the other is saved
+        self._free = queue.Queue()
+        self._free.put({})
+        self._free.put({})
+        self._cols = self._free.get()
+        self._n = 0
+        self._queue = None
+        self._thread = None
+        self._error = None
+        self._n_copies = 0
+
+    def __getstate__(self):
+        self._n_copies += 1
+        return {'path': '{:s}_copy{:d}'.format(self.path, self._n_copies),
+                'chunk_size': self.chunk_size, 'background': self.background,
+                'compress': self.compress}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __del__(self):
+        # Save trials of a writer dropped without close
+        if getattr(self, '_n', 0) > 0:
+            self.background = False
+            self.close()
+
+    def _new_column(self, key, dtype, shape):
+        self.schema[key] = (dtype, shape)
+        col = np.empty((self.chunk_size,) + shape, dtype=dtype)
+        col[:self._n] = _empty_value(dtype)
+        self._cols[key] = col
+        return col
+
+    def _promote(self, key, value):
+        """Change dtype of a column so it can hold value."""
+        dtype, shape = self.schema[key]
+        new_dtype, new_shape = _column_spec(value)
+        if dtype == object or new_shape != shape:
+            new_dtype, new_shape = np.dtype(object), ()
+        else:
+            new_dtype = np.result_type(dtype, new_dtype)
+        col = np.empty((self.chunk_size,) + new_shape, dtype=new_dtype)
+        if new_dtype == object and shape != ():
+            col[:self._n] = list(self._cols[key][:self._n])
+        else:
+            col[:self._n] = self._cols[key][:self._n]
+        self.schema[key] = (new_dtype, new_shape)
+        self._cols[key] = col
+        return col
+
+    def append(self, record):
+        """Add a record of one trial."""
+        cols = self._cols
+        n = self._n
+        for key, value in record.items():
+            col = cols.get(key)
+            if col is None:
+                col = self._new_column(key, *_column_spec(value))
+            elif not _fits(col.dtype, value):
+                col = self._promote(key, value)
+            try:
+                col[n] = value
+            except (ValueError, TypeError):
+                col = self._promote(key, value)
+                col[n] = value
+        if len(record) < len(cols):
+            for key, col in cols.items():
+                if key not in record:
+                    col[n] = _empty_value(col.dtype)
+        if n == 0:
+            _OPEN_WRITERS.add(self)
+        self._n += 1
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def column(self, key):
+        """Values of a field recorded since the last flush (a view)."""
+        return self._cols[key][:self._n]
+
+    def _raise_error(self):
+        """Raise the error of a chunk that failed to be saved."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self):
+        """Save recorded trials as a new chunk."""
+        if self._n == 0:
+            self._raise_error()
+            return
+        job = (self.n_chunks, self.num_trials, self._cols, self._n)
+        self.n_chunks += 1
+        self.num_trials += self._n
+        if self.background:
+            if self._thread is None:
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+            self._queue.put(job)
+        else:
+            self._write(*job)
+        # Blocks only if the previous chunk is still being saved
+        self._cols = self._free.get()
+        self._n = 0
+        for key, (dtype, shape) in self.schema.items():
+            col = self._cols.get(key)
+            if col is None or col.dtype != dtype or col.shape[1:] != shape:
+                self._cols[key] = np.empty((self.chunk_size,) + shape,
+                                           dtype=dtype)
+        self._raise_error()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._write(*job)
+            except Exception as e:
+                # Raised in the main thread by the next flush or close
+                if self._error is None:
+                    self._error = e
+
+    def _write(self, chunk, start, cols, n):
+        try:
+            columns = {}
+            for key, col in cols.items():
+                fname = os.path.join(self.path, _chunk_file(key, chunk,
+                                                            self.compress))
+                if self.compress:
+                    np.savez_compressed(fname, data=col[:n])
+                else:
+                    np.save(fname, col[:n], allow_pickle=True)
+                columns[key] = [col.dtype.str, list(col.shape[1:])]
+            entry = {'chunk': chunk, 'start': start, 'stop': start + n,
+                     'compressed': self.compress, 'columns': columns}
+            with open(os.path.join(self.path, INDEX_FILE), 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        finally:
+            # The columns are reused even if saving failed
+            self._free.put(cols)
+
+    def close(self):
+        """Save remaining trials and wait for pending chunks."""
+        _OPEN_WRITERS.discard(self)
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+
+class LogReader(object):
+    """Random access to the trials of a log written by LogWriter.
+
+    Only the chunks overlapping the requested trial range are loaded, and
+    uncompressed chunks are memory-mapped, so the cost of a read is
+    proportional to the requested data.
+
+    Args:
+        path: str, folder of the log
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            for line in f:
+                self.chunks.append(json.loads(line))
+        self._starts = np.array([c['start'] for c in self.chunks], dtype=int)
+        self.columns = {}  # key -> (dtype, shape)
+        for c in self.chunks:
+            for key, (dtype, shape) in c['columns'].items():
+                self.columns[key] = (np.dtype(dtype), tuple(shape))
+
+    @property
+    def num_trials(self):
+        return self.chunks[-1]['stop'] if self.chunks else 0
+
+    def __len__(self):
+        return self.num_trials
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __getitem__(self, key):
+        return self.read(key)
+
+    def keys(self):
+        return list(self.columns.keys())
+
+    def _load(self, chunk, key, mmap=True):
+        n = chunk['stop'] - chunk['start']
+        if key not in chunk['columns']:
+            # Field recorded only from a later chunk on
+            dtype, shape = self.columns[key]
+            col = np.empty((n,) + shape, dtype=dtype)
+            col[:] = _empty_value(dtype)
+            return col
+        compressed = chunk.get('compressed', False)
+        fname = os.path.join(self.path, _chunk_file(key, chunk['chunk'],
+                                                    compressed))
+        if compressed:
+            with np.load(fname, allow_pickle=True) as data:
+                return data['data']
+        dtype = np.dtype(chunk['columns'][key][0])
+        mmap_mode = 'r' if mmap and dtype != object else None
+        return np.load(fname, mmap_mode=mmap_mode, allow_pickle=True)
+
+    def _chunk_range(self, start, stop):
+        first = max(int(np.searchsorted(self._starts, start, 'right')) - 1, 0)
+        last = int(np.searchsorted(self._starts, stop, 'left'))
+        return self.chunks[first:last]
+
+    def iter_chunks(self, keys=None, start=0, stop=None, mmap=True):
+        """Stream trials chunk by chunk.
+
+        Args:
+            keys: list of columns to read, all if None
+            start, stop: trial range
+            mmap: bool, memory-map uncompressed chunks
+
+        Yields:
+            start: int, index of the first trial of the chunk
+            data: dict of arrays of the chunk, restricted to [start, stop)
+        """
+        stop = self.num_trials if stop is None else min(stop,
+                                                        self.num_trials)
+        keys = self.keys() if keys is None else keys
+        for chunk in self._chunk_range(start, stop):
+            i0 = max(start - chunk['start'], 0)
+            i1 = min(stop, chunk['stop']) - chunk['start']
+            yield chunk['start'] + i0, {
+                key: self._load(chunk, key, mmap)[i0:i1] for key in keys}
+
+    def read(self, key, start=0, stop=None):
+        """Values of a column for trials [start, stop)."""
+        parts = [data[key] for _, data in
+                 self.iter_chunks([key], start, stop)]
+        if not parts:
+            dtype, shape = self.columns[key]
+            return np.empty((0,) + shape, dtype=dtype)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+
+class NpzLogReader(LogReader):
+    """LogReader interface to the .npz files saved by Monitor(backend='npz').
+
+    Each file is a chunk. Arrays are loaded lazily by column.
+
+    Args:
+        files: list of .npz files, in trial order
+    """
+
+    def __init__(self, files):
+        self.path = None
+        self.chunks = []
+        self.columns = {}
+        start = 0
+        for ind, fname in enumerate(files):
+            with np.load(fname, allow_pickle=True) as data:
+                n = len(data['reward'])
+                keys = data.files
+            self.chunks.append({'chunk': ind, 'start': start,
+                                'stop': start + n, 'file': fname,
+                                'columns': keys})
+            for key in keys:
+                # dtypes are only known once the arrays are loaded
+                self.columns.setdefault(key, (np.dtype(object), ()))
+            start += n
+        self._starts = np.array([c['start'] for c in self.chunks], dtype=int)
+
+    def _load(self, chunk, key, mmap=True):
+        if key not in chunk['columns']:
+            return np.full(chunk['stop'] - chunk['start'], None, dtype=object)
+        with np.load(chunk['file'], allow_pickle=True) as data:
+            return data[key]
+
+
+def open_log(folder):
+    """Open the behavioral data saved by Monitor in folder.
+
+    Returns a LogReader of the first log found, or else a NpzLogReader of
+    the .npz files, or None if there is no data.
+    """
+    logs = sorted(glob.glob(os.path.join(folder, '*_bhvr_log*', INDEX_FILE)))
+    if logs:
+        return LogReader(os.path.dirname(logs[0]))
+    files = glob.glob(os.path.join(folder, '*_bhvr_data*npz'))
+    if files:
+        sfx = [int(x[x.rfind('_')+1:x.rfind('.')]) for x in files]
+        files = [x for _, x in sorted(zip(sfx, files))]
+        return NpzLogReader(files)
+    return None
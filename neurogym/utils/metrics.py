@@ -0,0 +1,220 @@
+"""Streaming behavioral metrics of a TrialEnv."""
+
+import os
+
+import numpy as np
+
+from neurogym.core import TrialEnv
+
+_MISSING = object()
+
+
+class TrialMetrics(object):
+    """Aggregate trial outcomes per condition while the env runs.
+
+    Trials are grouped by the values of the trial fields in keys (e.g. 'coh',
+    'ground_truth'). For every condition, the number of trials, correct and
+    aborted trials, the summed reward, the trial duration (first and second
+    moments, for chronometric curves) and the counts of the final action (for
+    psychometric curves) are kept in arrays updated at the end of each trial.
+    A trial is counted as aborted if its last reward is the task's 'abort'
+    reward.
+
+    Use attach to start collecting metrics of an env, snapshot to get the
+    current aggregates and to_csv or to_prometheus to export them.
+
+    Args:
+        keys: list of str, trial fields defining a condition, their values
+            must be hashable (def: [])
+        n_actions: int or None, number of actions counted for psychometric
+            curves, inferred from the env's action space if None
+    """
+
+    def __init__(self, keys=(), n_actions=None):
+        self.keys = list(keys)
+        self.n_actions = n_actions
+        self.conditions = {}  # tuple of field values -> row index
+        self._alloc(8)
+        self.task = None
+        self._orig_step = None
+        self._prev_step = _MISSING  # step set on the instance before attach
+        self._bound_step = None
+        self._rew = 0.
+
+    def _alloc(self, size):
+        """Allocate counters for size conditions, keeping current values."""
+        n = len(self.conditions)
+        # columns: trials, correct, aborted, duration, squared duration
+        counts = np.zeros((size, 5))
+        rewards = np.zeros(size)
+        choices = np.zeros((size, self.n_actions or 1), dtype=int)
+        if n > 0:
+            counts[:n] = self.counts[:n]
+            rewards[:n] = self.rewards[:n]
+            n_act = min(choices.shape[1], self.choices.shape[1])
+            choices[:n, :n_act] = self.choices[:n, :n_act]
+        self.counts, self.rewards, self.choices = counts, rewards, choices
+
+    def attach(self, env):
+        """Collect metrics of an env (a TrialEnv, possibly wrapped).
+
+        The step method of the task is replaced on the instance, so envs
+        without metrics do not pay any overhead. It calls the step in place
+        before attaching, either the method of the task (which also runs
+        the lean mode, see TrialEnv.set_lean) or a step set on the instance
+        by another tool (e.g. Profiler), which detach restores.
+        """
+        task = env.unwrapped
+        if not isinstance(task, TrialEnv):
+            raise TypeError('Metrics can only be attached to TrialEnv. '
+                            'Got instead ' + str(task))
+        if self.task is not None:
+            raise RuntimeError('Metrics are already attached, detach first')
+        if self.n_actions is None:
+            self.n_actions = getattr(task.action_space, 'n', 1)
+            self._alloc(len(self.counts))
+        self.task = task
+        self.dt = task.dt
+        self._abort = task.rewards.get('abort') if task.rewards else None
+        self._prev_step = vars(task).get('step', _MISSING)
+        self._orig_step = task.step
+        self._bound_step = self._step
+        task.step = self._bound_step
+        task.metrics = self
+        return self
+
+    def detach(self):
+        """Restore the step method in place before attach."""
+        if self.task is None:
+            return
+        task = self.task
+        if vars(task).get('step') is not self._bound_step:
+            raise RuntimeError('step was replaced after attaching metrics, '
+                               'detach the tool that replaced it first')
+        if self._prev_step is _MISSING:
+            del task.step
+        else:
+            task.step = self._prev_step
+        del task.metrics
+        self.task = None
+        self._orig_step = self._bound_step = None
+        self._prev_step = _MISSING
+
+    def _step(self, action):
+        task = self.task
+        trial = task.trial
+        t_ind = task.t_ind
+        obs, reward, done, info = self._orig_step(action)
+        self._rew += reward
+        if info['new_trial']:
+            self.update(trial, action, info.get('performance', 0),
+                        self._rew, (t_ind + 1) * self.dt,
+                        reward == self._abort)
+            self._rew = 0.
+        return obs, reward, done, info
+
+    def update(self, trial, action, performance, reward, duration,
+               aborted=False):
+        """Add a finished trial.
+
+        Args:
+            trial: dict, trial information
+            action: int, last action of the trial
+            performance: performance of the trial
+            reward: summed reward of the trial
+            duration: duration of the trial (ms)
+            aborted: bool, whether the trial was aborted
+        """
+        cond = tuple(trial.get(k) for k in self.keys) if trial else ()
+        i = self.conditions.get(cond)
+        if i is None:
+            i = len(self.conditions)
+            if i == len(self.counts):
+                self._alloc(2 * i)
+            self.conditions[cond] = i
+        counts = self.counts[i]
+        counts[0] += 1
+        counts[1] += performance
+        counts[2] += aborted
+        counts[3] += duration
+        counts[4] += duration * duration
+        self.rewards[i] += reward
+        if np.ndim(action) == 0 and 0 <= action < self.choices.shape[1]:
+            self.choices[i, int(action)] += 1
+
+    def snapshot(self):
+        """Current aggregates, overall and per condition."""
+        n_cond = len(self.conditions)
+        counts = self.counts[:n_cond]
+        n = counts[:, 0]
+        n_safe = np.maximum(n, 1)
+        total = counts.sum(axis=0)
+        n_total = max(total[0], 1)
+        mean_dur = counts[:, 3] / n_safe
+        conditions = list()
+        for cond, i in self.conditions.items():
+            conditions.append({
+                **dict(zip(self.keys, cond)),
+                'trials': int(n[i]),
+                'accuracy': counts[i, 1] / n_safe[i],
+                'abort_rate': counts[i, 2] / n_safe[i],
+                'mean_reward': self.rewards[i] / n_safe[i],
+                'mean_duration': mean_dur[i],
+                'std_duration': np.sqrt(max(
+                    counts[i, 4] / n_safe[i] - mean_dur[i]**2, 0)),
+                'choice_frac': self.choices[i] / n_safe[i],
+            })
+        return {
+            'trials': int(total[0]),
+            'accuracy': total[1] / n_total,
+            'abort_rate': total[2] / n_total,
+            # reward per second of task time
+            'reward_rate': (self.rewards[:n_cond].sum() * 1000. /
+                            max(total[3], 1)),
+            'conditions': conditions,
+        }
+
+    def reset(self):
+        """Clear all counters."""
+        self.conditions = {}
+        self.counts[:] = 0
+        self.rewards[:] = 0
+        self.choices[:] = 0
+        self._rew = 0.
+
+    def to_csv(self, fname):
+        """Save one row of aggregates per condition."""
+        snap = self.snapshot()
+        cols = self.keys + ['trials', 'accuracy', 'abort_rate',
+                            'mean_reward', 'mean_duration', 'std_duration']
+        cols_choice = ['choice_' + str(a)
+                       for a in range(self.choices.shape[1])]
+        lines = [','.join(cols + cols_choice)]
+        for cond in snap['conditions']:
+            values = [cond[c] for c in cols] + list(cond['choice_frac'])
+            lines.append(','.join(str(v) for v in values))
+        _write_atomic(fname, '\n'.join(lines) + '\n')
+
+    def to_prometheus(self, fname, prefix='neurogym'):
+        """Save aggregates in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = list()
+        for name in ['trials', 'accuracy', 'abort_rate', 'reward_rate']:
+            lines.append('{:s}_{:s} {:g}'.format(prefix, name, snap[name]))
+        for cond in snap['conditions']:
+            labels = ','.join('{:s}="{}"'.format(k, cond[k])
+                              for k in self.keys)
+            labels = '{' + labels + '}' if labels else ''
+            for name in ['trials', 'accuracy', 'abort_rate', 'mean_reward',
+                         'mean_duration']:
+                lines.append('{:s}_condition_{:s}{:s} {:g}'.format(
+                    prefix, name, labels, cond[name]))
+        _write_atomic(fname, '\n'.join(lines) + '\n')
+
+
+def _write_atomic(fname, text):
+    """Write text so readers never see a partially written file."""
+    tmp = fname + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, fname)
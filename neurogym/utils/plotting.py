@@ -1,6 +1,8 @@
 """Plotting functions."""
 
-import glob
+import queue
+import multiprocessing as mp
+
 import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
@@ -8,6 +10,8 @@ import matplotlib.animation as animation
 
 import gym
 
+from neurogym.utils.logstore import open_log
+
 
 # TODO: This is changing user's plotting behavior for non-neurogym plots
 mpl.rcParams['font.size'] = 7
@@ -178,6 +182,97 @@ def fig_(ob, actions, gt=None, rewards=None, performance=None, states=None,
         raise ValueError('ob shape {} not supported'.format(str(ob.shape)))
 
 
+def _fig_worker(jobs):
+    """Render the figures received from a FigureProcess."""
+    plt.switch_backend('Agg')
+    while True:
+        kwargs = jobs.get()
+        if kwargs is None:
+            break
+        try:
+            fig_(**kwargs)
+        except Exception as e:
+            print('Failure rendering figure', kwargs.get('fname'), e)
+        plt.close('all')
+
+
+class FigureProcess(object):
+    """Render figures with fig_ in a separate process.
+
+    At most one figure waits to be rendered. If a new figure is submitted
+    while the worker is still busy, the waiting figure is replaced by the new
+    one (policy='coalesce'), or the new one is discarded (policy='drop').
+
+    The worker is started with the first figure. Copies (copy.deepcopy,
+    pickle) do not share the worker, each starts its own when needed.
+
+    Args:
+        policy: str, 'coalesce' or 'drop' (def: 'coalesce')
+    """
+
+    def __init__(self, policy='coalesce'):
+        if policy not in ('coalesce', 'drop'):
+            raise ValueError('Unknown policy ' + str(policy))
+        self.policy = policy
+        self.n_submitted = 0
+        self.n_skipped = 0
+        self._jobs = None
+        self._process = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_jobs'] = None
+        state['_process'] = None
+        return state
+
+    def _start(self):
+        self._jobs = mp.Queue(maxsize=1)
+        self._process = mp.Process(target=_fig_worker, args=(self._jobs,),
+                                   daemon=True)
+        self._process.start()
+
+    def submit(self, **kwargs):
+        """Send arguments of fig_ to the worker.
+
+        Arrays are pickled by the queue in the background, so they must not
+        be modified after being submitted.
+
+        Returns:
+            submitted: bool, False if the figure was dropped
+        """
+        self.n_submitted += 1
+        if self._process is None:
+            self._start()
+        try:
+            self._jobs.put_nowait(kwargs)
+            return True
+        except queue.Full:
+            pass
+        if self.policy == 'drop':
+            self.n_skipped += 1
+            return False
+        try:
+            self._jobs.get_nowait()  # discard the waiting figure
+            self.n_skipped += 1
+        except queue.Empty:
+            pass
+        try:
+            self._jobs.put_nowait(kwargs)
+        except queue.Full:
+            self.n_skipped += 1
+            return False
+        return True
+
+    def close(self):
+        """Render the waiting figure and stop the worker."""
+        if self._process is None:
+            return
+        self._jobs.put(None)
+        self._process.join()
+        self._jobs = None
+        self._process = None
+
+
 def plot_env_1dbox(
         ob, actions, gt=None, rewards=None, performance=None, states=None,
         legend=True, ob_traces=None, name='', fname=None, fig_kwargs={},
@@ -346,13 +441,13 @@ def plot_env_3dbox(ob, actions=None, fname='', env=None):
 def plot_rew_across_training(folder, window=500, ax=None,
                              fkwargs={'c': 'tab:blue'}, ytitle='',
                              legend=False, zline=False, metric_name='reward'):
-    data = put_together_files(folder)
-    if data:
+    log = open_log(folder)
+    if log is not None and len(log) > 0:
         sv_fig = False
         if ax is None:
             sv_fig = True
             f, ax = plt.subplots(figsize=(8, 8))
-        metric = data[metric_name]
+        metric = np.asarray(log.read(metric_name), dtype=float)
         if isinstance(window, float):
             if window < 1.0:
                 window = int(metric.size * window)
@@ -376,18 +471,16 @@ def plot_rew_across_training(folder, window=500, ax=None,
 
 
 def put_together_files(folder):
-    files = glob.glob(folder + '/*_bhvr_data*npz')
+    """Load all the behavioral data saved by Monitor in folder.
+
+    The data is also saved in folder/bhvr_data_all.npz. To load only some
+    columns or trials, use neurogym.utils.logstore.open_log instead.
+    """
+    log = open_log(folder)
     data = {}
-    if len(files) > 0:
-        files = order_by_sufix(files)
-        file_data = np.load(files[0], allow_pickle=True)
-        for key in file_data.keys():
-            data[key] = file_data[key]
-
-        for ind_f in range(1, len(files)):
-            file_data = np.load(files[ind_f], allow_pickle=True)
-            for key in file_data.keys():
-                data[key] = np.concatenate((data[key], file_data[key]))
+    if log is not None and len(log) > 0:
+        for key in log.keys():
+            data[key] = log.read(key)
         np.savez(folder + '/bhvr_data_all.npz', **data)
     return data
 
@@ -0,0 +1,206 @@
+"""Opt-in profiling of the phases of step and new_trial."""
+
+import inspect
+import time
+
+import numpy as np
+
+from neurogym.core import TrialEnv, PeriodEnv
+
+# Methods of PeriodEnv timed per period
+PERIOD_METHODS = ['add_period', 'add_ob', 'set_ob', 'add_randn',
+                  'set_groundtruth']
+
+_MISSING = object()
+
+
+class Profiler(object):
+    """Time the phases of an env by replacing its methods on the instance.
+
+    For every layer of a wrapped env, step (and new_trial for trial
+    wrappers) is timed. For the task, step, _step, _step_core (if defined)
+    and new_trial are timed, as well as 'info', the time of step spent
+    outside of _step (or _step_core) and of new trials, i.e. the handling of
+    time counters and of the info dictionary. For PeriodEnv each call of
+    add_period, add_ob, set_ob, add_randn and set_groundtruth is timed under
+    the name of its period, e.g. 'add_ob[stimulus]'. Times of a layer
+    include the layers it calls.
+
+    Methods are only replaced while the profiler is attached, so envs that
+    are not profiled run without any overhead. Durations are accumulated in
+    histograms with power-of-two bins in ns.
+
+    Args:
+        env: TrialEnv, possibly wrapped
+    """
+
+    n_bins = 48
+
+    def __init__(self, env=None):
+        self.hists = {}  # name -> counts per bin
+        self.totals = {}  # name -> total ns
+        self._patched = []
+        # ns spent in the calls made by the task's step, and call depth
+        self._inner = [0, 0]
+        if env is not None:
+            self.attach(env)
+
+    def record(self, name, ns):
+        """Add a duration in ns."""
+        hist = self.hists.get(name)
+        if hist is None:
+            hist = self.hists[name] = np.zeros(self.n_bins, dtype=int)
+            self.totals[name] = 0
+        hist[min(ns.bit_length(), self.n_bins - 1)] += 1
+        self.totals[name] += ns
+
+    def _timed(self, obj, method, name, inner=False):
+        """Timed method, inner if its time is not part of 'info'."""
+        func = getattr(obj, method)
+        record = self.record
+        perf_counter_ns = time.perf_counter_ns
+        if not inner:
+            def timed(*args, **kwargs):
+                t0 = perf_counter_ns()
+                out = func(*args, **kwargs)
+                record(name, perf_counter_ns() - t0)
+                return out
+            return timed
+
+        depth = self._inner
+
+        def timed_inner(*args, **kwargs):
+            depth[1] += 1
+            t0 = perf_counter_ns()
+            try:
+                out = func(*args, **kwargs)
+            finally:
+                ns = perf_counter_ns() - t0
+                depth[1] -= 1
+            record(name, ns)
+            if depth[1] == 0:  # not called by another inner method
+                depth[0] += ns
+            return out
+        return timed_inner
+
+    def _timed_step(self, task, name):
+        """Timed step of the task, also recording the 'info' phase."""
+        func = task.step
+        record = self.record
+        perf_counter_ns = time.perf_counter_ns
+        inner = self._inner
+
+        def timed(action):
+            inner[0] = 0
+            t0 = perf_counter_ns()
+            out = func(action)
+            ns = perf_counter_ns() - t0
+            record(name + '.step', ns)
+            record(name + '.info', ns - inner[0])
+            return out
+        return timed
+
+    def _timed_period(self, obj, method, prefix):
+        func = getattr(obj, method)
+        # Position and default of the period argument, found once
+        params = list(inspect.signature(func).parameters.values())
+        i_period = [p.name for p in params].index('period')
+        default = params[i_period].default
+        record = self.record
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            t0 = perf_counter_ns()
+            out = func(*args, **kwargs)
+            t1 = perf_counter_ns()
+            if len(args) > i_period:
+                period = args[i_period]
+            else:
+                period = kwargs.get('period', default)
+            if not isinstance(period, str):
+                period = '+'.join(period) if period else 'all'
+            record(prefix + '[' + period + ']', t1 - t0)
+            return out
+        return timed
+
+    def _patch(self, obj, method, timed):
+        self._patched.append((obj, method, vars(obj).get(method, _MISSING)))
+        setattr(obj, method, timed)
+
+    def attach(self, env):
+        """Start timing env."""
+        task = env.unwrapped
+        if not isinstance(task, TrialEnv):
+            raise TypeError('Profiler can only be attached to TrialEnv. '
+                            'Got instead ' + str(task))
+        layer = env
+        while layer is not task:
+            name = type(layer).__name__
+            self._patch(layer, 'step',
+                        self._timed(layer, 'step', name + '.step'))
+            if 'new_trial' in dir(type(layer)):
+                # New trials are started by the task's step at its top
+                self._patch(layer, 'new_trial', self._timed(
+                    layer, 'new_trial', name + '.new_trial',
+                    inner=layer is task._top))
+            layer = layer.env
+
+        name = type(task).__name__
+        methods = ['_step', 'new_trial']
+        if type(task)._step_core is not TrialEnv._step_core:
+            methods.append('_step_core')
+        for method in methods:
+            inner = method != 'new_trial' or task._top is task
+            self._patch(task, method, self._timed(
+                task, method, name + '.' + method, inner=inner))
+        self._patch(task, 'step', self._timed_step(task, name))
+        if isinstance(task, PeriodEnv):
+            for method in PERIOD_METHODS:
+                self._patch(task, method,
+                            self._timed_period(task, method, method))
+        return self
+
+    def detach(self):
+        """Restore the original methods."""
+        for obj, method, prev in reversed(self._patched):
+            if prev is _MISSING:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, prev)
+        self._patched = []
+
+    def percentile(self, name, q):
+        """Approximate percentile in ns (upper edge of the histogram bin)."""
+        hist = self.hists[name]
+        cum = np.cumsum(hist)
+        b = int(np.searchsorted(cum, q / 100. * cum[-1]))
+        return 2 ** b
+
+    def report(self):
+        """Statistics per timed phase, times in us."""
+        stats = {}
+        for name, hist in self.hists.items():
+            count = int(hist.sum())
+            stats[name] = {
+                'count': count,
+                'total_ms': self.totals[name] * 1e-6,
+                'mean_us': self.totals[name] * 1e-3 / count,
+                'p50_us': self.percentile(name, 50) * 1e-3,
+                'p99_us': self.percentile(name, 99) * 1e-3,
+            }
+        return stats
+
+    def summary(self):
+        """Table of the report, sorted by total time."""
+        stats = self.report()
+        width = max([len(name) for name in stats] + [5])
+        fmt = '{:<' + str(width) + 's} {:>9} {:>10} {:>9} {:>9} {:>9}'
+        lines = [fmt.format('phase', 'count', 'total(ms)', 'mean(us)',
+                            'p50(us)', 'p99(us)')]
+        for name in sorted(stats, key=lambda k: -stats[k]['total_ms']):
+            s = stats[name]
+            lines.append(fmt.format(
+                name, s['count'], '{:.2f}'.format(s['total_ms']),
+                '{:.2f}'.format(s['mean_us']), '{:.2f}'.format(s['p50_us']),
+                '{:.2f}'.format(s['p99_us'])))
+        return '\n'.join(lines)
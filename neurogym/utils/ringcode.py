@@ -0,0 +1,119 @@
+"""Ring encoding of angles from precomputed tuning curves.
+
+A ring of dim_ring units has preferred angles 2*pi*i/dim_ring. The response
+of unit i to an angle a only depends on a - 2*pi*i/dim_ring, so the responses
+of all units to resolution angles regularly spaced over the circle are
+computed once, with resolution a multiple of dim_ring. The responses to
+angles of this grid (e.g. the preferred angles of the units) are exact
+table rows. Other angles are linearly interpolated between the two
+neighbouring rows, with an error of at most max|f''| * h**2 / 8 for a tuning
+curve f and grid step h = 2*pi/resolution (RingCode.max_error). With the
+default resolution of 16 * dim_ring this is 0.019 / dim_ring**2 for the
+cosine (1.9e-5 for dim_ring=32, 3e-7 for dim_ring=256) and 0.125 / dim_ring**2
+for the gaussian of width pi/8 and amplitude 1.
+
+Tables pay off for batches of angles (e.g. the batched envs) and for the
+gaussian. For a single angle, np.cos(theta - angle) is faster than reading
+the cosine table, so single envs keep computing it.
+
+Tables are shared by all tasks using the same ring through get_ring_code.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+_TWO_PI = 2 * np.pi
+
+
+def _periodic_dist(x):
+    """Distance on the circle."""
+    x = np.mod(x, 2 * np.pi)
+    return np.minimum(x, 2 * np.pi - x)
+
+
+class RingCode(object):
+    """Tuning curves of a ring of units, evaluated from a table.
+
+    Args:
+        dim_ring: int, number of units
+        kind: 'cosine', cos(a - theta_i), or 'gaussian',
+            exp(-d**2 / (2 * width**2)) with d the distance on the circle
+            between a and theta_i
+        width: float, width of the gaussian tuning curves (rad)
+        resolution: int, number of table rows, multiple of dim_ring
+            (def: 16 * dim_ring)
+    """
+
+    def __init__(self, dim_ring, kind='cosine', width=np.pi / 8,
+                 resolution=None):
+        if resolution is None:
+            resolution = 16 * dim_ring
+        if resolution % dim_ring != 0:
+            raise ValueError('resolution must be a multiple of dim_ring')
+        self.dim_ring = dim_ring
+        self.kind = kind
+        self.width = width
+        self.resolution = resolution
+        self.theta = 2 * np.pi * np.arange(dim_ring) / dim_ring
+
+        # Row j is the response to angle 2*pi*j/resolution, slopes are the
+        # differences with the next row
+        angles = 2 * np.pi * np.arange(resolution + 1) / resolution
+        table = self.curve(angles[:, None] - self.theta)
+        self.slopes = np.diff(table, axis=0)
+        self.table = table[:-1]
+        self.table.flags.writeable = False
+        self.slopes.flags.writeable = False
+        self._scale = resolution / (2 * np.pi)
+
+        h = 2 * np.pi / resolution
+        max_d2 = 1. if kind == 'cosine' else 1. / width**2
+        self.max_error = max_d2 * h**2 / 8
+
+    def curve(self, d):
+        """Exact tuning curve at angle differences d."""
+        if self.kind == 'cosine':
+            return np.cos(d)
+        elif self.kind == 'gaussian':
+            return np.exp(-_periodic_dist(d)**2 / (2 * self.width**2))
+        raise ValueError('Unknown kind of ring code ' + str(self.kind))
+
+    def __call__(self, angle, interpolate=True):
+        """Responses of the ring to angles.
+
+        Args:
+            angle: float or array (n,), angles (rad)
+            interpolate: bool, if False, angles are rounded to the nearest
+                table row
+
+        Returns:
+            array (dim_ring,) or (n, dim_ring)
+        """
+        if isinstance(angle, (float, int, np.number)):
+            x = angle % _TWO_PI * self._scale
+            if not interpolate:
+                return self.table[int(round(x)) % self.resolution].copy()
+            j = int(x)
+            if j == self.resolution:  # x close to resolution
+                j -= 1
+            return self.table[j] + (x - j) * self.slopes[j]
+        x = np.mod(angle, 2 * np.pi) * self._scale
+        if not interpolate:
+            ind = np.rint(x).astype(int) % self.resolution
+            return np.take(self.table, ind, axis=0)
+        j = np.minimum(x.astype(int), self.resolution - 1)
+        out = np.take(self.slopes, j, axis=0)
+        out *= (x - j)[..., None]
+        out += np.take(self.table, j, axis=0)
+        return out
+
+    def __deepcopy__(self, memo):
+        # Tables are read-only and shared
+        return self
+
+
+@lru_cache(maxsize=None)
+def get_ring_code(dim_ring, kind='cosine', width=np.pi / 8, resolution=None):
+    """Shared RingCode with these parameters, see RingCode."""
+    return RingCode(dim_ring, kind=kind, width=width, resolution=resolution)
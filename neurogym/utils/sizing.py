@@ -0,0 +1,191 @@
+"""Predict trial lengths and memory use from the timing of a task.
+
+The number of steps of a trial is the sum over its periods of the sampled
+duration divided by dt (rounded down, as in PeriodEnv.sample_time). The
+prediction assumes that the periods of the timing dictionary are
+sequential, which is the case for most tasks; validate compares it with
+trials generated by the task.
+"""
+
+import numpy as np
+import gym
+
+from neurogym.utils.data import Dataset, get_cache_len
+
+# Number of points used to integrate continuous distributions
+N_GRID = 10001
+
+
+def _grid_mean(x, weights, dt):
+    return float(np.sum(np.floor(x / dt) * weights) / np.sum(weights))
+
+
+def period_steps(dist, args, dt):
+    """Expected and maximum number of steps of a period.
+
+    Args:
+        dist, args: timing specification of the period, e.g. ('uniform',
+            (300, 600))
+        dt: time step (ms)
+
+    Returns:
+        expected: float, expected number of steps
+        maximum: float, maximum number of steps (inf if unbounded)
+    """
+    if dist == 'constant':
+        steps = float(np.floor(args / dt))
+        return steps, steps
+    elif dist == 'choice':
+        steps = np.floor(np.asarray(args, dtype=float) / dt)
+        return float(steps.mean()), float(steps.max())
+    elif dist == 'uniform':
+        low, high = args
+        x = np.linspace(low, high, N_GRID)
+        return (_grid_mean(x, np.ones(N_GRID), dt),
+                float(np.floor(high / dt)))
+    elif dist == 'truncated_exponential':
+        mean, xmin, xmax = (list(args) + [0, np.inf])[:3]
+        if xmin >= xmax:
+            steps = float(np.floor(xmax / dt))
+            return steps, steps
+        upper = xmax if np.isfinite(xmax) else xmin + 30 * mean
+        x = np.linspace(xmin, upper, N_GRID)
+        return (_grid_mean(x, np.exp(-x / mean), dt),
+                float(np.floor(xmax / dt)))
+    else:
+        raise ValueError('Unknown dist:', str(dist))
+
+
+def trial_steps(env):
+    """Expected and maximum number of steps of a trial of env.
+
+    Returns (None, None) for tasks without timing.
+    """
+    task = env.unwrapped
+    timing = getattr(task, 'timing', None)
+    if not timing:
+        return None, None
+    expected, maximum = 0., 0.
+    for dist, args in timing.values():
+        e, m = period_steps(dist, args, task.dt)
+        expected += e
+        maximum += m
+    return expected, maximum
+
+
+def bytes_per_step(env):
+    """Bytes of the ob and gt arrays of a task per trial step."""
+    task = env.unwrapped
+    ob_space, act_space = task.observation_space, task.action_space
+    n_ob = int(np.prod(ob_space.shape)) + getattr(task, '_n_ob_extra', 0)
+    n_act = int(np.prod(act_space.shape))
+    return (n_ob * np.dtype(ob_space.dtype).itemsize +
+            n_act * np.dtype(act_space.dtype).itemsize)
+
+
+def trial_memory(env):
+    """Expected and maximum bytes of the ob and gt arrays of a trial."""
+    expected, maximum = trial_steps(env)
+    if expected is None:
+        return None, None
+    n_bytes = bytes_per_step(env)
+    return expected * n_bytes, maximum * n_bytes
+
+
+def dataset_memory(env, batch_size=1, seq_len=None, cache_len=None,
+                   compact_ob=False, dtype=None):
+    """Predict memory used by a Dataset of env.
+
+    Args:
+        env: gym.Env or str, env id
+        batch_size, seq_len, cache_len, compact_ob, dtype: as in Dataset
+
+    Returns:
+        dict with the cache length (steps), the bytes of the cache and of the
+        trial arrays held by the batch_size envs (expected and maximum).
+        With compact_ob, the frame buffer grows with the number of distinct
+        frames, so cache_bytes is its initial size and max_cache_bytes its
+        largest possible size
+    """
+    if isinstance(env, str):
+        env = gym.make(env)
+    if seq_len is None:
+        seq_len = 1000  # Dataset default
+    obs_shape = env.observation_space.shape
+    action_shape = env.action_space.shape
+    cache_len = get_cache_len(obs_shape, action_shape, batch_size, seq_len,
+                              cache_len)
+    n_steps = cache_len * batch_size
+    n_ob = int(np.prod(obs_shape))
+    # Targets are cached as float64
+    target_bytes = n_steps * int(np.prod(action_shape)) * 8
+    if compact_ob:
+        frame_bytes = n_ob * np.dtype(env.observation_space.dtype).itemsize
+        index_bytes = n_steps * np.dtype(np.int64).itemsize
+        cache_bytes = target_bytes + index_bytes + cache_len * frame_bytes
+        # The frame buffer at least doubles when full
+        max_frames = cache_len if batch_size == 1 else 2 * n_steps
+        max_cache_bytes = target_bytes + index_bytes + max_frames * frame_bytes
+    else:
+        dtype = np.dtype(np.float64 if dtype is None else dtype)
+        cache_bytes = target_bytes + n_steps * n_ob * dtype.itemsize
+        max_cache_bytes = cache_bytes
+    expected, maximum = trial_memory(env)
+    info = {'cache_len': cache_len, 'cache_bytes': cache_bytes,
+            'max_cache_bytes': max_cache_bytes}
+    if expected is not None:
+        info['trial_bytes'] = batch_size * expected
+        info['max_trial_bytes'] = batch_size * maximum
+        info['max_total_bytes'] = max_cache_bytes + batch_size * maximum
+    return info
+
+
+def validate(env_name, dts=(1, 10, 20, 100), n_trials=200, batch_size=4,
+             seq_len=100, env_kwargs=None, compact_ob=False, dtype=None):
+    """Compare predicted and observed trial lengths and memory over dt.
+
+    Args:
+        env_name: str, env id
+        dts: list of dt values
+        n_trials: number of trials sampled per dt
+        batch_size, seq_len, compact_ob, dtype: Dataset parameters
+        env_kwargs: dict, additional kwargs for the env
+
+    Returns:
+        list of dict, one per dt, with predicted and observed values
+    """
+    results = list()
+    for dt in dts:
+        kwargs = dict(env_kwargs or {}, dt=dt)
+        env = gym.make(env_name, **kwargs)
+        env.reset()
+        lengths = list()
+        n_bytes = list()
+        for _ in range(n_trials):
+            env.new_trial()
+            task = env.unwrapped
+            lengths.append(task.ob.shape[0])
+            n_bytes.append(task.ob.nbytes + task.gt.nbytes)
+        expected, maximum = trial_steps(env)
+        expected_bytes, _ = trial_memory(env)
+        dataset = Dataset(env_name, env_kwargs=kwargs, batch_size=batch_size,
+                          seq_len=seq_len, compact_ob=compact_ob,
+                          dtype=dtype)
+        predicted = dataset_memory(env, batch_size, seq_len,
+                                   compact_ob=compact_ob, dtype=dtype)
+        if compact_ob:
+            observed = dataset._frames.nbytes + dataset._index.nbytes
+        else:
+            observed = dataset._inputs.nbytes
+        results.append({
+            'dt': dt,
+            'expected_steps': expected, 'max_steps': maximum,
+            'mean_steps': float(np.mean(lengths)),
+            'observed_max_steps': int(np.max(lengths)),
+            'expected_trial_bytes': expected_bytes,
+            'mean_trial_bytes': float(np.mean(n_bytes)),
+            'cache_bytes': predicted['cache_bytes'],
+            'max_cache_bytes': predicted['max_cache_bytes'],
+            'observed_cache_bytes': observed + dataset._target.nbytes,
+        })
+    return results
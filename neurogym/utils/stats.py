@@ -0,0 +1,138 @@
+"""Rolling statistics over a window of recent values."""
+
+import numpy as np
+
+
+class RollingStats(object):
+    """Running statistics of the last w values, with O(1) updates.
+
+    Values are stored in a fixed-size ring buffer. The sum and sum of squares
+    of the window are updated when a value enters or leaves the window, and
+    recomputed from the buffer once every w pushes to avoid numerical drift.
+
+    Args:
+        w: int, window length
+        alpha: float, if not None, also track an exponentially weighted moving
+            average with smoothing factor alpha (def: None)
+        bins: int, if not None, also track a histogram of the window with bins
+            bins, used to compute percentiles (def: None)
+        range: tuple (low, high), range of the histogram. Values outside of it
+            are counted in the first or last bin (def: (0, 1))
+    """
+
+    def __init__(self, w, alpha=None, bins=None, range=(0., 1.)):
+        if w < 1:
+            raise ValueError('Window length must be positive, got ' + str(w))
+        self.w = int(w)
+        self.alpha = alpha
+        self.bins = bins
+        if bins is not None:
+            self.edges = np.linspace(range[0], range[1], bins + 1)
+            self._bin_scale = bins / (range[1] - range[0])
+        self._buffer = np.zeros(self.w)
+        self._bin_buffer = np.zeros(self.w, dtype=int)
+        self.reset()
+
+    def reset(self):
+        """Empty the window."""
+        self.n = 0  # number of values in the window
+        self.count = 0  # total number of values pushed
+        self._i = 0  # position of the next value in the buffer
+        self._sum = 0.
+        self._sumsq = 0.
+        self.ewma = None
+        if self.bins is not None:
+            self.hist = np.zeros(self.bins, dtype=int)
+
+    def _bin(self, value):
+        i = int((value - self.edges[0]) * self._bin_scale)
+        return min(max(i, 0), self.bins - 1)
+
+    def push(self, value):
+        """Add a value to the window, dropping the oldest one if full."""
+        value = float(value)
+        i = self._i
+        if self.n == self.w:
+            old = self._buffer[i]
+            self._sum -= old
+            self._sumsq -= old * old
+            if self.bins is not None:
+                self.hist[self._bin_buffer[i]] -= 1
+        else:
+            self.n += 1
+        self._buffer[i] = value
+        self._sum += value
+        self._sumsq += value * value
+        if self.bins is not None:
+            b = self._bin(value)
+            self._bin_buffer[i] = b
+            self.hist[b] += 1
+        if self.alpha is not None:
+            if self.ewma is None:
+                self.ewma = value
+            else:
+                self.ewma += self.alpha * (value - self.ewma)
+        self.count += 1
+        self._i = (i + 1) % self.w
+        if self._i == 0:
+            window = self._buffer[:self.n]
+            self._sum = window.sum()
+            self._sumsq = (window * window).sum()
+
+    @property
+    def full(self):
+        """Whether the window contains w values."""
+        return self.n == self.w
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def mean(self):
+        if self.n == 0:
+            return np.nan
+        return self._sum / self.n
+
+    @property
+    def var(self):
+        """Population variance of the window."""
+        if self.n == 0:
+            return np.nan
+        mean = self._sum / self.n
+        return max(self._sumsq / self.n - mean * mean, 0.)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def values(self):
+        """Values in the window, oldest first (a copy)."""
+        if self.n < self.w:
+            return self._buffer[:self.n].copy()
+        return np.roll(self._buffer, -self._i)
+
+    def percentile(self, q):
+        """Approximate q-th percentile of the window from its histogram.
+
+        The error is at most one bin width for values inside the range.
+        """
+        if self.bins is None:
+            raise ValueError('Percentiles need a histogram, set bins')
+        if self.n == 0:
+            return np.nan
+        cum = np.cumsum(self.hist)
+        target = q / 100. * self.n
+        b = min(int(np.searchsorted(cum, target)), self.bins - 1)
+        prev = cum[b - 1] if b > 0 else 0
+        frac = (target - prev) / self.hist[b] if self.hist[b] else 0.
+        return self.edges[b] + frac * (self.edges[b + 1] - self.edges[b])
+
+    def summary(self, prefix=''):
+        """Dictionary of the current statistics, e.g. to add to info."""
+        stats = {prefix + 'mean': self.mean, prefix + 'std': self.std,
+                 prefix + 'n': self.n}
+        if self.alpha is not None:
+            stats[prefix + 'ewma'] = self.ewma
+        return stats
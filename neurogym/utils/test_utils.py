@@ -1,8 +1,22 @@
 """Test utilities."""
 
+import os
+import shutil
+import tempfile
+
+import numpy as np
 import gym
 import neurogym as ngym
+from neurogym.core import StepInfo
 from neurogym.utils.data import Dataset
+from neurogym.utils.stats import RollingStats
+from neurogym.utils.logstore import LogWriter, LogReader
+from neurogym.utils.metrics import TrialMetrics
+from neurogym.utils.profiling import Profiler
+from neurogym.utils import sizing
+from neurogym.utils.ringcode import RingCode
+from neurogym.utils.evalset import make_eval_set
+from neurogym.wrappers import Noise
 
 
 def test_dataset(env):
@@ -37,5 +51,248 @@ def test_dataset_all():
     print('Expect {:d} envs to support supervised learning'.format(supervised_count))
 
 
+def test_dataset_compact(env='psychopy.VisualSearch-v0'):
+    """Compact uint8 caches give the same batches as float caches."""
+    kwargs = {'backend': 'numpy', 'win_size': (20, 20)}
+    batches = list()
+    for compact in [False, True]:
+        task = gym.make(env, **kwargs)
+        task.seed(0)
+        dataset = Dataset(task, batch_size=4, seq_len=50, cache_len=200,
+                          compact_ob=compact)
+        # Batches are views of the cache, which is refilled
+        batches.append([[x.copy() for x in dataset()] for _ in range(6)])
+    for (inputs1, target1), (inputs2, target2) in zip(*batches):
+        assert inputs2.dtype == np.float64
+        assert np.array_equal(inputs1, inputs2)
+        assert np.array_equal(target1, target2)
+    assert dataset._frames.dtype == np.uint8
+    assert dataset._n_frames < dataset._index.size / 10
+
+    out = np.zeros(dataset.inputs_shape, dtype=np.float32)
+    inputs, target = dataset(out=out)
+    assert inputs is out and out.any()
+
+
+def test_rolling_stats(w=50, n=1000):
+    """Rolling statistics match numpy on the last w values."""
+    rng = np.random.RandomState(0)
+    values = rng.rand(n)
+    stats = RollingStats(w, alpha=0.1, bins=100, range=(0, 1))
+    for i, v in enumerate(values):
+        stats.push(v)
+        window = values[max(0, i + 1 - w):i + 1]
+        assert np.isclose(stats.mean, window.mean())
+        assert np.isclose(stats.var, window.var())
+    assert np.allclose(stats.values, values[-w:])
+    assert abs(stats.percentile(50) - np.median(values[-w:])) < 0.05
+    stats.reset()
+    assert stats.n == 0 and np.isnan(stats.mean)
+
+
+def test_logstore(num_trials=100, chunk_size=7):
+    """Trial ranges read from a log match the recorded trials."""
+    for compress in [False, True]:
+        folder = tempfile.mkdtemp()
+        writer = LogWriter(folder, chunk_size=chunk_size, compress=compress)
+        for i in range(num_trials):
+            record = {'trial': i, 'ob': np.ones(3) * i, 'name': str(i)}
+            if i >= 50:
+                record['late'] = i / 2
+            writer.append(record)
+        writer.close()
+        log = LogReader(folder)
+        assert len(log) == num_trials
+        assert (log.read('trial', 13, 41) == np.arange(13, 41)).all()
+        assert log.read('ob', 95).shape == (5, 3)
+        assert log.read('name', 20, 22).tolist() == ['20', '21']
+        assert (log.read('late', 48, 52) == [0, 0, 25, 25.5]).all()
+        shutil.rmtree(folder)
+
+
+def test_logstore_error(num_trials=30, chunk_size=5):
+    """Errors saving chunks are raised and do not block the writer."""
+    folder = tempfile.mkdtemp()
+    writer = LogWriter(folder, chunk_size=chunk_size)
+    shutil.rmtree(folder)
+    n_errors = 0
+    for i in range(num_trials):
+        try:
+            writer.append({'trial': i})
+        except OSError:
+            n_errors += 1
+    try:
+        writer.close()
+    except OSError:
+        n_errors += 1
+    assert n_errors > 0
+    assert writer.num_trials == num_trials
+
+
+def test_metrics(env='PerceptualDecisionMaking-v0', num_steps=5000):
+    """Metrics of an agent always choosing the ground truth."""
+    env = gym.make(env, dt=100)
+    metrics = TrialMetrics(keys=['ground_truth']).attach(env)
+    env.reset()
+    for i in range(num_steps):
+        env.step(env.unwrapped.gt_now)
+    snap = metrics.snapshot()
+    assert snap['trials'] == env.unwrapped.num_tr
+    assert snap['accuracy'] == 1
+    for cond in snap['conditions']:
+        # last action is the ground truth choice
+        assert cond['choice_frac'][cond['ground_truth'] + 1] == 1
+    metrics.detach()
+    assert 'step' not in vars(env.unwrapped)
+
+
+def test_metrics_chain(env='PerceptualDecisionMaking-v0', num_steps=2000):
+    """Metrics keep lean mode and restore the step they replaced."""
+    env = gym.make(env, dt=100)
+    task = env.unwrapped
+    task.set_lean()
+    profiler = Profiler(env)
+    profiled_step = vars(task)['step']
+    metrics = TrialMetrics().attach(env)
+    env.reset()
+    for i in range(num_steps):
+        info = env.step(task.gt_now)[3]
+        assert isinstance(info, StepInfo)
+    assert metrics.snapshot()['trials'] == task.num_tr
+    assert metrics.snapshot()['accuracy'] == 1
+    assert profiler.report()[type(task).__name__ + '.step']['count'] > 0
+    metrics.detach()
+    assert vars(task)['step'] is profiled_step
+    profiler.detach()
+    assert 'step' not in vars(task)
+    assert isinstance(env.step(0)[3], StepInfo)
+
+    # Metrics can not be detached below a step replaced after them
+    metrics.attach(env)
+    profiler = Profiler(env)
+    try:
+        metrics.detach()
+        raise AssertionError('detach order not checked')
+    except RuntimeError:
+        pass
+    profiler.detach()
+    metrics.detach()
+    assert 'step' not in vars(task)
+
+
+def test_profiler(env='PerceptualDecisionMaking-v0', num_steps=1000):
+    """Profiler times every phase and restores the env when detached."""
+    env = gym.make(env, dt=20)
+    profiler = Profiler(env)
+    env.reset()
+    for i in range(num_steps):
+        env.step(env.action_space.sample())
+    stats = profiler.report()
+    name = type(env.unwrapped).__name__
+    assert stats[name + '.step']['count'] == num_steps + 1
+    assert stats[name + '._step_core']['count'] == num_steps + 1
+    assert stats['add_ob[stimulus]']['count'] == env.unwrapped.num_tr + 1
+    # Info handling is the part of step outside of _step and new_trial
+    info = stats[name + '.info']
+    assert info['count'] == num_steps + 1
+    assert 0 < info['total_ms'] < (stats[name + '.step']['total_ms'] -
+                                   stats[name + '._step']['total_ms'])
+    profiler.detach()
+    assert not ({'step', '_step', '_step_core', 'new_trial'} &
+                set(vars(env.unwrapped)))
+
+    # Lean mode only calls _step_core
+    env.unwrapped.set_lean()
+    profiler = Profiler(env)
+    for i in range(num_steps):
+        env.step(env.action_space.sample())
+    stats = profiler.report()
+    assert name + '._step' not in stats
+    assert stats[name + '._step_core']['count'] == num_steps
+    assert stats[name + '.info']['count'] == num_steps
+    profiler.detach()
+
+
+def test_sizing(env='DelayComparison-v0'):
+    """Predicted trial length and memory match generated trials."""
+    for result in sizing.validate(env, dts=(20, 100), n_trials=200):
+        assert result['observed_max_steps'] <= result['max_steps']
+        assert np.isclose(result['mean_steps'], result['expected_steps'],
+                          rtol=0.05)
+        assert np.isclose(result['mean_trial_bytes'],
+                          result['expected_trial_bytes'], rtol=0.05)
+        assert result['cache_bytes'] == result['observed_cache_bytes']
+    # Cache follows the dtype and compact mode of the Dataset
+    for dtype in ['float32', 'float16']:
+        for result in sizing.validate(env, dts=(100,), n_trials=1,
+                                      dtype=dtype):
+            assert result['cache_bytes'] == result['observed_cache_bytes']
+    for batch_size in [1, 4]:
+        for result in sizing.validate(env, dts=(100,), n_trials=1,
+                                      batch_size=batch_size,
+                                      compact_ob=True):
+            assert (result['cache_bytes'] <= result['observed_cache_bytes']
+                    <= result['max_cache_bytes'])
+
+
+
+def test_ring_code(dim_ring=32, n=1000):
+    """Tables match the exact tuning curves within max_error."""
+    rng = np.random.RandomState(0)
+    angles = rng.uniform(-4 * np.pi, 4 * np.pi, n)
+    for kind in ['cosine', 'gaussian']:
+        ring = RingCode(dim_ring, kind=kind)
+        exact = ring.curve(angles[:, None] - ring.theta)
+        ob = ring(angles)
+        assert ob.shape == (n, dim_ring)
+        assert np.abs(ob - exact).max() <= ring.max_error
+        assert np.allclose(ring(angles[0]), ob[0])
+        # Angles of the grid are exact
+        assert np.allclose(ring(ring.theta), ring.curve(ring.theta[:, None] -
+                                                        ring.theta))
+    try:
+        RingCode(dim_ring, resolution=dim_ring + 1)
+        raise AssertionError('resolution not checked')
+    except ValueError:
+        pass
+
+
+
+def test_eval_set(env='PerceptualDecisionMaking-v0', n_repeats=3):
+    """Evaluation sets are balanced, reproducible and cached."""
+    task = gym.make(env)
+    conditions = task.condition_space()
+    assert len(conditions) == np.prod([len(v) for v in
+                                       task.trial_vars.values()])
+    tmpdir = tempfile.mkdtemp()
+    try:
+        eval_set = make_eval_set(env, n_repeats=n_repeats, cache_dir=tmpdir)
+        assert len(eval_set) == len(conditions) * n_repeats
+        assert (np.bincount(eval_set.condition) == n_repeats).all()
+        ob, gt, condition = eval_set.trial(0)
+        assert len(ob) == len(gt) == eval_set.lengths[0]
+        assert condition == conditions[eval_set.condition[0]]
+
+        # Same trials when generated again, or loaded from the cache
+        other = make_eval_set(env, n_repeats=n_repeats)
+        assert np.array_equal(eval_set.ob, other.ob)
+        assert len(os.listdir(tmpdir)) == 1
+        task.reset()
+        cached = make_eval_set(task, n_repeats=n_repeats, cache_dir=tmpdir)
+        assert np.array_equal(eval_set.ob, cached.ob)
+        assert np.array_equal(eval_set.gt, cached.gt)
+        assert len(os.listdir(tmpdir)) == 1
+        make_eval_set(env, n_repeats=n_repeats, cache_dir=tmpdir, seed=1)
+        assert len(os.listdir(tmpdir)) == 2
+
+        # Wrappers are part of the cache key
+        noisy = make_eval_set(Noise(task, std_noise=5.), n_repeats=n_repeats,
+                              cache_dir=tmpdir)
+        assert not np.array_equal(eval_set.ob, noisy.ob)
+        assert len(os.listdir(tmpdir)) == 3
+    finally:
+        shutil.rmtree(tmpdir)
+
+
 if __name__ == '__main__':
     test_dataset_all()
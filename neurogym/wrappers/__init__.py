@@ -1,21 +1,33 @@
-from neurogym.wrappers.catch_trials import CatchTrials
-from neurogym.wrappers.monitor import Monitor
-from neurogym.wrappers.noise import Noise
-from neurogym.wrappers.pass_reward import PassReward
-from neurogym.wrappers.pass_action import PassAction
-from neurogym.wrappers.reaction_time import ReactionTime
-from neurogym.wrappers.side_bias import SideBias
-from neurogym.wrappers.trial_hist import TrialHistory
-from neurogym.wrappers.ttl_pulse import TTLPulse
-from neurogym.wrappers.combine import Combine
-from neurogym.wrappers.identity import Identity
-from neurogym.wrappers.transfer_learning import TransferLearning
-from neurogym.wrappers.variable_nch import Variable_nch
-from neurogym.wrappers.block import RandomGroundTruth
-from neurogym.wrappers.block import ScheduleAttr
-from neurogym.wrappers.block import ScheduleEnvs
-from neurogym.wrappers.block import TrialHistoryV2
+"""Wrappers of neurogym envs.
 
+Wrapper classes are imported when first accessed (PEP 562), so that
+importing neurogym does not import every wrapper module and their
+dependencies, e.g. matplotlib for Monitor.
+"""
+
+import importlib
+
+# Wrapper class -> module
+_LAZY_WRAPPERS = {
+    'CatchTrials': 'catch_trials',
+    'Monitor': 'monitor',
+    'Noise': 'noise',
+    'PassReward': 'pass_reward',
+    'PassAction': 'pass_action',
+    'ReactionTime': 'reaction_time',
+    'SideBias': 'side_bias',
+    'TrialHistory': 'trial_hist',
+    'TTLPulse': 'ttl_pulse',
+    'Combine': 'combine',
+    'Identity': 'identity',
+    'TransferLearning': 'transfer_learning',
+    'Variable_nch': 'variable_nch',
+    'RandomGroundTruth': 'block',
+    'ScheduleAttr': 'block',
+    'ScheduleCurriculum': 'block',
+    'ScheduleEnvs': 'block',
+    'TrialHistoryV2': 'block',
+}
 
 ALL_WRAPPERS = {'CatchTrials-v0': 'neurogym.wrappers.catch_trials:CatchTrials',
                 'Monitor-v0': 'neurogym.wrappers.monitor:Monitor',
@@ -45,3 +57,23 @@ ALL_WRAPPERS = {'CatchTrials-v0': 'neurogym.wrappers.catch_trials:CatchTrials',
 
 def all_wrappers():
     return sorted(list(ALL_WRAPPERS.keys()))
+
+
+def __getattr__(name):
+    if name in _LAZY_WRAPPERS:
+        module = importlib.import_module(
+            'neurogym.wrappers.' + _LAZY_WRAPPERS[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    try:
+        return importlib.import_module('neurogym.wrappers.' + name)
+    except ModuleNotFoundError as e:
+        if e.name != 'neurogym.wrappers.' + name:
+            raise
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_WRAPPERS))
@@ -46,6 +46,45 @@ class ScheduleAttr(TrialWrapperV2):
         return self.env.new_trial(**kwargs)
 
 
+class ScheduleCurriculum(TrialWrapperV2):
+    """Schedule task parameters with a performance-driven curriculum.
+
+    The attributes of the current stage are set on the task before every
+    new trial, and the performance of every finished trial is fed back to
+    the curriculum.
+
+    Args:
+        env: TrialEnv object
+        curriculum: neurogym.utils.curriculum.Curriculum object
+    """
+    def __init__(self, env, curriculum):
+        super().__init__(env)
+        self.curriculum = curriculum
+        self._cond = None
+        self._prev_cond = None
+
+    def new_trial(self, **kwargs):
+        self.curriculum.apply(self.unwrapped)
+        trial = self.env.new_trial(**kwargs)
+        condition = self.curriculum.condition
+        self._prev_cond = self._cond
+        if condition is not None:
+            self._cond = self.unwrapped.trial[condition]
+        return trial
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        reward = self.fused_step(action, obs, reward, info, None)
+        return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        if info['new_trial']:
+            # The next trial was already generated, use the finished one
+            self.curriculum.update(info['performance'], self._prev_cond)
+            info['curr_stage'] = self.curriculum.stage
+        return reward
+
+
 def _have_equal_shape(envs):
     """Check if environments have equal shape."""
     env_ob_shape = envs[0].observation_space.shape
@@ -65,6 +104,19 @@ def _have_equal_shape(envs):
                 ' and ' + str(env_act_shape) + ' for ' + str(envs[0]))
 
 
+def _add_env_input(task, ob_slot, i_env):
+    """Set the input indicating the current environment."""
+    if task.ob.shape[-1] >= ob_slot.stop:
+        # Channels were reserved and allocated by the task
+        task.ob[:, ob_slot.start + i_env] = 1.
+    else:
+        # Expand observation
+        env_ob = np.zeros((task.ob.shape[0], ob_slot.stop - ob_slot.start),
+                          dtype=task.ob.dtype)
+        env_ob[:, i_env] = 1.
+        task.ob = np.concatenate((task.ob, env_ob), axis=-1)
+
+
 class MultiEnvs(TrialWrapperV2):
     """Wrap multiple environments.
 
@@ -91,6 +143,9 @@ class MultiEnvs(TrialWrapperV2):
                 -np.inf, np.inf, shape=(env_shape[0] + len(self.envs),),
                 dtype=self.observation_space.dtype
             )
+            for env in envs:
+                self.ob_slot = env.unwrapped.reserve_ob('env_input',
+                                                        len(self.envs))
 
     def set_i(self, i):
         """Set the i-th environment."""
@@ -102,12 +157,7 @@ class MultiEnvs(TrialWrapperV2):
             return self.env.new_trial(**kwargs)
         else:
             self.env.new_trial(**kwargs)
-            # Expand observation
-            env_ob = np.zeros((self.unwrapped.ob.shape[0], len(self.envs)),
-                              dtype=self.unwrapped.ob.dtype)
-            env_ob[:, self.i_env] = 1.
-            self.unwrapped.ob = np.concatenate(
-                (self.unwrapped.ob, env_ob), axis=-1)
+            _add_env_input(self.unwrapped, self.ob_slot, self.i_env)
 
 
 class ScheduleEnvs(TrialWrapperV2):
@@ -138,6 +188,9 @@ class ScheduleEnvs(TrialWrapperV2):
                 -np.inf, np.inf, shape=(env_shape[0] + len(self.envs),),
                 dtype=self.observation_space.dtype
             )
+            for env in envs:
+                self.ob_slot = env.unwrapped.reserve_ob('env_input',
+                                                        len(self.envs))
 
     def new_trial(self, **kwargs):
         self.i_env = self.schedule()
@@ -146,12 +199,7 @@ class ScheduleEnvs(TrialWrapperV2):
             return self.env.new_trial(**kwargs)
         else:
             self.env.new_trial(**kwargs)
-            # Expand observation
-            env_ob = np.zeros((self.unwrapped.ob.shape[0], len(self.envs)),
-                              dtype=self.unwrapped.ob.dtype)
-            env_ob[:, self.i_env] = 1.
-            self.unwrapped.ob = np.concatenate(
-                (self.unwrapped.ob, env_ob), axis=-1)
+            _add_env_input(self.unwrapped, self.ob_slot, self.i_env)
 
 
 class TrialHistoryV2(TrialWrapperV2):
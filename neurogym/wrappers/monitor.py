@@ -4,7 +4,7 @@
 from gym import Wrapper
 import os
 import numpy as np
-from neurogym.utils.plotting import fig_
+from neurogym.utils.logstore import LogWriter
 
 
 class Monitor(Wrapper):
@@ -23,6 +23,20 @@ class Monitor(Wrapper):
             a figure will be updated every sv_per. (def: False, bool)
         num_stps_sv_fig: Number of trial steps to include in the figure.
             (def: 100, int)
+        backend: How behavioral data is saved. 'npz' saves the data of the
+            last sv_per trials/steps in a new .npz file. 'log' records
+            trials in preallocated columns that are saved every sv_per trials
+            by a background thread into a chunked log (see
+            neurogym.utils.logstore), so saving does not stall step. The
+            remaining trials are saved by close(), or else when the monitor
+            is garbage collected or at exit. Copies of the monitor (e.g. made
+            by Dataset) log into folders with a _copy<n> suffix.
+            (def: 'npz', str)
+        fig_process: Whether figures are rendered in a separate process, so
+            step is not blocked by matplotlib. (def: True, bool)
+        fig_policy: What to do with a new figure when the previous one is
+            still being rendered: 'coalesce' renders only the latest one,
+            'drop' discards the new one. (def: 'coalesce', str)
     """
     metadata = {
         'description': 'Saves relevant behavioral information: rewards,' +
@@ -34,7 +48,8 @@ class Monitor(Wrapper):
 
     def __init__(self, env, folder=None, sv_per=100000, sv_stp='trial',
                  verbose=False, sv_fig=False, num_stps_sv_fig=100, name='',
-                 fig_type='png'):
+                 fig_type='png', backend='npz', fig_process=True,
+                 fig_policy='coalesce'):
         super().__init__(env)
         self.env = env
         self.num_tr = 0
@@ -57,16 +72,30 @@ class Monitor(Wrapper):
         # seeding
         self.sv_name = self.folder +\
             self.env.__class__.__name__+'_bhvr_data_'+name+'_'
+        if backend not in ('npz', 'log'):
+            raise ValueError('Unknown backend ' + str(backend))
+        self.backend = backend
+        self.log = None
+        self.sv_rew = 0
+        self.sv_num_tr = 0
+        if backend == 'log':
+            chunk_size = self.sv_per if self.sv_stp == 'trial' else 10000
+            self.log = LogWriter(self.folder + self.env.__class__.__name__ +
+                                 '_bhvr_log_' + name, chunk_size=chunk_size)
         # figure
         self.sv_fig = sv_fig
         if self.sv_fig:
             self.num_stps_sv_fig = num_stps_sv_fig
             self.stp_counter = 0
-            self.ob_mat = []
-            self.act_mat = []
-            self.rew_mat = []
-            self.gt_mat = []
-            self.perf_mat = []
+            self.fig_done = False
+            # Arrays are allocated with the first observation
+            self.ob_mat = None
+            self.fig_policy = fig_policy
+            self.fig_process = None
+            if fig_process:
+                # matplotlib is only imported when figures are saved
+                from neurogym.utils.plotting import FigureProcess
+                self.fig_process = FigureProcess(policy=fig_policy)
 
     def reset(self, step_fn=None):
         if step_fn is None:
@@ -81,7 +110,36 @@ class Monitor(Wrapper):
             self.store_data(obs, action, rew, info)
         if self.sv_stp == 'timestep':
             self.t += 1
-        if info['new_trial']:
+        if info['new_trial'] and self.log is not None:
+            self.num_tr += 1
+            record = {'choice': action, 'stimulus': self.cum_obs,
+                      'reward': self.cum_rew}
+            record.update(info)
+            self.log.append(record)
+            self.sv_rew += self.cum_rew
+            self.sv_num_tr += 1
+            self.cum_obs = 0
+            self.cum_rew = 0
+            # Trials are saved by the log every sv_per trials
+            if self.sv_stp == 'timestep':
+                save = self.t >= self.sv_per
+                if save:
+                    self.log.flush()
+                    self.t = 0
+            else:
+                save = self.num_tr % self.sv_per == 0
+            if save:
+                if self.verbose:
+                    print('--------------------')
+                    print('Number of steps: ', np.mean(self.num_tr))
+                    print('Average reward: ', self.sv_rew / self.sv_num_tr)
+                    print('--------------------')
+                self.sv_rew = 0
+                self.sv_num_tr = 0
+                if self.sv_fig:
+                    self.stp_counter = 0
+                    self.fig_done = False
+        elif info['new_trial']:
             self.num_tr += 1
             self.data['choice'].append(action)
             self.data['stimulus'].append(self.cum_obs)
@@ -110,37 +168,50 @@ class Monitor(Wrapper):
                 self.reset_data()
                 if self.sv_fig:
                     self.stp_counter = 0
+                    self.fig_done = False
                 if self.sv_stp == 'timestep':
                     self.t = 0
         return obs, rew, done, info
 
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+        if self.sv_fig and self.fig_process is not None:
+            self.fig_process.close()
+        return self.env.close()
+
     def reset_data(self):
         for key in self.data.keys():
             self.data[key] = []
 
     def store_data(self, obs, action, rew, info):
-        if self.stp_counter <= self.num_stps_sv_fig:
-            self.ob_mat.append(obs)
-            self.act_mat.append(action)
-            self.rew_mat.append(rew)
-            if 'gt' in info.keys():
-                self.gt_mat.append(info['gt'])
-            else:
-                self.gt_mat.append(-1)
-            if 'performance' in info.keys():
-                self.perf_mat.append(info['performance'])
-            else:
-                self.perf_mat.append(-1)
+        n_stps = self.num_stps_sv_fig + 1
+        if self.ob_mat is None:
+            self.ob_mat = np.zeros((n_stps,) + np.shape(obs))
+            self.act_mat = np.zeros((n_stps,) + np.shape(action))
+            self.rew_mat = np.zeros(n_stps)
+            self.gt_mat = np.zeros((n_stps,) + np.shape(info.get('gt', -1)))
+            self.perf_mat = np.zeros(n_stps)
+        if self.stp_counter < n_stps:
+            i = self.stp_counter
+            self.ob_mat[i] = obs
+            self.act_mat[i] = action
+            self.rew_mat[i] = rew
+            self.gt_mat[i] = info.get('gt', -1)
+            self.perf_mat[i] = info.get('performance', -1)
             self.stp_counter += 1
-        elif len(self.rew_mat) > 0:
-            obs_mat = np.array(self.ob_mat)
-            act_mat = np.array(self.act_mat)
-            fig_(ob=obs_mat, actions=act_mat,
-                 gt=self.gt_mat, rewards=self.rew_mat,
-                 performance=self.perf_mat,
-                 fname=self.sv_name+f'task_{self.num_tr:06}.'+self.fig_type)
-            self.ob_mat = []
-            self.act_mat = []
-            self.rew_mat = []
-            self.gt_mat = []
-            self.perf_mat = []
+        elif not self.fig_done:
+            fig_kwargs = {
+                'ob': self.ob_mat, 'actions': self.act_mat,
+                'gt': self.gt_mat, 'rewards': self.rew_mat,
+                'performance': self.perf_mat,
+                'fname': self.sv_name+f'task_{self.num_tr:06}.'+self.fig_type}
+            if self.fig_process is not None:
+                # Arrays are pickled asynchronously, send copies
+                fig_kwargs = {k: v.copy() if isinstance(v, np.ndarray) else v
+                              for k, v in fig_kwargs.items()}
+                self.fig_process.submit(**fig_kwargs)
+            else:
+                from neurogym.utils.plotting import fig_
+                fig_(**fig_kwargs)
+            self.fig_done = True
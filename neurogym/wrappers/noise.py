@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import neurogym as ngym
-import numpy as np
+from neurogym.core import TrialWrapperV2
+from neurogym.utils.stats import RollingStats
 
 
-class Noise(ngym.TrialWrapper):
+class Noise(TrialWrapperV2):
     """Add Gaussian noise to the observations.
 
+    The noise of a whole trial is drawn at once when the trial is created,
+    so it is also present in the ob arrays used by Dataset.
+
     Args:
         std_noise: Standard deviation of noise. (def: 0.1)
         perf_th: If != None, the wrapper will adjust the noise so the mean
@@ -33,30 +36,36 @@ class Noise(ngym.TrialWrapper):
         self.perf_th = perf_th
         if self.perf_th is not None:
             self.perf_th = perf_th
-            self.perf = []
+            self.perf = RollingStats(self.w)
             self.std_noise = 0
 
-    def step(self, action, new_tr_fn=None):
-        ntr_fn = new_tr_fn or self.new_trial
-        obs, reward, done, info = self.env.step(action, new_tr_fn=ntr_fn)
-        # adjust noise
+    def modify_trial(self):
+        ob = self.unwrapped.ob
+        if ob.ndim == 2:
+            # Leave channels reserved by outer wrappers untouched
+            ob = ob[:, :self.observation_space.shape[0]]
+        ob += self.unwrapped.rng.normal(loc=0, scale=self.std_noise,
+                                        size=ob.shape)
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self.fused_step(action, obs, reward, info, None)
+        return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        """Adjust noise, which depends on the agent's performance."""
         if self.perf_th is not None and info['new_trial']:
             assert 'performance' in info, 'Adjusting noise is only possible' +\
                 ' with task that output a performance value'
-            self.perf.append(info['performance'])
-            self.min_w = len(self.perf) > self.w
-            if self.min_w:
-                self.perf.pop(0)
+            self.perf.push(info['performance'])
+            self.min_w = self.perf.count > self.w
 
-            perf_mean = np.mean(self.perf)
+            perf_mean = self.perf.mean
             if perf_mean > self.perf_th and self.min_w:
                 self.std_noise += self.step_noise
             elif perf_mean < self.perf_th and self.std_noise > 0:
                 self.std_noise = max(0, self.std_noise-self.step_noise)
             info['perf_mean'] = perf_mean
+            info['perf_std'] = self.perf.std
             info['std_noise'] = self.std_noise
-
-        # add noise
-        obs += self.env.rng.normal(loc=0, scale=self.std_noise,
-                                   size=obs.shape)
-        return obs, reward, done, info
+        return reward
@@ -7,7 +7,11 @@ from gym import spaces
 
 
 class PassAction(Wrapper):
-    """Modifies observation by adding the previous action."""
+    """Modifies observation by adding the previous action.
+
+    If the task supports it, an action channel is reserved in the task's
+    observation and the action is written there in place.
+    """
     metadata = {
         'description': 'Modifies observation by adding the previous action.',
         'paper_link': None,
@@ -22,6 +26,10 @@ class PassAction(Wrapper):
         self.observation_space = spaces.Box(-np.inf, np.inf,
                                             shape=(env_oss+1,),
                                             dtype=np.float32)
+        if hasattr(self.unwrapped, 'reserve_ob'):
+            self.ob_slot = self.unwrapped.reserve_ob('action')
+        else:
+            self.ob_slot = slice(env_oss, env_oss+1)
 
     def reset(self, step_fn=None):
         if step_fn is None:
@@ -30,5 +38,13 @@ class PassAction(Wrapper):
 
     def step(self, action):
         obs, reward, done, info = self.env.step(action)
-        obs = np.concatenate((obs, np.array([action])))
+        if obs.shape[0] > self.ob_slot.start:
+            obs[self.ob_slot] = action
+        else:
+            obs = np.concatenate((obs, np.array([action])))
         return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        """Step hook used by utils.fusion, write into reserved slot."""
+        ob[self.ob_slot] = action
+        return reward
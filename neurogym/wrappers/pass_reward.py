@@ -16,12 +16,19 @@ class PassReward(Wrapper):
     def __init__(self, env):
         """
         Modifies observation by adding the previous reward.
+
+        If the task supports it, a reward channel is reserved in the
+        task's observation and the reward is written there in place.
         """
         super().__init__(env)
         env_oss = env.observation_space.shape[0]
         self.observation_space = spaces.Box(-np.inf, np.inf,
                                             shape=(env_oss+1,),
                                             dtype=np.float32)
+        if hasattr(self.unwrapped, 'reserve_ob'):
+            self.ob_slot = self.unwrapped.reserve_ob('reward')
+        else:
+            self.ob_slot = slice(env_oss, env_oss+1)
 
     def reset(self, step_fn=None):
         if step_fn is None:
@@ -30,5 +37,13 @@ class PassReward(Wrapper):
 
     def step(self, action):
         obs, reward, done, info = self.env.step(action)
-        obs = np.concatenate((obs, np.array([reward])))
+        if obs.shape[0] > self.ob_slot.start:
+            obs[self.ob_slot] = reward
+        else:
+            obs = np.concatenate((obs, np.array([reward])))
         return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        """Step hook used by utils.fusion, write into reserved slot."""
+        ob[self.ob_slot] = reward
+        return reward
@@ -3,14 +3,15 @@
 
 from gym import spaces
 import numpy as np
-import gym
-import neurogym as ngym
-# XXX: implemented without relying on core.trTrialWrapper
+from neurogym.core import TrialWrapperV2
 
 
-class TransferLearning(ngym.TrialWrapper):
+class TransferLearning(TrialWrapperV2):
     """Allows training on several tasks sequencially.
 
+    Observations of every task are padded (and preceded by the task cue)
+    once per trial, so all tasks share the same observation size.
+
     Args:
         envs: List with environments. (list)
         num_tr_per_task: Number of trials to train on each task. (list)
@@ -24,6 +25,8 @@ class TransferLearning(ngym.TrialWrapper):
 
     def __init__(self, envs, num_tr_per_task, task_cue=False):
         super().__init__(envs[0])
+        for env in envs:
+            env.unwrapped.set_top(self)
         self.t = 0
         self.envs = envs
         self.num_tr_per_task = num_tr_per_task
@@ -65,22 +68,20 @@ class TransferLearning(ngym.TrialWrapper):
             self.env_counter += 1
             self.env = self.envs[self.env_counter]
             self.tr_counter = 1
-            self.reset()
         self.tr_counter += 1
         self.env.new_trial(**kwargs)
+        self.modify_trial()
+
+    def modify_trial(self):
+        ob = self.unwrapped.ob
+        start = 1*self.task_cue
+        new_ob = np.zeros((ob.shape[0], self.ob_sh), dtype=ob.dtype)
+        new_ob[:, start:start+ob.shape[1]] = ob
+        if self.task_cue:
+            new_ob[:, 0] = self.env_counter
+        self.unwrapped.ob = new_ob
 
-    def step(self, action, new_tr_fn=None):
-        ntr_fn = new_tr_fn or self.new_trial
-        obs, reward, done, info = self.env.step(action, new_tr_fn=ntr_fn)
-        obs = self.modify_obs(obs)
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
         info['task'] = self.env_counter
         return obs, reward, done, info
-
-    def modify_obs(self, obs):
-        extra_sh = self.ob_sh-obs.shape[0]-1*self.task_cue
-        obs = np.concatenate((obs, np.zeros((extra_sh,))),
-                             axis=0)
-        if self.task_cue:
-            cue = np.array([self.env_counter])
-            obs = np.concatenate((cue, obs), axis=0)
-        return obs
@@ -6,12 +6,16 @@ Created on Fri Jan 31 15:10:01 2020
 @author: martafradera
 """
 
-import neurogym as ngym
+import numpy as np
+from neurogym.core import TrialWrapperV2
 
 
-class TTLPulse(ngym.TrialWrapper):
+class TTLPulse(TrialWrapperV2):
     """Outputs extra pulses that will be non-zero during specified periods.
 
+    The pulses of a whole trial are built once per trial and stored in
+    self.pulses, an array of shape (n_steps, n_pulses).
+
     Args:
         periods: List of list specifying the on periods for each pulse.
             (def: [], list)
@@ -27,16 +31,27 @@ class TTLPulse(ngym.TrialWrapper):
         super().__init__(env)
 
         self.periods = periods
-
-    def step(self, action, new_tr_fn=None):
-        info_tmp = {}
+        self.pulses = np.zeros((0, len(self.periods)), dtype=int)
+        self._prev_pulses = self.pulses
+
+    def modify_trial(self):
+        task = self.unwrapped
+        self._prev_pulses = self.pulses
+        self.pulses = np.zeros((task.ob.shape[0], len(self.periods)),
+                               dtype=int)
         for ind_p, periods in enumerate(self.periods):
-            info_tmp['signal_' + str(ind_p)] = 0
             for per in periods:
-                if self.env.in_period(per):
-                    info_tmp['signal_' + str(ind_p)] = 1
+                self.pulses[task.start_ind[per]:task.end_ind[per], ind_p] = 1
 
-        ntr_fn = new_tr_fn or self.new_trial
-        obs, reward, done, info = self.env.step(action, new_tr_fn=ntr_fn)
-        info.update(info_tmp)
+    def step(self, action):
+        t_ind = self.unwrapped.t_ind
+        obs, reward, done, info = self.env.step(action)
+        self.fused_step(action, obs, reward, info, t_ind)
         return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        # If the trial just ended, pulses already belong to the next trial
+        pulses = self._prev_pulses if info['new_trial'] else self.pulses
+        for ind_p in range(len(self.periods)):
+            info['signal_' + str(ind_p)] = pulses[t_ind, ind_p]
+        return reward
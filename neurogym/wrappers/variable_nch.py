@@ -64,3 +64,7 @@ class Variable_nch(TrialWrapperV2):
         obs, reward, done, info = self.env.step(action)
         info['nch'] = self.nch
         return obs, reward, done, info
+
+    def fused_step(self, action, ob, reward, info, t_ind):
+        info['nch'] = self.nch
+        return reward